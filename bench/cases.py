@@ -0,0 +1,174 @@
+import random
+import uuid
+from datetime import date, timedelta
+from typing import Callable, NamedTuple
+from src.hierarchy import CategoryTree, SiblingIndex
+from src.models import BaseProduct, Category, diagnostics_disabled
+
+
+class Case(NamedTuple):
+    """
+    Benchmark case: setup(n) builds input once and returns
+    function that does n operations of case
+    """
+
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    ops: int  # operations per run at scale 1
+
+
+# -------- Sample Data --------
+CATEGORY_ID = uuid.UUID('12345678-1234-5678-1234-567812345678')
+
+
+def product_row(index: int) -> dict:
+    """Typical product row with all compositions filled"""
+    return {
+        'sku': f'SKU{index:08d}',
+        'name': 'Benchmark Product',
+        'category_id': CATEGORY_ID,
+        'unit_of_measure': 'kg',
+        'physical_state': 'solid',
+        'role_type': 'finished good',
+        'status': 'active',
+        'description': 'Product used by benchmarks',
+        'dimensions': {'weight_kg': 5.5, 'width_cm': 20, 'height_cm': 30, 'depth_cm': 40},
+        'handling': {'is_fragile': True, 'is_stackable': False},
+        'traceability': {
+            'tracking_type': 'expiry_tracked',
+            'production_date': date.today() - timedelta(days=10),
+            'expiry_date': date.today() + timedelta(days=100),
+        },
+        'storage_requirements': {'storage_condition': 'perishable', 'temperature_regime': 'chilled'},
+        'classification': {'size_type': 'light', 'moving_type': 'fast moving', 'abc_category': 'A'},
+    }
+
+
+def category_row(index: int) -> dict:
+    return {
+        'sku': f'CTG{index:08d}',
+        'name': 'Benchmark Category',
+        'description': 'Category used by benchmarks',
+        'parent_id': CATEGORY_ID,
+        'level': 2,
+        'path': '/ROOT/CHILD',
+        'sort_order': index,
+    }
+
+
+# -------- Cases --------
+def _construct_products(n: int):
+    rows = [product_row(index) for index in range(n)]
+    return lambda: [BaseProduct(**row) for row in rows]
+
+
+def _construct_products_json(n: int):
+    payloads = [BaseProduct(**product_row(index)).model_dump_json() for index in range(n)]
+    return lambda: [BaseProduct.model_validate_json(payload) for payload in payloads]
+
+
+def _construct_categories(n: int):
+    rows = [category_row(index) for index in range(n)]
+    return lambda: [Category(**row) for row in rows]
+
+
+def _construct_categories_json(n: int):
+    payloads = [Category(**category_row(index)).model_dump_json() for index in range(n)]
+    return lambda: [Category.model_validate_json(payload) for payload in payloads]
+
+
+def _assign_nested(n: int):
+    product = BaseProduct(**product_row(0))
+
+    def run():
+        dimensions, classification = product.dimensions, product.classification
+        for index in range(n):
+            dimensions.weight_kg = 1.0 + index % 9
+            classification.moving_type = 'normal moving' if index % 2 else 'fast moving'
+
+    return run
+
+
+def _dump_products(n: int):
+    products = [BaseProduct(**product_row(index)) for index in range(n)]
+    return lambda: [product.model_dump() for product in products]
+
+
+def _dump_products_json(n: int):
+    products = [BaseProduct(**product_row(index)) for index in range(n)]
+    return lambda: [product.model_dump_json() for product in products]
+
+
+def _bulk_import(n: int):
+    rows = [product_row(index) for index in range(n)]
+
+    def run():
+        with diagnostics_disabled():
+            return BaseProduct.validate_many(rows)
+
+    return run
+
+
+def _bulk_loop(n: int):
+    rows = [product_row(index) for index in range(n)]
+
+    def run():
+        with diagnostics_disabled():
+            return [BaseProduct.model_validate(row) for row in rows]
+
+    return run
+
+
+def _move_siblings(children: int) -> Callable[[int], Callable[[], object]]:
+    """Drag and drop moves among children of one parent, time per move should not grow with children"""
+
+    def setup(n: int):
+        root = Category(sku='ROOT', name='Root', description=None, path='/ROOT')
+        template = Category(**{**category_row(0), 'parent_id': root.id, 'path': '/ROOT/CTG'})
+        # Copies of validated template, wide gaps of sort_order let moves land between neighbours
+        nodes = [
+            template.model_copy(update={'id': uuid.uuid4(), 'sku': f'CTG{index:08d}', 'sort_order': index << 20})
+            for index in range(children)
+        ]
+        index = SiblingIndex(CategoryTree.from_categories([root, *nodes]))
+        index.count(root.id)
+        rng = random.Random(0)
+        moves = [(rng.choice(nodes).id, rng.randrange(children)) for _ in range(n)]
+
+        def run():
+            for category_id, position in moves:
+                index.move_to(category_id, position)
+
+        return run
+
+    return setup
+
+
+CASES = [
+    Case('product.construct.dict', _construct_products, 1_000),
+    Case('product.construct.json', _construct_products_json, 1_000),
+    Case('category.construct.dict', _construct_categories, 1_000),
+    Case('category.construct.json', _construct_categories_json, 1_000),
+    # Two validated assignments per operation
+    Case('product.assign.nested', _assign_nested, 1_000),
+    Case('product.dump.dict', _dump_products, 1_000),
+    Case('product.dump.json', _dump_products_json, 1_000),
+    # Same moves with 100 times more siblings show that move_to scales as O(log n)
+    Case('category.siblings.move.1000', _move_siblings(1_000), 1_000),
+    Case('category.siblings.move.100000', _move_siblings(100_000), 1_000),
+]
+
+# Bulk import runs once per size, names are 'product.bulk_import.<rows>'.
+# Plain loop over same rows ('product.bulk_loop.<rows>') is reference: batch matches it at 10k rows
+# and is faster from about 20k, thresholds of larger sizes are below cost of loop
+BULK_PREFIX = 'product.bulk_import.'
+BULK_LOOP_PREFIX = 'product.bulk_loop.'
+BULK_SCALES = (10_000, 100_000, 1_000_000)
+
+
+def bulk_case(rows: int) -> Case:
+    return Case(f'{BULK_PREFIX}{rows}', _bulk_import, rows)
+
+
+def bulk_loop_case(rows: int) -> Case:
+    return Case(f'{BULK_LOOP_PREFIX}{rows}', _bulk_loop, rows)
@@ -0,0 +1,116 @@
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Optional, Sequence
+import pydantic
+from .cases import BULK_LOOP_PREFIX, BULK_PREFIX, BULK_SCALES, CASES, Case, bulk_case, bulk_loop_case
+
+
+THRESHOLDS = Path(__file__).with_name('thresholds.json')
+
+
+def run_case(case: Case, scale: float = 1.0, repeat: int = 5) -> dict:
+    """Times case, result is per operation in microseconds (best and median of runs)"""
+    ops = max(1, int(case.ops * scale))
+    run = case.setup(ops)
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = perf_counter()
+        run()
+        timings.append((perf_counter() - started) / ops * 1_000_000)
+    return {
+        'name': case.name,
+        'ops': ops,
+        'best_us': round(min(timings), 3),
+        'median_us': round(statistics.median(timings), 3),
+        'runs': repeat,
+    }
+
+
+def check_regressions(
+    results: Sequence[dict],
+    thresholds: dict[str, float],
+    baseline: Optional[Sequence[dict]] = None,
+    tolerance: float = 0.25,
+) -> list[dict]:
+    """
+    Cases slower than their absolute threshold (us per op),
+    or slower than baseline run by more than tolerance
+    """
+    previous = {result['name']: result for result in baseline or ()}
+    regressions = []
+    for result in results:
+        limit = thresholds.get(result['name'])
+        if limit is not None and result['best_us'] > limit:
+            regressions.append({'name': result['name'], 'best_us': result['best_us'], 'threshold_us': limit})
+        old = previous.get(result['name'])
+        if old is not None and result['best_us'] > old['best_us'] * (1 + tolerance):
+            regressions.append({'name': result['name'], 'best_us': result['best_us'], 'baseline_us': old['best_us']})
+    return regressions
+
+
+def run_suite(
+    scale: float = 1.0,
+    repeat: int = 5,
+    bulk: Sequence[int] = BULK_SCALES[:1],
+    only: Optional[str] = None,
+) -> list[dict]:
+    cases = [*CASES, *(case for rows in bulk for case in (bulk_case(rows), bulk_loop_case(rows)))]
+    if only:
+        cases = [case for case in cases if only in case.name]
+    results = []
+    for case in cases:
+        if case.name.startswith((BULK_PREFIX, BULK_LOOP_PREFIX)):
+            # Bulk import is timed once per size, its rows already make it long enough
+            results.append(run_case(case, 1.0, 1))
+        else:
+            results.append(run_case(case, scale, repeat))
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks of model construction, validation and serialization')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier of operations per case')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case, best run is compared')
+    parser.add_argument(
+        '--bulk',
+        default=str(BULK_SCALES[0]),
+        help=f'comma separated bulk import sizes, e.g. {",".join(map(str, BULK_SCALES))}',
+    )
+    parser.add_argument('--only', help='run only cases whose name contains this text')
+    parser.add_argument('--output', type=Path, help='write JSON results to file instead of stdout')
+    parser.add_argument('--thresholds', type=Path, default=THRESHOLDS, help='JSON of max us per op per case')
+    parser.add_argument('--baseline', type=Path, help='JSON output of previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown against baseline')
+    args = parser.parse_args(argv)
+
+    bulk = [int(rows) for rows in args.bulk.split(',') if rows]
+    results = run_suite(args.scale, args.repeat, bulk, args.only)
+    thresholds = json.loads(args.thresholds.read_text()) if args.thresholds and args.thresholds.exists() else {}
+    baseline = json.loads(args.baseline.read_text())['results'] if args.baseline else None
+    regressions = check_regressions(results, thresholds, baseline, args.tolerance)
+
+    report = json.dumps(
+        {
+            'python': platform.python_version(),
+            'pydantic': pydantic.VERSION,
+            'results': results,
+            'regressions': regressions,
+        },
+        indent=2,
+    )
+    if args.output:
+        args.output.write_text(report)
+    else:
+        print(report)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
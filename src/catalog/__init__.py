@@ -0,0 +1,54 @@
+# Catalog import
+from .importer import ImportChunk, ImportStats, import_file, import_products, import_categories, read_rows, unflatten
+# Parallel validation
+from .parallel import CompactChunk, validate_parallel
+# Columnar catalog
+from .frame import ProductFrame
+# Vectorized size types
+from .sizing import (
+    SizeTypeViolations,
+    compute_volume_m3,
+    verify_size_types,
+    suggest_size_types,
+    fill_frame_volumes,
+    verify_frame_size_types,
+    suggest_frame_size_types,
+)
+# Binary codec
+from .codec import CodecError, encode_stream, decode_stream, dumps, loads
+# Bitmap indexes
+from .bitmap import BitmapIndex
+# Query engine
+from .query import PlanStep, ProductCatalog
+# Product cache
+from .cache import CacheStats, ProductCache
+
+__all__ = [
+    'ImportChunk',
+    'ImportStats',
+    'import_file',
+    'import_products',
+    'import_categories',
+    'read_rows',
+    'unflatten',
+    'CompactChunk',
+    'validate_parallel',
+    'ProductFrame',
+    'SizeTypeViolations',
+    'compute_volume_m3',
+    'verify_size_types',
+    'suggest_size_types',
+    'fill_frame_volumes',
+    'verify_frame_size_types',
+    'suggest_frame_size_types',
+    'CodecError',
+    'encode_stream',
+    'decode_stream',
+    'dumps',
+    'loads',
+    'BitmapIndex',
+    'PlanStep',
+    'ProductCatalog',
+    'CacheStats',
+    'ProductCache',
+]
@@ -0,0 +1,210 @@
+from operator import attrgetter
+from typing import Any, Iterable, Mapping, Optional
+import numpy as np
+from ..models import BaseProduct
+from ..models.product.batch import gc_paused
+from .frame import FLAGS_COLUMN, ProductFrame
+from .schema import ENUM_FIELDS, HANDLING_FLAGS, HANDLING_PREFIX, enum_codes
+
+
+# Bitsets are arrays of 64 bit words, bit of product slot s is bit s % 64 of word s // 64
+WORD_DTYPE = np.dtype('uint64')
+WORD_BITS = 64
+MIN_WORDS = 16
+
+_getters = {name: attrgetter(name) for name in ENUM_FIELDS}
+
+
+def _words(slots: int) -> int:
+    return max(MIN_WORDS, -(-slots // WORD_BITS))
+
+
+def _pack(mask: np.ndarray, words: int) -> np.ndarray:
+    """Boolean mask as bitset of given number of words"""
+    packed = np.packbits(mask, bitorder='little')
+    bits = np.zeros(words * 8, np.uint8)
+    bits[: len(packed)] = packed
+    return bits.view(WORD_DTYPE)
+
+
+class BitmapIndex:
+    """
+    Bitmap secondary indexes over products: one bitset per value of every enum field
+    (None included) and one per handling flag. Filters are bitwise AND / OR of bitsets,
+    cost of query depends on number of products / 64, not on number of matching products.
+
+    Products have fixed slots, removed slot is cleared from every bitset and from alive.
+    update re-reads attributes of product after assignment and flips only bits that changed
+    """
+
+    __slots__ = ('products', 'slots', 'codes', 'flags', 'bitmaps', 'flag_bitmaps', 'alive', '_size')
+
+    def __init__(self, frame: Optional[ProductFrame] = None, products: Optional[list[BaseProduct]] = None) -> None:
+        size = len(frame) if frame is not None else 0
+        words = _words(size)
+        self.products: list[Optional[BaseProduct]] = list(products) if products is not None else [None] * size
+        self.slots: dict[str, int] = {}
+        if frame is not None:
+            self.slots = {sku.decode('ascii'): slot for slot, sku in enumerate(frame.columns['sku'].tolist())}
+        self._size = size
+        capacity = words * WORD_BITS
+
+        self.codes: dict[str, np.ndarray] = {}
+        self.bitmaps: dict[str, list[np.ndarray]] = {}
+        for name, enum in ENUM_FIELDS.items():
+            codes = np.zeros(capacity, np.uint8)
+            if frame is not None:
+                codes[:size] = frame.columns[name]
+            self.codes[name] = codes
+            self.bitmaps[name] = [_pack(codes[:size] == code, words) for code in range(len(enum_codes(enum).decode))]
+
+        self.flags = np.zeros(capacity, np.uint8)
+        if frame is not None:
+            self.flags[:size] = frame.columns[FLAGS_COLUMN]
+        self.flag_bitmaps = [_pack((self.flags[:size] >> bit) & 1 != 0, words) for bit in range(len(HANDLING_FLAGS))]
+        self.alive = _pack(np.ones(size, bool), words)
+
+    @classmethod
+    def from_products(cls, products: Iterable[BaseProduct]) -> 'BitmapIndex':
+        """Builds all bitsets at once from columnar frame of products"""
+        products = list(products)
+        return cls(ProductFrame.from_products(products), products)
+
+    # -------- Bitsets --------
+    def eq(self, name: str, value: Any) -> np.ndarray:
+        """Bitset of products where enum field equals value (member, value or None)"""
+        return self.bitmaps[name][enum_codes(ENUM_FIELDS[name]).encode[value]]
+
+    def isin(self, name: str, values: Iterable[Any]) -> np.ndarray:
+        """Bitset of products where enum field is one of values"""
+        encode = enum_codes(ENUM_FIELDS[name]).encode
+        bitmaps = self.bitmaps[name]
+        return np.bitwise_or.reduce([bitmaps[encode[value]] for value in values] or [np.zeros_like(self.alive)])
+
+    def flag(self, name: str, value: bool = True) -> np.ndarray:
+        """Bitset of products where handling flag is set (or not set when value is False)"""
+        if name.startswith(HANDLING_PREFIX):
+            name = name[len(HANDLING_PREFIX) :]
+        bitmap = self.flag_bitmaps[HANDLING_FLAGS.index(name)]
+        return bitmap if value else self.alive & ~bitmap
+
+    def query(self, conditions: Mapping[str, Any]) -> np.ndarray:
+        """
+        AND of conditions: enum field to value or collection of values (OR),
+        'handling.flag' to bool. Empty conditions select every product
+        """
+        result = self.alive.copy()
+        for name, value in conditions.items():
+            if name.startswith(HANDLING_PREFIX):
+                result &= self.flag(name, value)
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                result &= self.isin(name, value)
+            else:
+                result &= self.eq(name, value)
+        return result
+
+    # -------- Results --------
+    @staticmethod
+    def count(bitmap: np.ndarray) -> int:
+        return int(np.unpackbits(bitmap.view(np.uint8)).sum())
+
+    def positions(self, bitmap: np.ndarray) -> np.ndarray:
+        """Slots of products in bitset, ascending"""
+        bits = np.unpackbits(bitmap.view(np.uint8), bitorder='little')
+        return np.flatnonzero(bits[: self._size])
+
+    def select(self, bitmap: np.ndarray) -> list[BaseProduct]:
+        """Products in bitset"""
+        products = self.products
+        return [products[slot] for slot in self.positions(bitmap).tolist()]  # type: ignore[misc]
+
+    def __len__(self) -> int:
+        return self.count(self.alive)
+
+    # -------- Changes --------
+    def add(self, product: BaseProduct) -> int:
+        """Adds product (or replaces product with same sku), returns its slot"""
+        slot = self.slots.get(product.sku)
+        if slot is not None:
+            self.products[slot] = product
+            self.update(product)
+            return slot
+        slot = self._size
+        if slot >= len(self.flags):
+            self._grow()
+        self._size += 1
+        self.slots[product.sku] = slot
+        self.products.append(product)
+        _set(self.alive, slot)
+        for name, codes in self.codes.items():
+            code = enum_codes(ENUM_FIELDS[name]).encode[_getters[name](product)]
+            codes[slot] = code
+            _set(self.bitmaps[name][code], slot)
+        handling = product.handling
+        for bit, flag in enumerate(HANDLING_FLAGS):
+            if getattr(handling, flag):
+                self.flags[slot] |= 1 << bit
+                _set(self.flag_bitmaps[bit], slot)
+        return slot
+
+    def add_many(self, products: Iterable[BaseProduct]) -> None:
+        with gc_paused():
+            for product in products:
+                self.add(product)
+
+    def update(self, product: BaseProduct) -> None:
+        """Re-reads indexed attributes of product after they were reassigned"""
+        slot = self.slots[product.sku]
+        for name, codes in self.codes.items():
+            code = enum_codes(ENUM_FIELDS[name]).encode[_getters[name](product)]
+            previous = codes[slot]
+            if code != previous:
+                bitmaps = self.bitmaps[name]
+                _clear(bitmaps[previous], slot)
+                _set(bitmaps[code], slot)
+                codes[slot] = code
+        handling = product.handling
+        flags = 0
+        for bit, flag in enumerate(HANDLING_FLAGS):
+            if getattr(handling, flag):
+                flags |= 1 << bit
+        changed = int(self.flags[slot]) ^ flags
+        for bit in range(len(HANDLING_FLAGS)):
+            if changed >> bit & 1:
+                (_set if flags >> bit & 1 else _clear)(self.flag_bitmaps[bit], slot)
+        self.flags[slot] = flags
+
+    def remove(self, sku: str) -> bool:
+        """Clears product from every bitset, its slot is not reused"""
+        slot = self.slots.pop(sku, None)
+        if slot is None:
+            return False
+        for name, codes in self.codes.items():
+            _clear(self.bitmaps[name][codes[slot]], slot)
+            codes[slot] = 0
+        for bit in range(len(HANDLING_FLAGS)):
+            _clear(self.flag_bitmaps[bit], slot)
+        self.flags[slot] = 0
+        _clear(self.alive, slot)
+        self.products[slot] = None
+        return True
+
+    def _grow(self) -> None:
+        """Doubles capacity of all bitsets and code columns"""
+        def grown(array: np.ndarray) -> np.ndarray:
+            return np.concatenate([array, np.zeros_like(array)])
+
+        self.alive = grown(self.alive)
+        self.flags = grown(self.flags)
+        self.flag_bitmaps = [grown(bitmap) for bitmap in self.flag_bitmaps]
+        for name in self.codes:
+            self.codes[name] = grown(self.codes[name])
+            self.bitmaps[name] = [grown(bitmap) for bitmap in self.bitmaps[name]]
+
+
+def _set(bitmap: np.ndarray, slot: int) -> None:
+    bitmap[slot >> 6] |= np.uint64(1 << (slot & 63))
+
+
+def _clear(bitmap: np.ndarray, slot: int) -> None:
+    bitmap[slot >> 6] &= ~np.uint64(1 << (slot & 63))
@@ -0,0 +1,205 @@
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+from ..models import BaseProduct
+from .codec import CodecError, encode_product, product_row
+
+
+# Memory of entry besides its record: OrderedDict slot, entry tuple, expiry float
+ENTRY_OVERHEAD = 160
+
+
+class CacheStats(NamedTuple):
+    """Counters of ProductCache since creation"""
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    entries: int
+    nbytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _Entry(NamedTuple):
+    record: bytes
+    expires: float
+    nbytes: int
+
+
+class ProductCache:
+    """
+    LRU cache of products by sku with optional TTL, bounded by entries and/or approximate bytes.
+
+    Products are kept as immutable binary records (catalog codec), every get rebuilds new
+    BaseProduct from record, so callers can change what they got without corrupting cache.
+    attach registers invalidation on writes of repository. Safe to share between threads
+    """
+
+    __slots__ = (
+        'max_entries',
+        'max_bytes',
+        'ttl',
+        'clock',
+        '_entries',
+        '_lock',
+        '_generation',
+        'nbytes',
+        'hits',
+        'misses',
+        'evictions',
+        'expirations',
+        'invalidations',
+    )
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 10_000,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries is None and max_bytes is None:
+            raise ValueError('ProductCache needs max_entries or max_bytes')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        # Incremented by every invalidation, loads started before it are not cached
+        self._generation = 0
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # -------- Reading --------
+    def _record(self, sku: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(sku)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires < self.clock():
+                self._drop(sku)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sku)
+            self.hits += 1
+            return entry.record
+
+    def get(self, sku: str) -> Optional[BaseProduct]:
+        """New copy of cached product, None on miss"""
+        record = self._record(sku)
+        return BaseProduct.from_trusted(product_row(record)) if record is not None else None
+
+    def get_or_load(self, sku: str, load: Callable[[str], Optional[BaseProduct]]) -> Optional[BaseProduct]:
+        """Cached product or loaded one (cached for next lookups), for example load=repository.get"""
+        product = self.get(sku)
+        if product is not None:
+            return product
+        generation = self._generation
+        product = load(sku)
+        if product is not None:
+            self.put(product, generation)
+        return product
+
+    def get_many(self, skus: Iterable[str], load_many: Callable[[list[str]], list[BaseProduct]]) -> list[BaseProduct]:
+        """Products of skus in order of skus, missed ones are loaded by one load_many call"""
+        skus = list(skus)
+        found = {sku: product for sku in dict.fromkeys(skus) if (product := self.get(sku)) is not None}
+        missing = [sku for sku in dict.fromkeys(skus) if sku not in found]
+        if missing:
+            generation = self._generation
+            loaded = load_many(missing)
+            self.put_many(loaded, generation)
+            found.update((product.sku, product) for product in loaded)
+        return [found[sku] for sku in skus if sku in found]
+
+    def __contains__(self, sku: object) -> bool:
+        entry = self._entries.get(sku)  # type: ignore[call-overload]
+        return entry is not None and entry.expires >= self.clock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------- Writing --------
+    def put(self, product: BaseProduct, generation: Optional[int] = None) -> None:
+        """Caches snapshot of product, later changes of product object are not seen by cache"""
+        self.put_many([product], generation)
+
+    def put_many(self, products: Iterable[BaseProduct], generation: Optional[int] = None) -> None:
+        entries = []
+        expires = self.clock() + self.ttl if self.ttl is not None else float('inf')
+        for product in products:
+            try:
+                record = encode_product(product)
+            except struct.error as exc:
+                raise CodecError(f'BaseProduct {product.sku} does not fit binary record: {exc}') from exc
+            entries.append((product.sku, _Entry(record, expires, sys.getsizeof(record) + ENTRY_OVERHEAD)))
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            for sku, entry in entries:
+                if sku in self._entries:
+                    self._drop(sku)
+                if self.max_bytes is not None and entry.nbytes > self.max_bytes:
+                    continue
+                self._entries[sku] = entry
+                self.nbytes += entry.nbytes
+            self._evict()
+
+    def _drop(self, sku: str) -> None:
+        self.nbytes -= self._entries.pop(sku).nbytes
+
+    def _evict(self) -> None:
+        """Drops least recently used entries until cache fits its limits"""
+        entries = self._entries
+        while (self.max_entries is not None and len(entries) > self.max_entries) or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        ):
+            self.nbytes -= entries.popitem(last=False)[1].nbytes
+            self.evictions += 1
+
+    # -------- Invalidation --------
+    def invalidate(self, sku: str) -> bool:
+        return self.invalidate_many([sku]) > 0
+
+    def invalidate_many(self, skus: Iterable[str]) -> int:
+        """Drops products of skus, returns number of dropped entries"""
+        dropped = 0
+        with self._lock:
+            self._generation += 1
+            for sku in skus:
+                if sku in self._entries:
+                    self._drop(sku)
+                    dropped += 1
+            self.invalidations += dropped
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.nbytes = 0
+
+    def attach(self, repository: Any) -> None:
+        """Invalidates products written or deleted through repository (ProductRepository listeners)"""
+        repository.listeners.append(self.invalidate_many)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            self.hits, self.misses, self.evictions, self.expirations, self.invalidations, len(self), self.nbytes
+        )
@@ -0,0 +1,323 @@
+import struct
+from datetime import date, datetime, timedelta, timezone
+from io import BytesIO
+from operator import attrgetter
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional, Union
+from uuid import UUID
+from pydantic import BaseModel
+from ..models import BaseProduct, Category
+from ..models.product.batch import gc_paused
+from ..models.product.trusted import construct_trusted
+from .importer import unflatten
+from .schema import ENUM_FIELDS, FLOAT_FIELDS, DATE_FIELDS, HANDLING_FLAGS, enum_codes
+
+
+# -------- Stream Header --------
+# magic, format version, record kind
+MAGIC = b'WMSB'
+VERSION = 2
+HEADER = struct.Struct('<4sBB')
+# Every record is prefixed by its length, so reader can skip it without decoding
+LENGTH = struct.Struct('<I')
+
+KIND_PRODUCT = 1
+KIND_CATEGORY = 2
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+# Strings: length byte for short (sku, name), length short for long (description, path)
+SHORT_LEN = struct.Struct('<B')
+LONG_LEN = struct.Struct('<H')
+FLOAT = struct.Struct('<d')
+DATE = struct.Struct('<i')
+# level and sort_order have no upper bound in models, signed 64 bit as in tree snapshot
+INT = struct.Struct('<q')
+
+# Timestamps are timezone aware (stored as UTC micros), same bit for both models
+AWARE_BIT = 1 << 15
+
+
+class CodecError(ValueError):
+    """Stream or record is not valid binary catalog data"""
+
+
+# -------- Helpers --------
+def _encode_timestamps(created_at: datetime, updated_at: datetime) -> tuple[int, int, int]:
+    """Micros since epoch of both timestamps and AWARE_BIT if they are timezone aware"""
+    if created_at.tzinfo is None:
+        return (created_at - EPOCH) // MICROSECOND, (updated_at - EPOCH) // MICROSECOND, 0
+    return (created_at - EPOCH_UTC) // MICROSECOND, (updated_at - EPOCH_UTC) // MICROSECOND, AWARE_BIT
+
+
+def _decode_timestamp(micros: int, bitmap: int) -> datetime:
+    try:
+        return (EPOCH_UTC if bitmap & AWARE_BIT else EPOCH) + micros * MICROSECOND
+    except OverflowError as exc:
+        raise CodecError(f'Timestamp {micros} is out of range') from exc
+
+
+def _short_text(value: str, encoding: str = 'utf-8') -> bytes:
+    raw = value.encode(encoding)
+    return SHORT_LEN.pack(len(raw)) + raw
+
+
+def _long_text(value: str) -> bytes:
+    raw = value.encode('utf-8')
+    return LONG_LEN.pack(len(raw)) + raw
+
+
+def _read_text(buffer: bytes, offset: int, length: struct.Struct, encoding: str = 'utf-8') -> tuple[str, int]:
+    (size,) = length.unpack_from(buffer, offset)
+    offset += length.size
+    return buffer[offset : offset + size].decode(encoding), offset + size
+
+
+# -------- Product Record --------
+# bitmap, 12 enum codes (0 is None), handling flags, created_at, updated_at
+PRODUCT_FIXED = struct.Struct(f'<H{len(ENUM_FIELDS)}BBqq')
+
+# Presence bits of Optional product fields, enums use code 0 instead
+P_DESCRIPTION = 1 << 0
+P_CATEGORY_ID = 1 << 1
+P_FLOATS = [(name, 1 << bit) for bit, name in enumerate(FLOAT_FIELDS, 2)]
+P_DATES = [(name, 1 << bit) for bit, name in enumerate(DATE_FIELDS, 2 + len(FLOAT_FIELDS))]
+
+_enum_getters = [(attrgetter(name), enum_codes(enum).encode) for name, enum in ENUM_FIELDS.items()]
+_enum_decoders = [(name, enum_codes(enum).decode) for name, enum in ENUM_FIELDS.items()]
+_float_getters = [(attrgetter(name), bit) for name, bit in P_FLOATS]
+_date_getters = [(attrgetter(name), bit) for name, bit in P_DATES]
+_flag_bits = [(name, 1 << bit) for bit, name in enumerate(HANDLING_FLAGS)]
+
+
+def encode_product(product: BaseProduct) -> bytes:
+    """Packs product to one binary record (without length prefix)"""
+    bitmap = 0
+    tail = [_short_text(product.sku, 'ascii'), _short_text(product.name)]
+    if product.description is not None:
+        bitmap |= P_DESCRIPTION
+        tail.append(_long_text(product.description))
+    if product.category_id is not None:
+        bitmap |= P_CATEGORY_ID
+        tail.append(product.category_id.bytes)
+    for getter, bit in _float_getters:
+        value = getter(product)
+        if value is not None:
+            bitmap |= bit
+            tail.append(FLOAT.pack(value))
+    for getter, bit in _date_getters:
+        value = getter(product)
+        if value is not None:
+            bitmap |= bit
+            tail.append(DATE.pack(value.toordinal()))
+
+    handling = product.handling
+    flags = 0
+    for name, bit in _flag_bits:
+        if getattr(handling, name):
+            flags |= bit
+    created, updated, aware = _encode_timestamps(product.created_at, product.updated_at)
+    codes = [encode[getter(product)] for getter, encode in _enum_getters]
+    return PRODUCT_FIXED.pack(bitmap | aware, *codes, flags, created, updated) + b''.join(tail)
+
+
+def product_row(record: bytes) -> dict[str, Any]:
+    """Unpacks binary record to nested dict (model_dump shape)"""
+    bitmap, *codes, flags, created, updated = PRODUCT_FIXED.unpack_from(record)
+    offset = PRODUCT_FIXED.size
+    row: dict[str, Any] = {}
+    for (name, decode), code in zip(_enum_decoders, codes):
+        if code >= len(decode):
+            raise CodecError(f'Unknown code {code} of {name}')
+        row[name] = decode[code]
+    row['sku'], offset = _read_text(record, offset, SHORT_LEN, 'ascii')
+    row['name'], offset = _read_text(record, offset, SHORT_LEN)
+    row['description'] = None
+    if bitmap & P_DESCRIPTION:
+        row['description'], offset = _read_text(record, offset, LONG_LEN)
+    row['category_id'] = None
+    if bitmap & P_CATEGORY_ID:
+        row['category_id'] = UUID(bytes=record[offset : offset + 16])
+        offset += 16
+    for name, bit in P_FLOATS:
+        row[name] = None
+        if bitmap & bit:
+            (row[name],) = FLOAT.unpack_from(record, offset)
+            offset += FLOAT.size
+    for name, bit in P_DATES:
+        row[name] = None
+        if bitmap & bit:
+            (ordinal,) = DATE.unpack_from(record, offset)
+            row[name] = date.fromordinal(ordinal)
+            offset += DATE.size
+    row['created_at'] = _decode_timestamp(created, bitmap)
+    row['updated_at'] = _decode_timestamp(updated, bitmap)
+
+    row = unflatten(row)
+    row['handling'] = {name: bool(flags & bit) for name, bit in _flag_bits}
+    return row
+
+
+# -------- Category Record --------
+# bitmap, flags, id, created_at, updated_at
+CATEGORY_FIXED = struct.Struct('<HB16sqq')
+
+C_DESCRIPTION = 1 << 0
+C_PARENT_ID = 1 << 1
+C_LEVEL = 1 << 2
+C_PATH = 1 << 3
+C_SORT_ORDER = 1 << 4
+
+C_IS_ACTIVE = 1 << 0
+C_IS_DELETED = 1 << 1
+
+
+def encode_category(category: Category) -> bytes:
+    """Packs category to one binary record (without length prefix)"""
+    bitmap = 0
+    tail = [_short_text(category.sku, 'ascii'), _short_text(category.name)]
+    if category.description is not None:
+        bitmap |= C_DESCRIPTION
+        tail.append(_long_text(category.description))
+    if category.parent_id is not None:
+        bitmap |= C_PARENT_ID
+        tail.append(category.parent_id.bytes)
+    if category.level is not None:
+        bitmap |= C_LEVEL
+        tail.append(INT.pack(category.level))
+    if category.path is not None:
+        bitmap |= C_PATH
+        tail.append(_long_text(category.path))
+    if category.sort_order is not None:
+        bitmap |= C_SORT_ORDER
+        tail.append(INT.pack(category.sort_order))
+
+    flags = (C_IS_ACTIVE if category.is_active else 0) | (C_IS_DELETED if category.is_deleted else 0)
+    created, updated, aware = _encode_timestamps(category.created_at, category.updated_at)
+    return CATEGORY_FIXED.pack(bitmap | aware, flags, category.id.bytes, created, updated) + b''.join(tail)
+
+
+def category_row(record: bytes) -> dict[str, Any]:
+    """Unpacks binary record to category dict (model_dump shape)"""
+    bitmap, flags, raw_id, created, updated = CATEGORY_FIXED.unpack_from(record)
+    offset = CATEGORY_FIXED.size
+    row: dict[str, Any] = {'id': UUID(bytes=raw_id)}
+    row['sku'], offset = _read_text(record, offset, SHORT_LEN, 'ascii')
+    row['name'], offset = _read_text(record, offset, SHORT_LEN)
+    row['parent_id'] = row['description'] = row['level'] = row['path'] = row['sort_order'] = None
+    if bitmap & C_DESCRIPTION:
+        row['description'], offset = _read_text(record, offset, LONG_LEN)
+    if bitmap & C_PARENT_ID:
+        row['parent_id'] = UUID(bytes=record[offset : offset + 16])
+        offset += 16
+    if bitmap & C_LEVEL:
+        (row['level'],) = INT.unpack_from(record, offset)
+        offset += INT.size
+    if bitmap & C_PATH:
+        row['path'], offset = _read_text(record, offset, LONG_LEN)
+    if bitmap & C_SORT_ORDER:
+        (row['sort_order'],) = INT.unpack_from(record, offset)
+        offset += INT.size
+    row['created_at'] = _decode_timestamp(created, bitmap)
+    row['updated_at'] = _decode_timestamp(updated, bitmap)
+    row['is_active'] = bool(flags & C_IS_ACTIVE)
+    row['is_deleted'] = bool(flags & C_IS_DELETED)
+    return row
+
+
+# -------- Kinds --------
+Encoder = Callable[[Any], bytes]
+RowDecoder = Callable[[bytes], dict[str, Any]]
+
+_ENCODERS: dict[type, tuple[int, Encoder]] = {
+    BaseProduct: (KIND_PRODUCT, encode_product),
+    Category: (KIND_CATEGORY, encode_category),
+}
+_ROW_DECODERS: dict[int, tuple[type[BaseModel], RowDecoder]] = {
+    KIND_PRODUCT: (BaseProduct, product_row),
+    KIND_CATEGORY: (Category, category_row),
+}
+
+
+def _build(model: type[BaseModel], row: dict[str, Any], validate: bool) -> Any:
+    """Model from decoded row, records were validated by writer unless validate is asked"""
+    if validate:
+        return model.model_validate(row)
+    if model is BaseProduct:
+        return BaseProduct.from_trusted(row)
+    return construct_trusted(model, row)
+
+
+# -------- Streaming --------
+def encode_stream(models: Iterable[Union[BaseProduct, Category]], file: BinaryIO) -> int:
+    """
+    Writes header and records of models (all of one kind) to binary file,
+    returns count of records. Empty input writes nothing
+    """
+    count = 0
+    encode: Optional[Encoder] = None
+    expected: type = object
+    for model in models:
+        if encode is None:
+            expected = type(model)
+            if expected not in _ENCODERS:
+                raise CodecError(f'No binary codec for {expected.__name__}')
+            kind, encode = _ENCODERS[expected]
+            file.write(HEADER.pack(MAGIC, VERSION, kind))
+        elif type(model) is not expected:
+            raise CodecError(f'Stream of {expected.__name__} cant contain {type(model).__name__}')
+        try:
+            record = encode(model)
+        except struct.error as exc:
+            raise CodecError(f'{expected.__name__} {model.sku} does not fit binary record: {exc}') from exc
+        file.write(LENGTH.pack(len(record)))
+        file.write(record)
+        count += 1
+    return count
+
+
+def decode_stream(file: BinaryIO, validate: bool = False) -> Iterator[Union[BaseProduct, Category]]:
+    """Reads records one by one from binary file, only current record is held in memory"""
+    header = file.read(HEADER.size)
+    if not header:
+        return
+    if len(header) < HEADER.size:
+        raise CodecError('Truncated stream header')
+    magic, version, kind = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise CodecError('Not a binary catalog stream')
+    if version != VERSION:
+        raise CodecError(f'Unsupported binary catalog version {version}, expected {VERSION}')
+    if kind not in _ROW_DECODERS:
+        raise CodecError(f'Unknown record kind {kind}')
+    model, decode = _ROW_DECODERS[kind]
+
+    # Offset of current record in stream, reported with corrupted record
+    offset = HEADER.size
+    while prefix := file.read(LENGTH.size):
+        if len(prefix) < LENGTH.size:
+            raise CodecError('Truncated record length')
+        (size,) = LENGTH.unpack(prefix)
+        record = file.read(size)
+        if len(record) < size:
+            raise CodecError('Truncated record')
+        try:
+            row = decode(record)
+        except (struct.error, UnicodeDecodeError, ValueError, OverflowError, OSError) as exc:
+            raise CodecError(f'Corrupted record at offset {offset}: {exc}') from exc
+        offset += LENGTH.size + size
+        yield _build(model, row, validate)
+
+
+def dumps(models: Iterable[Union[BaseProduct, Category]]) -> bytes:
+    """Encodes models to bytes"""
+    buffer = BytesIO()
+    encode_stream(models, buffer)
+    return buffer.getvalue()
+
+
+def loads(data: bytes, validate: bool = False) -> list[Union[BaseProduct, Category]]:
+    """Decodes all models from bytes"""
+    with gc_paused():
+        return list(decode_stream(BytesIO(data), validate))
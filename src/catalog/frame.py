@@ -0,0 +1,183 @@
+import sys
+from datetime import date, timezone
+from operator import attrgetter
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
+from uuid import UUID
+import numpy as np
+from ..models import BaseProduct
+from ..models.product.batch import gc_paused
+from .importer import unflatten
+from .schema import (
+    ENUM_FIELDS,
+    FLOAT_FIELDS,
+    DATE_FIELDS,
+    DATETIME_FIELDS,
+    HANDLING_FLAGS,
+    enum_codes,
+    handling_bits,
+)
+
+
+# SKU pattern is ASCII [A-Z0-9]{3,20}, fixed width bytes fit it
+SKU_DTYPE = np.dtype('S20')
+UUID_DTYPE = np.dtype('S16')
+ENUM_DTYPE = np.dtype('uint8')
+FLAGS_DTYPE = np.dtype('uint8')
+DATE_DTYPE = np.dtype('int32')  # date.toordinal(), 0 is None
+DATETIME_DTYPE = np.dtype('datetime64[us]')  # NaT is None
+
+FLAGS_COLUMN = 'handling'
+# datetime64 has no timezone: aware timestamps are stored as UTC and flagged, like AWARE_BIT of codec
+AWARE_COLUMN = 'timestamps_aware'
+
+# Reading nested attribute by flat name
+_getters = {name: attrgetter(name) for name in (*ENUM_FIELDS, *FLOAT_FIELDS, *DATE_FIELDS)}
+
+
+class ProductFrame:
+    """
+    Columnar (struct of arrays) catalog of products.
+
+    Every flat field of BaseProduct is one NumPy column: dimensions are float64 (NaN is None),
+    enums are uint8 codes (0 is None), handling flags are packed to one uint8 bitset per product,
+    dates are int32 ordinals, timestamps are datetime64 (UTC for aware ones, flagged in own column).
+    Products are rebuilt from columns only on demand
+    """
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns: dict[str, np.ndarray]) -> None:
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f'All columns of ProductFrame must have same length, got {sorted(lengths)}')
+        self.columns = columns
+
+    # -------- Building --------
+    @classmethod
+    def from_products(cls, products: Iterable[BaseProduct]) -> 'ProductFrame':
+        """Builds frame from products in one pass"""
+        products = products if isinstance(products, Sequence) else list(products)
+        size = len(products)
+        columns: dict[str, np.ndarray] = {
+            'sku': np.empty(size, SKU_DTYPE),
+            'name': np.empty(size, object),
+            'description': np.empty(size, object),
+            'category_id': np.zeros(size, UUID_DTYPE),
+            FLAGS_COLUMN: np.zeros(size, FLAGS_DTYPE),
+            AWARE_COLUMN: np.zeros(size, bool),
+            **{name: np.zeros(size, ENUM_DTYPE) for name in ENUM_FIELDS},
+            **{name: np.full(size, np.nan) for name in FLOAT_FIELDS},
+            **{name: np.zeros(size, DATE_DTYPE) for name in DATE_FIELDS},
+            **{name: np.full(size, np.datetime64('NaT'), DATETIME_DTYPE) for name in DATETIME_FIELDS},
+        }
+        encoders = [(columns[name], _getters[name], enum_codes(enum).encode) for name, enum in ENUM_FIELDS.items()]
+        floats = [(columns[name], _getters[name]) for name in FLOAT_FIELDS]
+        dates = [(columns[name], _getters[name]) for name in DATE_FIELDS]
+        flag_bits = [(name, 1 << bit) for bit, name in enumerate(HANDLING_FLAGS)]
+        skus, names, descriptions = columns['sku'], columns['name'], columns['description']
+        category_ids, flags = columns['category_id'], columns[FLAGS_COLUMN]
+        created, updated, aware = columns['created_at'], columns['updated_at'], columns[AWARE_COLUMN]
+
+        for index, product in enumerate(products):
+            skus[index] = product.sku.encode('ascii')
+            names[index] = product.name
+            descriptions[index] = product.description
+            if product.category_id is not None:
+                category_ids[index] = product.category_id.bytes
+            for column, getter, encode in encoders:
+                column[index] = encode[getter(product)]
+            for column, getter in floats:
+                value = getter(product)
+                if value is not None:
+                    column[index] = value
+            for column, getter in dates:
+                value = getter(product)
+                if value is not None:
+                    column[index] = value.toordinal()
+            handling = product.handling
+            flags[index] = sum(bit for name, bit in flag_bits if getattr(handling, name))
+            created_at, updated_at = product.created_at, product.updated_at
+            if created_at.tzinfo is not None:
+                # Both are aware, BaseProduct compares them
+                aware[index] = True
+                created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+                updated_at = updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+            created[index] = created_at
+            updated[index] = updated_at
+        return cls(columns)
+
+    # -------- Rebuilding Products --------
+    def rows(self, indexes: Optional[Iterable[int]] = None) -> Iterator[dict[str, Any]]:
+        """Nested dicts (model_dump shape) of products at indexes, all by default"""
+        selected = np.arange(len(self)) if indexes is None else np.asarray(list(indexes), dtype=np.intp)
+        # Columns are converted to Python objects column-wise, it is much cheaper than per cell
+        column = {
+            name: values[selected].tolist()
+            for name, values in self.columns.items()
+            if name not in (FLAGS_COLUMN, AWARE_COLUMN)
+        }
+        lists: dict[str, list] = {}
+        lists['sku'] = [sku.decode('ascii') for sku in column['sku']]
+        lists['name'] = column['name']
+        lists['description'] = column['description']
+        # Fixed width bytes drop trailing zero bytes, they are padded back
+        lists['category_id'] = [UUID(bytes=raw.ljust(16, b'\0')) if raw else None for raw in column['category_id']]
+        for name, enum in ENUM_FIELDS.items():
+            decode = enum_codes(enum).decode
+            lists[name] = [decode[code] for code in column[name]]
+        for name in FLOAT_FIELDS:
+            lists[name] = [None if value != value else value for value in column[name]]
+        for name in DATE_FIELDS:
+            lists[name] = [date.fromordinal(value) if value else None for value in column[name]]
+        aware = self.columns[AWARE_COLUMN][selected].tolist()
+        for name in DATETIME_FIELDS:
+            lists[name] = [
+                value.replace(tzinfo=timezone.utc) if utc else value for value, utc in zip(column[name], aware)
+            ]
+        flags = self.columns[FLAGS_COLUMN][selected]
+        flag_lists = [((flags & (1 << bit)) != 0).tolist() for bit in range(len(HANDLING_FLAGS))]
+
+        names = list(lists)
+        for values, handling in zip(zip(*lists.values()), zip(*flag_lists)):
+            row = unflatten(dict(zip(names, values)))
+            row['handling'] = dict(zip(HANDLING_FLAGS, handling))
+            yield row
+
+    def to_products(self, indexes: Optional[Iterable[int]] = None) -> list[BaseProduct]:
+        """Rebuilds products (all by default), values in frame were validated when frame was built"""
+        with gc_paused():
+            return [BaseProduct.from_trusted(row) for row in self.rows(indexes)]
+
+    def product(self, index: int) -> BaseProduct:
+        """Rebuilds one product"""
+        return BaseProduct.from_trusted(next(self.rows([index])))
+
+    # -------- Filtering --------
+    def eq(self, name: str, value: Any) -> np.ndarray:
+        """Mask of products where enum field equals value (enum member or value, None for unset)"""
+        return self.columns[name] == enum_codes(ENUM_FIELDS[name]).encode[value]
+
+    def isin(self, name: str, values: Iterable[Any]) -> np.ndarray:
+        """Mask of products where enum field is one of values"""
+        encode = enum_codes(ENUM_FIELDS[name]).encode
+        return np.isin(self.columns[name], [encode[value] for value in values])
+
+    def flag(self, name: str) -> np.ndarray:
+        """Mask of products where handling flag is set"""
+        return (self.columns[FLAGS_COLUMN] & handling_bits(name)) != 0
+
+    def where(self, mask: Union[np.ndarray, Sequence[int]]) -> 'ProductFrame':
+        """New frame with products selected by boolean mask or indexes"""
+        return ProductFrame({name: column[mask] for name, column in self.columns.items()})
+
+    # -------- Info --------
+    def __len__(self) -> int:
+        return len(self.columns['sku'])
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of columns, strings referenced by object columns (name, description) included"""
+        total = sum(column.nbytes for column in self.columns.values())
+        for name in ('name', 'description'):
+            total += sum(sys.getsizeof(value) for value in self.columns[name].tolist() if value is not None)
+        return total
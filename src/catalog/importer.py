@@ -0,0 +1,192 @@
+import csv
+import json
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Collection, Iterable, Iterator, Mapping, NamedTuple, Type, Union
+from pydantic import BaseModel
+from ..models import BaseProduct, Category
+from ..models.product.batch import RowError, validate_batch
+
+
+PathLike = Union[str, Path]
+
+# Default count of rows validated together
+CHUNK_SIZE = 10_000
+# Separator of flattened composition columns (dimensions.width_cm)
+NESTED_SEP = '.'
+
+CSV_SUFFIXES = ('.csv',)
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+
+# -------- Import Records --------
+class ImportStats(NamedTuple):
+    """Running totals of import"""
+
+    rows: int
+    errors: int
+    elapsed: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class ImportChunk(NamedTuple):
+    """One validated chunk: models, errors (position is data row number in file) and running stats"""
+
+    valid: list[Any]
+    errors: list[RowError]
+    stats: ImportStats
+
+
+# -------- Rows --------
+def unflatten(row: Mapping[str, Any], sep: str = NESTED_SEP) -> dict[str, Any]:
+    """
+    Turns flattened columns (handling.is_fragile) into nested composition dicts.
+    Column nested under value that is not dict (dimensions: null and dimensions.width_cm) is ValueError
+    """
+    nested: dict[str, Any] = {}
+    for key, value in row.items():
+        if not isinstance(key, str):
+            raise ValueError(f'Column name must be string, got {key!r}')
+        if sep not in key:
+            if key in nested and isinstance(nested[key], dict):
+                if not isinstance(value, dict):
+                    raise ValueError(f'Column {key!r} conflicts with its nested columns')
+                value = {**nested[key], **value}
+            nested[key] = value
+            continue
+        *parents, leaf = key.split(sep)
+        target = nested
+        for depth, parent in enumerate(parents, 1):
+            target = target.setdefault(parent, {})
+            if not isinstance(target, dict):
+                raise ValueError(f'Column {key!r} conflicts with value of {sep.join(parents[:depth])!r}')
+        target[leaf] = value
+    return nested
+
+
+def _row_error(index: int, error_type: str, exc: Exception, row: Any) -> RowError:
+    return RowError(index, [{'type': error_type, 'loc': (), 'msg': str(exc), 'input': row}])
+
+
+def read_csv(
+    path: PathLike, sep: str = NESTED_SEP, null_columns: Collection[str] = ()
+) -> Iterator[Union[dict[str, Any], RowError]]:
+    """
+    Reads CSV rows lazily, empty cells are left out so model defaults apply.
+    Empty cells of null_columns (required but nullable fields) are read as None.
+    Cells missing from short row are left out as well. Row with more cells than header is given as RowError
+    """
+    with open(path, newline='', encoding='utf-8') as file:
+        for index, row in enumerate(csv.DictReader(file)):
+            if None in row:
+                yield _row_error(index, 'csv_extra_cells', ValueError('row has more cells than header'), row[None])
+                continue
+            try:
+                yield unflatten(
+                    {
+                        key: None if value == '' else value
+                        for key, value in row.items()
+                        # DictReader pads short row with None
+                        if value is not None and (value != '' or key in null_columns)
+                    },
+                    sep,
+                )
+            except ValueError as exc:
+                yield _row_error(index, 'columns_conflict', exc, row)
+
+
+def read_ndjson(path: PathLike, sep: str = NESTED_SEP) -> Iterator[Union[dict[str, Any], RowError]]:
+    """Reads NDJSON lines lazily, line that is not JSON object is given as RowError"""
+    with open(path, encoding='utf-8') as file:
+        index = 0
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError('row must be JSON object')
+            except ValueError as exc:
+                yield _row_error(index, 'json_invalid', exc, line)
+            else:
+                try:
+                    yield unflatten(row, sep)
+                except ValueError as exc:
+                    yield _row_error(index, 'columns_conflict', exc, row)
+            index += 1
+
+
+def read_rows(
+    path: PathLike, sep: str = NESTED_SEP, null_columns: Collection[str] = ()
+) -> Iterator[Union[dict[str, Any], RowError]]:
+    """Picks reader by file suffix"""
+    suffix = Path(path).suffix.lower()
+    if suffix in CSV_SUFFIXES:
+        return read_csv(path, sep, null_columns)
+    if suffix in NDJSON_SUFFIXES:
+        return read_ndjson(path, sep)
+    raise ValueError(f'Unsupported catalog file format: {suffix!r}')
+
+
+# -------- Import --------
+def import_rows(
+    rows: Iterable[Union[Mapping[str, Any], RowError]],
+    model: Type[BaseModel],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[ImportChunk]:
+    """
+    Validates rows into model chunk by chunk,
+    only one chunk of rows is held in memory at a time
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    rows = iter(rows)
+    started = perf_counter()
+    offset = total_errors = 0
+
+    while chunk := list(islice(rows, chunk_size)):
+        # Rows that failed already while reading keep their place in file
+        errors: list[RowError] = []
+        positions: list[int] = []
+        parsed_rows = []
+        for position, row in enumerate(chunk, offset):
+            if isinstance(row, RowError):
+                errors.append(RowError(position, row.errors))
+            else:
+                positions.append(position)
+                parsed_rows.append(row)
+
+        batch = validate_batch(model, parsed_rows)
+        errors.extend(RowError(positions[error.position], error.errors) for error in batch.errors)
+        errors.sort(key=itemgetter(0))
+
+        offset += len(chunk)
+        total_errors += len(errors)
+        yield ImportChunk(batch.valid, errors, ImportStats(offset, total_errors, perf_counter() - started))
+
+
+def import_file(
+    path: PathLike,
+    model: Type[BaseModel],
+    chunk_size: int = CHUNK_SIZE,
+    sep: str = NESTED_SEP,
+) -> Iterator[ImportChunk]:
+    """Streams CSV or NDJSON file as validated chunks of model"""
+    required = {name for name, field in model.model_fields.items() if field.is_required()}
+    return import_rows(read_rows(path, sep, required), model, chunk_size)
+
+
+def import_products(path: PathLike, chunk_size: int = CHUNK_SIZE) -> Iterator[ImportChunk]:
+    """Streams file of products as validated BaseProduct chunks"""
+    return import_file(path, BaseProduct, chunk_size)
+
+
+def import_categories(path: PathLike, chunk_size: int = CHUNK_SIZE) -> Iterator[ImportChunk]:
+    """Streams file of categories as validated Category chunks"""
+    return import_file(path, Category, chunk_size)
+
@@ -0,0 +1,111 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Iterable, Iterator, Mapping, NamedTuple, Optional, Type
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from ..models import BaseProduct
+from ..models.product.batch import RowError, gc_paused
+from .importer import CHUNK_SIZE
+
+
+# Chunks queued per worker, keeps pool busy without reading whole input ahead
+PENDING_PER_WORKER = 2
+
+
+# -------- Results --------
+class CompactChunk(NamedTuple):
+    """
+    Result of one chunk validated in worker process.
+    Valid rows come back as one JSON array (payload) instead of pickled models,
+    indexes are input positions of those rows
+    """
+
+    offset: int
+    indexes: list[int]
+    payload: bytes
+    errors: list[RowError]
+
+    def rows(self) -> list[dict[str, Any]]:
+        """Valid rows as JSON-mode dicts, in input order"""
+        return json.loads(self.payload)
+
+
+# -------- Worker --------
+_adapters: dict[type, TypeAdapter] = {}
+
+
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter of list[model] built once per worker process"""
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(list[model])  # type: ignore[valid-type]
+    return adapter
+
+
+def validate_chunk(model: Type[BaseModel], offset: int, rows: list[Mapping[str, Any]]) -> CompactChunk:
+    """Validates chunk and packs it to compact result, runs inside worker"""
+    validate = model.__pydantic_validator__.validate_python
+    valid: list[BaseModel] = []
+    indexes: list[int] = []
+    errors: list[RowError] = []
+
+    with gc_paused():
+        for index, row in enumerate(rows, offset):
+            try:
+                valid.append(validate(row))
+            except ValidationError as exc:
+                # Context holds exception objects, they are not always picklable
+                errors.append(RowError(index, exc.errors(include_url=False, include_context=False)))
+            else:
+                indexes.append(index)
+    return CompactChunk(offset, indexes, _list_adapter(model).dump_json(valid), errors)
+
+
+# -------- Parallel Validation --------
+def _chunks(rows: Iterable[Mapping[str, Any]], chunk_size: int) -> Iterator[tuple[int, list[Mapping[str, Any]]]]:
+    rows = iter(rows)
+    offset = 0
+    while chunk := list(islice(rows, chunk_size)):
+        yield offset, chunk
+        offset += len(chunk)
+
+
+def validate_parallel(
+    rows: Iterable[Mapping[str, Any]],
+    model: Type[BaseModel] = BaseProduct,
+    chunk_size: int = CHUNK_SIZE,
+    workers: Optional[int] = None,
+) -> Iterator[CompactChunk]:
+    """
+    Shards rows across process pool in chunks of chunk_size and yields
+    compact results in input order. Only a few chunks per worker are in flight,
+    so input can be a lazy stream (import reader)
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError('workers must be at least 1')
+
+    # One worker has nothing to share, pool would only add pickling cost
+    if workers == 1:
+        for offset, chunk in _chunks(rows, chunk_size):
+            yield validate_chunk(model, offset, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future] = deque()
+        try:
+            for offset, chunk in _chunks(rows, chunk_size):
+                pending.append(pool.submit(validate_chunk, model, offset, chunk))
+                if len(pending) >= workers * PENDING_PER_WORKER:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Consumer stopped early, queued chunks are not needed anymore
+            for future in pending:
+                future.cancel()
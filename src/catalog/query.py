@@ -0,0 +1,230 @@
+from typing import Any, Iterator, Mapping, NamedTuple, Optional, Sequence
+from uuid import UUID
+import numpy as np
+from ..hierarchy import CategoryTree, ProductRangeIndex, TreeIntervals
+from ..models import BaseProduct
+from .bitmap import BitmapIndex
+from .frame import ProductFrame
+from .importer import NESTED_SEP
+from .schema import ENUM_FIELDS, FLOAT_FIELDS, HANDLING_FLAGS, HANDLING_PREFIX, enum_codes
+
+
+# Condition is 'field' or 'field__op', field is flat name ('dimensions.weight_kg') or its last part ('weight_kg')
+OP_SEP = '__'
+ENUM_OPS = ('eq', 'in')
+RANGE_OPS = ('eq', 'gt', 'gte', 'lt', 'lte')
+CATEGORY_UNDER = 'category_under'
+
+# Candidates are checked against remaining predicates in batches of slots
+STREAM_BATCH = 4096
+
+FLAG_FIELDS = tuple(HANDLING_PREFIX + flag for flag in HANDLING_FLAGS)
+_aliases = {name.rsplit(NESTED_SEP, 1)[-1]: name for name in (*ENUM_FIELDS, *FLOAT_FIELDS, *FLAG_FIELDS)}
+
+
+class PlanStep(NamedTuple):
+    """One predicate of query plan with number of products it matches"""
+
+    predicate: str
+    estimate: int
+
+
+# -------- Predicates --------
+class _BitmapPredicate:
+    """All enum and flag conditions at once: AND of their bitsets, estimate is exact popcount"""
+
+    __slots__ = ('bitmaps', 'bitmap', 'description', 'estimate')
+
+    def __init__(self, bitmaps: BitmapIndex, conditions: dict[str, Any]) -> None:
+        self.bitmaps = bitmaps
+        self.bitmap = bitmaps.query(conditions)
+        self.description = ' & '.join(f'{name} == {value!r}' for name, value in conditions.items())
+        self.estimate = bitmaps.count(self.bitmap)
+
+    def candidates(self) -> np.ndarray:
+        return self.bitmaps.positions(self.bitmap)
+
+    def test(self, slots: np.ndarray) -> np.ndarray:
+        words = self.bitmap[slots >> 6]
+        return (words >> (slots & 63).astype(np.uint64)) & np.uint64(1) != 0
+
+
+class _RangePredicate:
+    """Range over sorted numeric column, estimate is distance of two binary searches"""
+
+    __slots__ = ('values', 'matched', 'description', 'estimate', 'low', 'high', 'low_open', 'high_open')
+
+    def __init__(self, index: 'SortedColumn', name: str, bounds: dict[str, float]) -> None:
+        self.values = index.values
+        # Tightest bound wins, on same value open bound is tighter
+        lows = [(value, op == 'gt') for op, value in bounds.items() if op in ('eq', 'gt', 'gte')]
+        highs = [(value, op == 'lt') for op, value in bounds.items() if op in ('eq', 'lt', 'lte')]
+        self.low, self.low_open = max(lows, default=(-np.inf, False))
+        self.high, self.high_open = min(highs, key=lambda bound: (bound[0], not bound[1]), default=(np.inf, False))
+        start = np.searchsorted(index.sorted, self.low, 'right' if self.low_open else 'left')
+        stop = np.searchsorted(index.sorted, self.high, 'left' if self.high_open else 'right')
+        self.matched = index.order[start : max(start, stop)]
+        low, high = ('<' if self.low_open else '<='), ('<' if self.high_open else '<=')
+        self.description = f'{self.low} {low} {name} {high} {self.high}'
+        self.estimate = len(self.matched)
+
+    def candidates(self) -> np.ndarray:
+        return np.sort(self.matched)
+
+    def test(self, slots: np.ndarray) -> np.ndarray:
+        # NaN (None) fails every comparison
+        values = self.values[slots]
+        low = values > self.low if self.low_open else values >= self.low
+        high = values < self.high if self.high_open else values <= self.high
+        return low & high
+
+
+class _CategoryPredicate:
+    """Products under category, one contiguous range of ProductRangeIndex"""
+
+    __slots__ = ('keys', 'matched', 'description', 'estimate', 'enter', 'last')
+
+    def __init__(self, index: ProductRangeIndex, category_id: UUID) -> None:
+        self.keys = index.category_keys()
+        self.matched = index.positions(category_id)
+        intervals = index.intervals
+        self.enter, self.last = intervals.interval(category_id) if intervals.enter(category_id) >= 0 else (0, -1)
+        self.description = f'{CATEGORY_UNDER} {category_id}'
+        self.estimate = len(self.matched)
+
+    def candidates(self) -> np.ndarray:
+        return np.sort(self.matched)
+
+    def test(self, slots: np.ndarray) -> np.ndarray:
+        keys = self.keys[slots]
+        return (keys >= self.enter) & (keys <= self.last)
+
+
+# -------- Catalog --------
+class SortedColumn(NamedTuple):
+    """Slots of products with value in column (NaN dropped) sorted by value"""
+
+    values: np.ndarray
+    order: np.ndarray
+    sorted: np.ndarray
+
+
+class ProductCatalog:
+    """
+    Query API over products built once from them: enum bitmaps (BitmapIndex),
+    sorted numeric indexes on float fields (built on first use) and category intervals
+    (when tree is given).
+
+    Query picks predicate matching fewest products as driver, its candidates are streamed
+    in batches and checked against remaining predicates, so work is bounded by most selective
+    index and not by catalog size. Enum attributes of products changed afterwards are
+    picked up with update, other changes need new catalog
+    """
+
+    __slots__ = ('products', 'frame', 'bitmaps', 'categories', '_sorted')
+
+    def __init__(self, products: Sequence[BaseProduct], tree: Optional[CategoryTree] = None) -> None:
+        self.products = list(products)
+        self.frame = ProductFrame.from_products(self.products)
+        self.bitmaps = BitmapIndex(self.frame, self.products)
+        self.categories = ProductRangeIndex(TreeIntervals(tree), self.products) if tree is not None else None
+        self._sorted: dict[str, SortedColumn] = {}
+
+    def update(self, product: BaseProduct) -> None:
+        """Re-reads enum attributes and flags of product after assignment"""
+        self.bitmaps.update(product)
+
+    # -------- Indexes --------
+    def sorted_column(self, name: str) -> SortedColumn:
+        """Sorted index of float column, built on first use, O(n log n)"""
+        index = self._sorted.get(name)
+        if index is None:
+            values = self.frame.columns[name]
+            order = np.flatnonzero(~np.isnan(values))
+            order = order[np.argsort(values[order], kind='stable')]
+            index = self._sorted[name] = SortedColumn(values, order, values[order])
+        return index
+
+    # -------- Planning --------
+    def _plan(self, conditions: Mapping[str, Any]) -> list:
+        enums: dict[str, Any] = {}
+        ranges: dict[str, dict[str, float]] = {}
+        predicates: list = []
+        for key, value in conditions.items():
+            if key == CATEGORY_UNDER:
+                if self.categories is None:
+                    raise ValueError(f'{CATEGORY_UNDER} needs ProductCatalog built with category tree')
+                predicates.append(_CategoryPredicate(self.categories, value))
+                continue
+            field, _, op = key.partition(OP_SEP)
+            name = _aliases.get(field, field)
+            op = op or 'eq'
+            if name in ENUM_FIELDS or name in FLAG_FIELDS:
+                if op not in ENUM_OPS or (op == 'in' and name in FLAG_FIELDS):
+                    raise ValueError(f'Operator {op!r} is not supported for {name}')
+                enums[name] = list(value) if op == 'in' else value
+                if name in ENUM_FIELDS:
+                    encode = enum_codes(ENUM_FIELDS[name]).encode
+                    for member in enums[name] if op == 'in' else (value,):
+                        if member not in encode:
+                            raise ValueError(f'Unknown value {member!r} of {name}')
+            elif name in FLOAT_FIELDS:
+                if op not in RANGE_OPS:
+                    raise ValueError(f'Operator {op!r} is not supported for {name}')
+                ranges.setdefault(name, {})[op] = float(value)
+            else:
+                raise ValueError(f'Unknown query field {field!r}')
+        if enums or not (ranges or predicates):
+            predicates.append(_BitmapPredicate(self.bitmaps, enums))
+        predicates.extend(_RangePredicate(self.sorted_column(name), name, bounds) for name, bounds in ranges.items())
+        # Most selective first: it drives, others only filter its candidates
+        predicates.sort(key=lambda predicate: predicate.estimate)
+        return predicates
+
+    def explain(self, conditions: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> list[PlanStep]:
+        """Predicates of query in execution order with their match counts"""
+        return [PlanStep(p.description, p.estimate) for p in self._plan({**(conditions or {}), **kwargs})]
+
+    # -------- Execution --------
+    def positions(self, conditions: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> Iterator[np.ndarray]:
+        """Slots of matching products in batches, ascending"""
+        return self._stream(self._plan({**(conditions or {}), **kwargs}))
+
+    def query(self, conditions: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> Iterator[BaseProduct]:
+        """
+        Streams products matching all conditions, in catalog order.
+        Conditions are keyword arguments like storage_condition='perishable', weight_kg__gt=50,
+        hazard_class__in=['3', '8'], is_fragile=True, category_under=category_id,
+        or mapping with full flat names ('storage_requirements.storage_condition')
+        """
+        return self._products(self.positions(conditions, **kwargs))
+
+    def count(self, conditions: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> int:
+        """Number of matching products"""
+        predicates = self._plan({**(conditions or {}), **kwargs})
+        if len(predicates) == 1:
+            return predicates[0].estimate
+        return sum(len(batch) for batch in self._stream(predicates))
+
+    def _stream(self, predicates: list) -> Iterator[np.ndarray]:
+        driver, rest = predicates[0], predicates[1:]
+        if driver.estimate == 0:
+            return
+        candidates = driver.candidates()
+        for start in range(0, len(candidates), STREAM_BATCH):
+            batch = candidates[start : start + STREAM_BATCH]
+            for predicate in rest:
+                batch = batch[predicate.test(batch)]
+                if not len(batch):
+                    break
+            if len(batch):
+                yield batch
+
+    def _products(self, batches: Iterator[np.ndarray]) -> Iterator[BaseProduct]:
+        products = self.products
+        for batch in batches:
+            for slot in batch.tolist():
+                yield products[slot]
+
+    def __len__(self) -> int:
+        return len(self.products)
@@ -0,0 +1,83 @@
+from enum import Enum
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional, Type
+from ..models import (
+    HandlingAttributes,
+    UnitOfMeasure,
+    ProductPhysicalState,
+    ProductRoleType,
+    ProductStatus,
+    ProductTrackingType,
+    ProductStorageCondition,
+    HazardClass,
+    TemperatureRegime,
+    PackagingType,
+    ProductSizeType,
+    ProductMovingType,
+    ABCCategory,
+)
+from .importer import NESTED_SEP
+
+
+# -------- Flat Schema of BaseProduct --------
+# Compositions are flattened to 'composition.field' names (same as importer columns)
+TEXT_FIELDS = ('sku', 'name', 'description')
+UUID_FIELDS = ('category_id',)
+
+ENUM_FIELDS: dict[str, Type[Enum]] = {
+    'unit_of_measure': UnitOfMeasure,
+    'physical_state': ProductPhysicalState,
+    'role_type': ProductRoleType,
+    'status': ProductStatus,
+    'traceability.tracking_type': ProductTrackingType,
+    'storage_requirements.storage_condition': ProductStorageCondition,
+    'storage_requirements.hazard_class': HazardClass,
+    'storage_requirements.temperature_regime': TemperatureRegime,
+    'storage_requirements.packaging_type': PackagingType,
+    'classification.size_type': ProductSizeType,
+    'classification.moving_type': ProductMovingType,
+    'classification.abc_category': ABCCategory,
+}
+
+FLOAT_FIELDS = (
+    'dimensions.weight_kg',
+    'dimensions.width_cm',
+    'dimensions.height_cm',
+    'dimensions.depth_cm',
+    'dimensions.volume_m3',
+)
+
+DATE_FIELDS = ('traceability.production_date', 'traceability.expiry_date')
+DATETIME_FIELDS = ('created_at', 'updated_at')
+
+# Handling flags in bit order: bit i of packed flags is HANDLING_FLAGS[i]
+HANDLING_FLAGS = tuple(HandlingAttributes.model_fields)
+HANDLING_PREFIX = 'handling' + NESTED_SEP
+
+
+# -------- Enum Codes --------
+class EnumCodes(NamedTuple):
+    """
+    Small integer codes of enum, 0 is reserved for None,
+    members are coded 1..n in definition order
+    """
+
+    encode: dict[Any, int]
+    decode: tuple[Optional[str], ...]
+
+
+@lru_cache(maxsize=None)
+def enum_codes(enum: Type[Enum]) -> EnumCodes:
+    """Code table of enum, members and their values map to same code"""
+    members = list(enum)
+    encode: dict[Any, int] = {None: 0}
+    for code, member in enumerate(members, 1):
+        encode[member] = code
+    return EnumCodes(encode, (None, *(member.value for member in members)))
+
+
+def handling_bits(name: str) -> int:
+    """Bit mask of handling flag, name is flag or 'handling.flag'"""
+    if name.startswith(HANDLING_PREFIX):
+        name = name[len(HANDLING_PREFIX) :]
+    return 1 << HANDLING_FLAGS.index(name)
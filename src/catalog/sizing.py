@@ -0,0 +1,158 @@
+from typing import NamedTuple, Optional
+import numpy as np
+from ..models import ProductSizeType
+from ..models.product.constants import HEAVY_MIN_KG, LIGHT_MAX_KG, OVERSIZED_MIN_CM, SMALL_PARTS_MAX_CM
+from .frame import ProductFrame
+from .schema import enum_codes
+
+
+# Size type codes as stored in ProductFrame column
+SIZE_CODES = enum_codes(ProductSizeType).encode
+HEAVY = SIZE_CODES[ProductSizeType.HEAVY]
+LIGHT = SIZE_CODES[ProductSizeType.LIGHT]
+OVERSIZED = SIZE_CODES[ProductSizeType.OVERSIZED]
+SMALL_PARTS = SIZE_CODES[ProductSizeType.SMALL_PARTS]
+STANDARD = SIZE_CODES[ProductSizeType.STANDARD]
+
+# Dimension arrays are float64, NaN is None (same as in ProductFrame)
+
+
+class SizeTypeViolations(NamedTuple):
+    """
+    Masks of products breaking BaseProduct.validate_size_type_* rules,
+    one mask per raised error
+    """
+
+    heavy_missing_weight: np.ndarray
+    heavy_underweight: np.ndarray
+    light_missing_weight: np.ndarray
+    light_overweight: np.ndarray
+    oversized_missing_dims: np.ndarray
+    oversized_too_small: np.ndarray
+    small_parts_missing_dims: np.ndarray
+    small_parts_too_large: np.ndarray
+
+    @property
+    def any(self) -> np.ndarray:
+        """Mask of products breaking at least one rule"""
+        return np.logical_or.reduce(self)
+
+
+def _given(values: np.ndarray) -> np.ndarray:
+    """Mask of truthy values: not None (NaN) and not zero, same as `if value` in validators"""
+    return ~np.isnan(values) & (values != 0)
+
+
+# -------- Volume --------
+def compute_volume_m3(
+    width_cm: np.ndarray,
+    height_cm: np.ndarray,
+    depth_cm: np.ndarray,
+    volume_m3: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Vectorized Dimensions.calculato_vol: volume from three dimensions
+    where volume is not set and all three dimensions are given
+    """
+    computed = width_cm * height_cm * depth_cm / 1_000_000
+    if volume_m3 is None:
+        volume_m3 = np.full(computed.shape, np.nan)
+    fill = np.isnan(volume_m3) & _given(width_cm) & _given(height_cm) & _given(depth_cm)
+    return np.where(fill, computed, volume_m3)
+
+
+# -------- Size Type --------
+def verify_size_types(
+    size_type: np.ndarray,
+    weight_kg: np.ndarray,
+    width_cm: np.ndarray,
+    height_cm: np.ndarray,
+    depth_cm: np.ndarray,
+) -> SizeTypeViolations:
+    """Checks size type codes against weight and dimension thresholds for all products at once"""
+    no_weight = np.isnan(weight_kg)
+    no_dims = np.isnan(width_cm) & np.isnan(height_cm) & np.isnan(depth_cm)
+    # NaN comparisons are False, so missing dimension never counts as big or small one
+    any_over = (
+        (_given(width_cm) & (width_cm > OVERSIZED_MIN_CM))
+        | (_given(height_cm) & (height_cm > OVERSIZED_MIN_CM))
+        | (_given(depth_cm) & (depth_cm > OVERSIZED_MIN_CM))
+    )
+    any_small = (
+        (_given(width_cm) & (width_cm < SMALL_PARTS_MAX_CM))
+        | (_given(height_cm) & (height_cm < SMALL_PARTS_MAX_CM))
+        | (_given(depth_cm) & (depth_cm < SMALL_PARTS_MAX_CM))
+    )
+
+    heavy = size_type == HEAVY
+    light = size_type == LIGHT
+    oversized = size_type == OVERSIZED
+    small_parts = size_type == SMALL_PARTS
+    return SizeTypeViolations(
+        heavy_missing_weight=heavy & no_weight,
+        heavy_underweight=heavy & (weight_kg < HEAVY_MIN_KG),
+        light_missing_weight=light & no_weight,
+        light_overweight=light & (weight_kg > LIGHT_MAX_KG),
+        oversized_missing_dims=oversized & no_dims,
+        oversized_too_small=oversized & ~no_dims & ~any_over,
+        small_parts_missing_dims=small_parts & no_dims,
+        small_parts_too_large=small_parts & ~no_dims & ~any_small,
+    )
+
+
+def suggest_size_types(
+    weight_kg: np.ndarray,
+    width_cm: np.ndarray,
+    height_cm: np.ndarray,
+    depth_cm: np.ndarray,
+) -> np.ndarray:
+    """
+    Suggests size type code for every product from thresholds,
+    suggested type always passes verify_size_types. First matching rule wins:
+    OVERSIZED (any dimension > OVERSIZED_MIN_CM), HEAVY (weight >= HEAVY_MIN_KG),
+    SMALL_PARTS (all given dimensions < SMALL_PARTS_MAX_CM, weight unknown or light),
+    LIGHT (weight <= LIGHT_MAX_KG), STANDARD (anything measured), None (nothing measured)
+    """
+    dims = np.stack([width_cm, height_cm, depth_cm])
+    given = ~np.isnan(dims) & (dims != 0)
+    no_weight = np.isnan(weight_kg)
+    measured = ~no_weight | given.any(axis=0)
+
+    oversized = (given & (dims > OVERSIZED_MIN_CM)).any(axis=0)
+    heavy = weight_kg >= HEAVY_MIN_KG
+    small = given.any(axis=0) & ~(given & (dims >= SMALL_PARTS_MAX_CM)).any(axis=0)
+    light = weight_kg <= LIGHT_MAX_KG
+
+    return np.select(
+        [oversized, heavy, small & (no_weight | light), light, measured],
+        [OVERSIZED, HEAVY, SMALL_PARTS, LIGHT, STANDARD],
+        default=0,
+    ).astype(np.uint8)
+
+
+# -------- ProductFrame Helpers --------
+def _dims(frame: ProductFrame) -> tuple[np.ndarray, ...]:
+    columns = frame.columns
+    return (
+        columns['dimensions.weight_kg'],
+        columns['dimensions.width_cm'],
+        columns['dimensions.height_cm'],
+        columns['dimensions.depth_cm'],
+    )
+
+
+def fill_frame_volumes(frame: ProductFrame) -> None:
+    """Recomputes missing volume_m3 column of frame in place (after dimensions were re-measured)"""
+    _, width, height, depth = _dims(frame)
+    volume = frame.columns['dimensions.volume_m3']
+    frame.columns['dimensions.volume_m3'] = compute_volume_m3(width, height, depth, volume)
+
+
+def verify_frame_size_types(frame: ProductFrame) -> SizeTypeViolations:
+    """Checks size_type column of frame against its dimensions"""
+    return verify_size_types(frame.columns['classification.size_type'], *_dims(frame))
+
+
+def suggest_frame_size_types(frame: ProductFrame) -> np.ndarray:
+    """Suggested size type codes for every product of frame"""
+    return suggest_size_types(*_dims(frame))
@@ -0,0 +1,37 @@
+# Category tree index
+from .tree import CategoryTree
+# Bulk loading
+from .loader import load_categories
+# Nested intervals
+from .intervals import TreeIntervals, ProductRangeIndex
+# Inherited defaults
+from .defaults import DefaultsResolver
+from .backfill import BackfillResult, backfill_storage, backfill_rows
+# Ordered siblings
+from .siblings import SiblingIndex
+# Visibility views
+from .visibility import InheritedFlag, VisibilityView
+# Planning rollup
+from .rollup import SubtreeAggregate, RollupSummary, PlanningRollup
+# Snapshot
+from .snapshot import SnapshotError, TreeSnapshot, write_snapshot
+
+__all__ = [
+    'CategoryTree',
+    'load_categories',
+    'TreeIntervals',
+    'ProductRangeIndex',
+    'DefaultsResolver',
+    'BackfillResult',
+    'backfill_storage',
+    'backfill_rows',
+    'SiblingIndex',
+    'InheritedFlag',
+    'VisibilityView',
+    'SubtreeAggregate',
+    'RollupSummary',
+    'PlanningRollup',
+    'SnapshotError',
+    'TreeSnapshot',
+    'write_snapshot',
+]
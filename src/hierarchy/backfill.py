@@ -0,0 +1,158 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Mapping, NamedTuple, Optional, Sequence, Union
+from uuid import UUID
+from pydantic import ValidationError
+from pydantic_core import ErrorDetails
+from ..models import BaseProduct, RowError, StorageRequirements
+from ..models.category.compositions import CtgDefaults
+from ..models.product.batch import gc_paused
+from ..models.product.product import check_physical_state_units, check_stgc_requirements
+from ..models.product.trusted import construct_trusted
+from .defaults import DefaultsResolver
+from .tree import timestamp_for
+
+
+# StorageRequirements field and CtgDefaults field it is filled from
+STORAGE_DEFAULTS = {
+    'storage_condition': 'default_storage_condition',
+    'hazard_class': 'default_hazard_class',
+    'temperature_regime': 'default_temperature_regime',
+    'packaging_type': 'default_packaging_type',
+}
+
+# Cross validators of BaseProduct reading storage_requirements, only they are re-run on changed products.
+# Other cross validators do not depend on storage, they passed when product was validated
+STORAGE_VALIDATORS = (check_stgc_requirements, check_physical_state_units)
+
+
+class BackfillResult(NamedTuple):
+    """Indexes of products filled from category defaults and products which defaults conflict with"""
+
+    changed: list[int]
+    conflicts: list[RowError]
+
+
+def _storage_values(defaults: CtgDefaults) -> dict[str, Any]:
+    values = defaults.__dict__
+    return {field: values[default] for field, default in STORAGE_DEFAULTS.items()}
+
+
+def _is_empty(storage: StorageRequirements) -> bool:
+    values = storage.__dict__
+    return all(values[field] is None for field in STORAGE_DEFAULTS)
+
+
+def _value_error(error: ValueError, value: Any, loc: tuple[str, ...] = ('storage_requirements',)) -> ErrorDetails:
+    """Error of cross validator in same shape as pydantic reports it"""
+    return {
+        'type': 'value_error',
+        'loc': loc,
+        'msg': f'Value error, {error}',
+        'input': value,
+        'ctx': {'error': str(error)},
+    }
+
+
+# -------- Products --------
+def backfill_storage(
+    products: Sequence[BaseProduct], resolver: DefaultsResolver, now: Optional[datetime] = None
+) -> BackfillResult:
+    """
+    Fills empty storage_requirements of products from effective defaults of their categories.
+
+    Products are grouped by category_id, defaults are resolved and StorageRequirements
+    is validated once per category. Every product of group gets copy of it and only BaseProduct
+    cross validators depending on storage are re-run for it. Product breaking them is left as it was
+    and reported as conflict. updated_at of changed product is now in timezone of its created_at,
+    never earlier than created_at
+    """
+    groups: defaultdict[UUID, list[int]] = defaultdict(list)
+    for index, product in enumerate(products):
+        if product.category_id is not None and _is_empty(product.storage_requirements):
+            groups[product.category_id].append(index)
+
+    changed: list[int] = []
+    conflicts: list[RowError] = []
+    with gc_paused():
+        for category_id, indexes in groups.items():
+            try:
+                values = _storage_values(resolver.resolve(category_id))
+                filled = {field for field, value in values.items() if value is not None}
+                if not filled:
+                    continue
+                storage = StorageRequirements(**values).__dict__
+            except ValidationError as exc:
+                errors = exc.errors()
+                conflicts.extend(RowError(index, errors) for index in indexes)
+                continue
+            except ValueError as exc:
+                error = _value_error(exc, None)
+                conflicts.extend(RowError(index, [error]) for index in indexes)
+                continue
+
+            for index in indexes:
+                product = products[index]
+                fields = product.__dict__
+                previous = fields['storage_requirements']
+                # Copy of validated composition, products do not share it
+                fields['storage_requirements'] = construct_trusted(StorageRequirements, storage.copy(), set(filled))
+                try:
+                    for validator in STORAGE_VALIDATORS:
+                        validator(product)
+                except ValueError as exc:
+                    fields['storage_requirements'] = previous
+                    conflicts.append(RowError(index, [_value_error(exc, values)]))
+                    continue
+                # updated_at in timezone of created_at and never before it
+                fields['updated_at'] = max(timestamp_for(product.created_at, now), product.created_at)
+                product.__pydantic_fields_set__.update(('storage_requirements', 'updated_at'))
+                changed.append(index)
+
+    conflicts.sort(key=lambda conflict: conflict.position)
+    changed.sort()
+    return BackfillResult(changed, conflicts)
+
+
+# -------- Raw Rows --------
+def backfill_rows(
+    rows: Iterable[Union[Mapping[str, Any], RowError]], resolver: DefaultsResolver
+) -> Iterator[Union[dict[str, Any], RowError]]:
+    """
+    Fills missing traceability.tracking_type, unit_of_measure and empty storage_requirements
+    of nested rows (importer shape) before validation. Validated product always has tracking_type,
+    so it can be filled only here. Rows are copied, input is not changed.
+    Rows are not validated yet: RowError of reader, category_id that is not UUID and compositions
+    that are not dicts are passed as they are, so model validation reports them. Row of category
+    whose inherited defaults are inconsistent is given as RowError (with its position in rows)
+    """
+    for index, row in enumerate(rows):
+        if isinstance(row, RowError):
+            yield row
+            continue
+        category_id = row.get('category_id')
+        traceability = row.get('traceability') or {}
+        storage = row.get('storage_requirements') or {}
+        if not category_id or not isinstance(traceability, Mapping) or not isinstance(storage, Mapping):
+            yield dict(row)
+            continue
+        try:
+            category_id = category_id if isinstance(category_id, UUID) else UUID(str(category_id))
+        except ValueError:
+            yield dict(row)
+            continue
+        try:
+            defaults = resolver.resolve(category_id)
+        except ValueError as exc:
+            yield RowError(index, [_value_error(exc, category_id, ('category_id',))])
+            continue
+        filled = dict(row)
+        if filled.get('unit_of_measure') is None and defaults.default_unit_of_measure is not None:
+            filled['unit_of_measure'] = defaults.default_unit_of_measure
+        if traceability.get('tracking_type') is None and defaults.default_tracking_type is not None:
+            filled['traceability'] = {**traceability, 'tracking_type': defaults.default_tracking_type}
+        if all(storage.get(field) is None for field in STORAGE_DEFAULTS):
+            values = {field: value for field, value in _storage_values(defaults).items() if value is not None}
+            if values:
+                filled['storage_requirements'] = values
+        yield filled
@@ -0,0 +1,110 @@
+from typing import Mapping, Optional
+from uuid import UUID
+from ..models.category.compositions import CtgDefaults
+from ..models.diagnostics import diagnostics_disabled
+from .tree import CategoryTree
+
+
+# Fields inherited only together: hazard class is valid only with HAZARDOUS storage condition
+# and unit of measure is checked against tracking type, so category setting one of them overrides both
+INHERITED_GROUPS = (
+    ('default_storage_condition', 'default_hazard_class'),
+    ('default_tracking_type', 'default_unit_of_measure'),
+)
+_GROUP_OF = {name: group for group in INHERITED_GROUPS for name in group}
+
+EMPTY_DEFAULTS = CtgDefaults()
+
+
+class DefaultsResolver:
+    """
+    Effective CtgDefaults of categories: own defaults merged over ones inherited from parent_id chain,
+    nearest set value wins. Results are memoized per category, change of category defaults
+    drops memo of its subtree only, structure change of tree drops whole memo.
+    Models are mutable, so resolver keeps own copies of given defaults and hands out copies of memo
+    """
+
+    __slots__ = ('tree', 'defaults', '_memo', '_version')
+
+    def __init__(self, tree: CategoryTree, defaults: Optional[Mapping[UUID, CtgDefaults]] = None) -> None:
+        self.tree = tree
+        self.defaults: dict[UUID, CtgDefaults] = {
+            category_id: own.model_copy() for category_id, own in (defaults or {}).items()
+        }
+        self._memo: dict[UUID, CtgDefaults] = {}
+        self._version = tree.version
+
+    # -------- Own Defaults --------
+    def set_defaults(self, category_id: UUID, defaults: Optional[CtgDefaults]) -> None:
+        """Sets own defaults of category (None removes them) and invalidates its subtree"""
+        if defaults is None:
+            self.defaults.pop(category_id, None)
+        else:
+            self.defaults[category_id] = defaults.model_copy()
+        self.invalidate(category_id)
+
+    def invalidate(self, category_id: UUID) -> None:
+        """
+        Drops memo of category subtree. Memo of category implies memo of its whole ancestor chain,
+        so walk stops at first category which is not memoized
+        """
+        memo = self._memo
+        if category_id not in memo:
+            return
+        stack = [category_id]
+        while stack:
+            node = stack.pop()
+            if memo.pop(node, None) is not None:
+                stack.extend(self.tree.children(node))
+
+    # -------- Resolving --------
+    def resolve(self, category_id: Optional[UUID]) -> CtgDefaults:
+        """
+        Effective defaults of category (new copy, changing it does not affect resolver),
+        memo hit after first call. Category out of tree has no defaults
+        """
+        return self._resolve(category_id).model_copy()
+
+    def _resolve(self, category_id: Optional[UUID]) -> CtgDefaults:
+        if self._version != self.tree.version:
+            self._memo.clear()
+            self._version = self.tree.version
+        if category_id is None or category_id not in self.tree:
+            return EMPTY_DEFAULTS
+        effective = self._memo.get(category_id)
+        if effective is not None:
+            return effective
+
+        # Chain up to nearest memoized ancestor, then merged downwards memoizing every category
+        chain = [category_id]
+        effective = EMPTY_DEFAULTS
+        for node in self.tree.ancestors(category_id):
+            memoized = self._memo.get(node)
+            if memoized is not None:
+                effective = memoized
+                break
+            chain.append(node)
+        for node in reversed(chain):
+            effective = self._merge(effective, self.defaults.get(node), node)
+            self._memo[node] = effective
+        return effective
+
+    @staticmethod
+    def _merge(inherited: CtgDefaults, own: Optional[CtgDefaults], category_id: UUID) -> CtgDefaults:
+        if own is None:
+            return inherited
+        values = dict(inherited.__dict__)
+        overridden = set()
+        for name, value in own.__dict__.items():
+            if value is None:
+                continue
+            for field in _GROUP_OF.get(name, (name,)):
+                if field not in overridden:
+                    values[field] = own.__dict__[field]
+                    overridden.add(field)
+        try:
+            # Merged values are validated once per memo, recommendations were given for own defaults
+            with diagnostics_disabled():
+                return CtgDefaults.model_validate(values)
+        except ValueError as error:
+            raise ValueError(f'Inherited defaults of category {category_id} are inconsistent: {error}') from error
@@ -0,0 +1,148 @@
+from types import MappingProxyType
+from typing import Mapping, Sequence
+from uuid import UUID
+import numpy as np
+from ..models import BaseProduct
+from .tree import CategoryTree
+
+
+class TreeIntervals:
+    """
+    Nested interval (Euler tour) numbering of CategoryTree.
+
+    Categories are numbered in pre-order, so subtree of category is contiguous
+    interval [enter, last] of numbers and descendant check is two integer comparisons.
+    Numbering is rebuilt lazily, on first use after tree.version has changed
+    """
+
+    __slots__ = ('tree', 'order', '_enter', '_last', '_version')
+
+    def __init__(self, tree: CategoryTree) -> None:
+        self.tree = tree
+        self.order: list[UUID] = []
+        self._enter: dict[UUID, int] = {}
+        self._last: list[int] = []
+        self._version = -1
+
+    @property
+    def version(self) -> int:
+        """Tree version numbering is built for"""
+        self.refresh()
+        return self._version
+
+    def refresh(self) -> None:
+        """Renumbers tree when it was changed, O(n)"""
+        if self._version == self.tree.version:
+            return
+        order = list(self.tree.subtree())
+        enter = {category_id: number for number, category_id in enumerate(order)}
+        # Subtree sizes are summed bottom-up: in reversed pre-order children come before parent
+        sizes = [1] * len(order)
+        categories = self.tree.categories
+        for number in range(len(order) - 1, 0, -1):
+            parent_id = categories[order[number]].parent_id
+            if parent_id is not None:
+                sizes[enter[parent_id]] += sizes[number]
+        self.order = order
+        self._enter = enter
+        self._last = [number + size - 1 for number, size in enumerate(sizes)]
+        self._version = self.tree.version
+
+    # -------- Lookups --------
+    @property
+    def numbers(self) -> Mapping[UUID, int]:
+        """Pre-order number of every reachable category (read-only view)"""
+        self.refresh()
+        return MappingProxyType(self._enter)
+
+    def enter(self, category_id: UUID) -> int:
+        """Pre-order number of category, -1 when it is not reachable from roots"""
+        self.refresh()
+        return self._enter.get(category_id, -1)
+
+    def interval(self, category_id: UUID) -> tuple[int, int]:
+        """Numbers [enter, last] of category subtree, both inclusive"""
+        self.refresh()
+        enter = self._enter[category_id]
+        return enter, self._last[enter]
+
+    def is_descendant(self, category_id: UUID, ancestor_id: UUID, include_self: bool = False) -> bool:
+        """Whether category is under ancestor"""
+        self.refresh()
+        number = self._enter.get(category_id)
+        enter = self._enter.get(ancestor_id)
+        if number is None or enter is None:
+            return False
+        if include_self:
+            return enter <= number <= self._last[enter]
+        return enter < number <= self._last[enter]
+
+    def subtree(self, category_id: UUID) -> list[UUID]:
+        """Ids of category subtree as one slice of pre-order"""
+        enter, last = self.interval(category_id)
+        return self.order[enter : last + 1]
+
+
+class ProductRangeIndex:
+    """
+    Products sorted by pre-order number of their category.
+    Products under category are one contiguous range of index found by two binary searches.
+    Products without category or with category out of tree are never in range
+    """
+
+    __slots__ = ('intervals', 'products', '_keys', '_positions', '_product_keys', '_version')
+
+    def __init__(self, intervals: TreeIntervals, products: Sequence[BaseProduct]) -> None:
+        self.intervals = intervals
+        self.products = products
+        self._keys = np.empty(0, np.int64)
+        self._positions = np.empty(0, np.intp)
+        self._product_keys = np.empty(0, np.int64)
+        self._version = -1
+
+    def refresh(self) -> None:
+        """Re-sorts products when tree numbering has changed, O(n log n)"""
+        version = self.intervals.version
+        if self._version == version:
+            return
+        enter = self.intervals.numbers
+        keys = np.fromiter(
+            (-1 if product.category_id is None else enter.get(product.category_id, -1) for product in self.products),
+            np.int64,
+            len(self.products),
+        )
+        positions = np.argsort(keys, kind='stable')
+        self._keys = keys[positions]
+        self._positions = positions
+        self._product_keys = keys
+        self._version = version
+
+    @property
+    def version(self) -> int:
+        """Tree version products are sorted for"""
+        self.refresh()
+        return self._version
+
+    def category_keys(self) -> np.ndarray:
+        """Pre-order number of category of every product in products order, -1 when out of tree"""
+        self.refresh()
+        return self._product_keys
+
+    def positions(self, category_id: UUID) -> np.ndarray:
+        """Indexes of products (in products sequence) under category and in category itself"""
+        self.refresh()
+        if self.intervals.enter(category_id) < 0:
+            return self._positions[:0]
+        enter, last = self.intervals.interval(category_id)
+        start = np.searchsorted(self._keys, enter, 'left')
+        stop = np.searchsorted(self._keys, last, 'right')
+        return self._positions[start:stop]
+
+    def count(self, category_id: UUID) -> int:
+        """Number of products under category"""
+        return len(self.positions(category_id))
+
+    def products_under(self, category_id: UUID) -> list[BaseProduct]:
+        """Products of category and all its descendants"""
+        products = self.products
+        return [products[position] for position in self.positions(category_id).tolist()]
@@ -0,0 +1,150 @@
+from collections import deque
+from typing import Any, Iterable, Mapping, Optional, Union
+from uuid import UUID
+from pydantic import ValidationError
+from pydantic_core import ErrorDetails
+from ..models import BatchResult, Category, RowError
+from ..models.product.batch import gc_paused
+from .tree import PATH_SEP, CategoryTree, PATHS
+
+
+def _row_id(row: Any) -> Optional[UUID]:
+    """Id of rejected row, None when row is not mapping or has no valid id"""
+    if not isinstance(row, Mapping):
+        return None
+    try:
+        return UUID(str(row['id']))
+    except (KeyError, ValueError):
+        return None
+
+
+def _error(kind: str, field: str, message: str, value: Any) -> ErrorDetails:
+    return {'type': kind, 'loc': (field,), 'msg': message, 'input': value}
+
+
+def load_categories(
+    rows: Iterable[Union[Mapping[str, Any], Category]], tree: Optional[CategoryTree] = None
+) -> BatchResult:
+    """
+    Validates batch of category rows and checks it as hierarchy in O(n):
+    duplicate sku and id, parent_id pointing out of batch and tree (orphan), parent_id cycles.
+    Categories depending on rejected one are rejected too. Valid categories get level and path
+    in same pass and are added to tree when it is given (existing categories of tree can be parents).
+    Returns valid categories in input order and errors per offending row
+    """
+    validate = Category.__pydantic_validator__.validate_python
+    errors: dict[int, list[ErrorDetails]] = {}
+    candidates: dict[UUID, tuple[int, Category]] = {}
+    rejected: set[UUID] = set()
+    skus: set[str] = {category.sku for category in tree.categories.values()} if tree is not None else set()
+    existing = tree.categories if tree is not None else {}
+
+    with gc_paused():
+        # -------- Rows --------
+        for index, row in enumerate(rows):
+            if isinstance(row, Category):
+                category = row
+            else:
+                try:
+                    category = validate(row)
+                except ValidationError as exc:
+                    errors[index] = exc.errors()
+                    # Children of invalid row are reported as depending on it, not as orphans
+                    row_id = _row_id(row)
+                    if row_id is not None:
+                        rejected.add(row_id)
+                    continue
+            if category.id in candidates or category.id in existing:
+                errors[index] = [_error('duplicate_id', 'id', f'Category id {category.id} is duplicated', category.id)]
+            elif category.sku in skus:
+                errors[index] = [
+                    _error('duplicate_sku', 'sku', f'Category sku {category.sku} is duplicated', category.sku)
+                ]
+                rejected.add(category.id)
+            else:
+                skus.add(category.sku)
+                candidates[category.id] = (index, category)
+
+        # -------- Reachable Categories --------
+        children: dict[UUID, list[UUID]] = {}
+        queue: deque[tuple[UUID, int, str]] = deque()
+        for category_id, (_, category) in candidates.items():
+            parent_id = category.parent_id
+            if parent_id is None:
+                queue.append((category_id, 0, ''))
+            elif parent_id in existing:
+                parent = existing[parent_id]
+                queue.append((category_id, (parent.level or 0) + 1, parent.path or ''))
+            else:
+                children.setdefault(parent_id, []).append(category_id)
+
+        reached: list[tuple[int, Category, int, str]] = []
+        while queue:
+            category_id, level, parent_path = queue.popleft()
+            index, category = candidates[category_id]
+            path = parent_path + PATH_SEP + category.sku
+            reached.append((index, category, level, path))
+            for child in children.get(category_id, ()):
+                queue.append((child, level + 1, path))
+
+        # -------- Orphans and Cycles --------
+        # Not reached categories lead by parent_id chain to missing parent or to cycle,
+        # every category is walked once: chains stop at already classified ones
+        reached_ids = {category.id for _, category, _, _ in reached}
+        classified: dict[UUID, str] = {}
+        for category_id in candidates:
+            if category_id in reached_ids or category_id in classified:
+                continue
+            chain: list[UUID] = []
+            on_chain: dict[UUID, int] = {}
+            node: Optional[UUID] = category_id
+            while node in candidates and node not in classified and node not in on_chain:
+                on_chain[node] = len(chain)
+                chain.append(node)
+                node = candidates[node][1].parent_id
+
+            kinds = ['parent_invalid'] * len(chain)
+            if node in on_chain:
+                for position in range(on_chain[node], len(chain)):
+                    kinds[position] = 'parent_cycle'
+            elif node not in candidates and node not in rejected:
+                kinds[-1] = 'parent_missing'
+            for node_id, kind in zip(chain, kinds):
+                classified[node_id] = kind
+                node_index, node_category = candidates[node_id]
+                errors[node_index] = [_parent_error(kind, node_category.parent_id)]
+
+        # -------- Level and Path --------
+        try:
+            PATHS.validate_python([path for _, _, _, path in reached])
+            too_long: set[int] = set()
+        except ValidationError as exc:
+            too_long = {error['loc'][0] for error in exc.errors()}  # type: ignore[misc]
+        valid: list[tuple[int, Category]] = []
+        for position, (index, category, level, path) in enumerate(reached):
+            if position in too_long:
+                # Descendants have longer path, they are rejected same way
+                errors[index] = [_error('string_too_long', 'path', 'Path of category is too long', path)]
+                continue
+            values = category.__dict__
+            values['level'] = level
+            values['path'] = path
+            category.__pydantic_fields_set__.update(('level', 'path'))
+            valid.append((index, category))
+
+    valid.sort(key=lambda item: item[0])
+    categories = [category for _, category in valid]
+    if tree is not None:
+        for category in categories:
+            tree.add(category)
+    return BatchResult(categories, [RowError(index, errors[index]) for index in sorted(errors)])
+
+
+def _parent_error(kind: str, parent_id: Optional[UUID]) -> ErrorDetails:
+    if kind == 'parent_missing':
+        message = f'Parent category {parent_id} does not exist'
+    elif kind == 'parent_cycle':
+        message = 'Category is part of parent_id cycle'
+    else:
+        message = 'Parent category or one of its ancestors is invalid'
+    return _error(kind, 'parent_id', message, parent_id)
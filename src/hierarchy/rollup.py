@@ -0,0 +1,183 @@
+import heapq
+from math import inf
+from typing import Mapping, NamedTuple, Optional
+from uuid import UUID
+from ..models.category.compositions.planning import CtgPlanning
+from .tree import CategoryTree
+
+
+# CtgPlanning thresholds which are rolled up, stock is current quantity on hand
+THRESHOLDS = ('min_stock_level', 'max_stock_level', 'reorder_point', 'safety_stock')
+STOCK = 'stock'
+METRICS = (*THRESHOLDS, STOCK)
+
+
+class SubtreeAggregate:
+    """
+    Sum and minimum of one value over every category subtree.
+
+    Change of one category value walks only its ancestors: sum is updated by delta,
+    minimum through heap of children minimums per category (stale entries are dropped lazily),
+    so update is O(depth * log children). Categories without value count as 0 in sum
+    and are skipped by minimum. Aggregate is rebuilt in O(n) after tree structure has changed
+    """
+
+    __slots__ = ('tree', 'values', '_sums', '_mins', '_heaps', '_version')
+
+    def __init__(self, tree: CategoryTree) -> None:
+        self.tree = tree
+        self.values: dict[UUID, float] = {}
+        self._sums: dict[UUID, float] = {}
+        self._mins: dict[UUID, float] = {}
+        self._heaps: dict[UUID, list[tuple[float, UUID]]] = {}
+        self._version = -1
+
+    # -------- Reading --------
+    def sum(self, category_id: UUID) -> float:
+        self._check_version()
+        return self._sums.get(category_id, 0.0)
+
+    def min(self, category_id: UUID) -> Optional[float]:
+        """Minimum over subtree, None when no category of subtree has value"""
+        self._check_version()
+        minimum = self._mins.get(category_id, inf)
+        return None if minimum == inf else minimum
+
+    # -------- Updating --------
+    def set(self, category_id: UUID, value: Optional[float]) -> None:
+        """Sets value of category (None removes it) and updates its ancestors"""
+        self._check_version()
+        previous = self.values.pop(category_id, None)
+        if value is not None:
+            self.values[category_id] = value
+        if category_id not in self.tree:
+            return
+        delta = (value or 0.0) - (previous or 0.0)
+        sums, mins, parent_of = self._sums, self._mins, self.tree.parent
+
+        node: Optional[UUID] = category_id
+        minimum: Optional[float] = self._own_min(category_id)
+        while node is not None and node in self.tree:
+            sums[node] = sums.get(node, 0.0) + delta
+            parent = parent_of(node)
+            if minimum is not None:
+                changed = mins.get(node, inf) != minimum
+                mins[node] = minimum
+                if changed and parent is not None and parent in self.tree:
+                    heapq.heappush(self._heaps.setdefault(parent, []), (minimum, node))
+                    minimum = self._own_min(parent)
+                else:
+                    # Minimums of ancestors stay the same, only sums go further
+                    minimum = None
+            node = parent
+
+    def _own_min(self, category_id: UUID) -> float:
+        """Minimum of category value and its children minimums, stale heap entries are popped"""
+        own = self.values.get(category_id, inf)
+        heap = self._heaps.get(category_id)
+        if not heap:
+            return own
+        mins = self._mins
+        while heap and mins.get(heap[0][1], inf) != heap[0][0]:
+            heapq.heappop(heap)
+        if len(heap) > 2 * len(self.tree.children(category_id)) + 8:
+            self._heaps[category_id] = heap = self._children_heap(category_id)
+        return min(own, heap[0][0]) if heap else own
+
+    def _children_heap(self, category_id: UUID) -> list[tuple[float, UUID]]:
+        mins = self._mins
+        heap = [(mins[child], child) for child in self.tree.children(category_id) if mins.get(child, inf) != inf]
+        heapq.heapify(heap)
+        return heap
+
+    # -------- Rebuilding --------
+    def _check_version(self) -> None:
+        if self._version != self.tree.version:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recomputes all sums and minimums bottom-up, O(n)"""
+        sums: dict[UUID, float] = {}
+        mins: dict[UUID, float] = {}
+        heaps: dict[UUID, list[tuple[float, UUID]]] = {}
+        self._sums, self._mins, self._heaps = sums, mins, heaps
+        # In reversed pre-order children always come before parent
+        for node in reversed(list(self.tree.subtree())):
+            children = self.tree.children(node)
+            own = self.values.get(node)
+            sums[node] = (own or 0.0) + sum(sums[child] for child in children)
+            if children:
+                heaps[node] = heap = self._children_heap(node)
+                mins[node] = min(own if own is not None else inf, heap[0][0] if heap else inf)
+            else:
+                mins[node] = own if own is not None else inf
+        self._version = self.tree.version
+
+
+class RollupSummary(NamedTuple):
+    """Subtree totals and minimums of planning thresholds and stock of category"""
+
+    sums: dict[str, float]
+    mins: dict[str, Optional[float]]
+
+    @property
+    def needs_reorder(self) -> bool:
+        """Stock of subtree is at or below total reorder point"""
+        return self.sums['reorder_point'] > 0 and self.sums[STOCK] <= self.sums['reorder_point']
+
+    @property
+    def below_safety(self) -> bool:
+        return self.sums[STOCK] < self.sums['safety_stock']
+
+    @property
+    def over_max(self) -> bool:
+        return self.sums['max_stock_level'] > 0 and self.sums[STOCK] > self.sums['max_stock_level']
+
+
+class PlanningRollup:
+    """
+    Rollup of CtgPlanning stock thresholds and current stock over category tree.
+    Thresholds and stock are set per category, every change updates ancestors only
+    """
+
+    __slots__ = ('tree', 'aggregates')
+
+    def __init__(
+        self,
+        tree: CategoryTree,
+        planning: Optional[Mapping[UUID, CtgPlanning]] = None,
+        stock: Optional[Mapping[UUID, float]] = None,
+    ) -> None:
+        self.tree = tree
+        self.aggregates = {metric: SubtreeAggregate(tree) for metric in METRICS}
+        for category_id, settings in (planning or {}).items():
+            for name in THRESHOLDS:
+                value = getattr(settings, name)
+                if value is not None:
+                    self.aggregates[name].values[category_id] = value
+        if stock:
+            self.aggregates[STOCK].values.update(stock)
+        # Initial values are aggregated in one bottom-up pass
+        for aggregate in self.aggregates.values():
+            aggregate.rebuild()
+
+    def set_planning(self, category_id: UUID, planning: Optional[CtgPlanning]) -> None:
+        """Sets planning thresholds of category, None removes them"""
+        for name in THRESHOLDS:
+            self.aggregates[name].set(category_id, getattr(planning, name) if planning is not None else None)
+
+    def set_stock(self, category_id: UUID, quantity: Optional[float]) -> None:
+        """Sets current stock quantity of category (products directly in category)"""
+        self.aggregates[STOCK].set(category_id, quantity)
+
+    def add_stock(self, category_id: UUID, delta: float) -> None:
+        """Changes stock of category by delta (receipt is positive, shipment is negative)"""
+        stock = self.aggregates[STOCK]
+        self.set_stock(category_id, stock.values.get(category_id, 0.0) + delta)
+
+    def summary(self, category_id: UUID) -> RollupSummary:
+        """Totals and minimums over category subtree"""
+        return RollupSummary(
+            {metric: aggregate.sum(category_id) for metric, aggregate in self.aggregates.items()},
+            {metric: aggregate.min(category_id) for metric, aggregate in self.aggregates.items()},
+        )
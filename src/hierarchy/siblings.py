@@ -0,0 +1,279 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+from itertools import chain
+from typing import Iterable, Iterator, Optional
+from uuid import UUID
+from ..models import Category
+from .tree import CategoryTree, timestamp_for
+
+
+# Position key of category among siblings, sku and id break sort_order ties
+SiblingKey = tuple[int, str, UUID]
+
+# Keys per bucket of SortedKeys: bucket is split above twice of it and joined with neighbour below half of it
+_LOAD = 512
+
+
+def sibling_key(category: Category) -> SiblingKey:
+    return category.sort_order or 0, category.sku, category.id
+
+
+class SortedKeys:
+    """
+    Sorted sibling keys kept in buckets of at most 2 * _LOAD keys.
+
+    Last key of every bucket is kept for binary search of bucket and Fenwick tree over bucket lengths
+    gives number of keys before bucket, so add, remove, index and position lookups are O(log n)
+    plus shift inside one bucket. Buckets are split and joined as they grow and shrink
+    """
+
+    __slots__ = ('_buckets', '_maxes', '_counts', '_len')
+
+    def __init__(self, keys: Iterable[SiblingKey] = ()) -> None:
+        ordered = sorted(keys)
+        self._buckets = [ordered[start : start + _LOAD] for start in range(0, len(ordered), _LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+        self._counts: list[int] = []
+        self._rebuild()
+
+    # -------- Bucket Positions --------
+    def _rebuild(self) -> None:
+        """Builds Fenwick tree of bucket lengths in O(buckets), after buckets are split or joined"""
+        counts = [0] * (len(self._buckets) + 1)
+        for node, bucket in enumerate(self._buckets, 1):
+            counts[node] += len(bucket)
+            parent = node + (node & -node)
+            if parent < len(counts):
+                counts[parent] += counts[node]
+        self._counts = counts
+
+    def _resize(self, bucket: int, delta: int) -> None:
+        counts = self._counts
+        node = bucket + 1
+        while node < len(counts):
+            counts[node] += delta
+            node += node & -node
+
+    def _offset(self, bucket: int) -> int:
+        """Number of keys in buckets before bucket"""
+        counts = self._counts
+        total = 0
+        node = bucket
+        while node:
+            total += counts[node]
+            node -= node & -node
+        return total
+
+    def _locate(self, position: int) -> tuple[int, int]:
+        """Bucket of key at position and position of key in it"""
+        counts = self._counts
+        bucket = 0
+        step = 1 << (len(counts) - 1).bit_length() >> 1
+        while step:
+            node = bucket + step
+            if node < len(counts) and counts[node] <= position:
+                bucket = node
+                position -= counts[node]
+            step >>= 1
+        return bucket, position
+
+    # -------- Lookups --------
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[SiblingKey]:
+        return chain.from_iterable(self._buckets)
+
+    def __getitem__(self, position: int) -> SiblingKey:
+        if position < 0:
+            position += self._len
+        if not 0 <= position < self._len:
+            raise IndexError('SortedKeys index out of range')
+        bucket, position = self._locate(position)
+        return self._buckets[bucket][position]
+
+    def bisect_left(self, key: SiblingKey) -> int:
+        """Position of key, or where it would be inserted"""
+        bucket = bisect_left(self._maxes, key)
+        if bucket == len(self._maxes):
+            return self._len
+        return self._offset(bucket) + bisect_left(self._buckets[bucket], key)
+
+    def islice(self, start: int = 0, stop: Optional[int] = None) -> Iterator[SiblingKey]:
+        """Keys from start to stop (end when None) without copying whole list"""
+        remaining = (self._len if stop is None else min(stop, self._len)) - start
+        if remaining <= 0:
+            return
+        bucket, position = self._locate(start)
+        while remaining > 0:
+            keys = self._buckets[bucket][position : position + remaining]
+            yield from keys
+            remaining -= len(keys)
+            bucket += 1
+            position = 0
+
+    # -------- Changes --------
+    def add(self, key: SiblingKey) -> None:
+        buckets, maxes = self._buckets, self._maxes
+        self._len += 1
+        if not buckets:
+            buckets.append([key])
+            maxes.append(key)
+            self._rebuild()
+            return
+        bucket = bisect_left(maxes, key)
+        if bucket == len(maxes):
+            bucket -= 1
+            buckets[bucket].append(key)
+            maxes[bucket] = key
+        else:
+            insort(buckets[bucket], key)
+        keys = buckets[bucket]
+        if len(keys) > 2 * _LOAD:
+            buckets.insert(bucket + 1, keys[_LOAD:])
+            del keys[_LOAD:]
+            maxes.insert(bucket, keys[-1])
+            self._rebuild()
+        else:
+            self._resize(bucket, 1)
+
+    def remove(self, key: SiblingKey) -> None:
+        """Removes key, ValueError when it is not in list"""
+        buckets, maxes = self._buckets, self._maxes
+        bucket = bisect_left(maxes, key)
+        keys = buckets[bucket] if bucket < len(buckets) else []
+        position = bisect_left(keys, key)
+        if position == len(keys) or keys[position] != key:
+            raise ValueError(f'{key} is not in SortedKeys')
+        del keys[position]
+        self._len -= 1
+        if len(keys) >= _LOAD // 2 or len(buckets) == 1 and keys:
+            maxes[bucket] = keys[-1]
+            self._resize(bucket, -1)
+            return
+        # Short bucket is joined with its neighbour, joined one is split again when it is too long
+        first = bucket if bucket + 1 < len(buckets) else bucket - 1
+        if first < 0:
+            buckets.clear()
+            maxes.clear()
+        else:
+            joined = buckets[first] + buckets[first + 1]
+            parts = [joined[: len(joined) // 2], joined[len(joined) // 2 :]] if len(joined) > 2 * _LOAD else [joined]
+            buckets[first : first + 2] = parts
+            maxes[first : first + 2] = [part[-1] for part in parts]
+        self._rebuild()
+
+
+class SiblingIndex:
+    """
+    Children of every parent ordered by Category.sort_order.
+
+    Children of parent are sorted once, on first use, and kept in SortedKeys afterwards:
+    insert, remove and move are O(log n), rank and position lookups are O(log n),
+    page is O(log n + limit). Structure change of tree made not through index drops sorted children
+    """
+
+    __slots__ = ('tree', '_siblings', '_version')
+
+    def __init__(self, tree: CategoryTree) -> None:
+        self.tree = tree
+        self._siblings: dict[Optional[UUID], SortedKeys] = {}
+        self._version = tree.version
+
+    def _sync(self) -> None:
+        if self._version != self.tree.version:
+            self._siblings.clear()
+            self._version = self.tree.version
+
+    def siblings(self, parent_id: Optional[UUID]) -> SortedKeys:
+        """Sorted keys of children of parent (None for roots), keys must not be changed"""
+        self._sync()
+        siblings = self._siblings.get(parent_id)
+        if siblings is None:
+            categories = self.tree.categories
+            children = self.tree.children(parent_id) if parent_id is not None else self.tree.roots()
+            siblings = self._siblings[parent_id] = SortedKeys(sibling_key(categories[child]) for child in children)
+        return siblings
+
+    # -------- Lookups --------
+    def count(self, parent_id: Optional[UUID]) -> int:
+        return len(self.siblings(parent_id))
+
+    def rank(self, category_id: UUID) -> int:
+        """Position of category among its siblings"""
+        category = self.tree[category_id]
+        return self.siblings(category.parent_id).bisect_left(sibling_key(category))
+
+    def at(self, parent_id: Optional[UUID], position: int) -> UUID:
+        """Id of child at position"""
+        return self.siblings(parent_id)[position][2]
+
+    def page(self, parent_id: Optional[UUID], offset: int = 0, limit: int = 50) -> list[UUID]:
+        """Ids of children from offset in sort_order"""
+        return [key[2] for key in self.siblings(parent_id).islice(offset, offset + limit)]
+
+    # -------- Changes --------
+    def add(self, category: Category) -> int:
+        """Adds category to tree and index, returns its position among siblings"""
+        siblings = self.siblings(category.parent_id)
+        self.tree.add(category)
+        self._version = self.tree.version
+        key = sibling_key(category)
+        siblings.add(key)
+        return siblings.bisect_left(key)
+
+    def remove(self, category_id: UUID) -> list[Category]:
+        """Removes category subtree from tree and index"""
+        category = self.tree[category_id]
+        siblings = self.siblings(category.parent_id)
+        removed = self.tree.remove(category_id)
+        self._version = self.tree.version
+        siblings.remove(sibling_key(category))
+        for node in removed:
+            self._siblings.pop(node.id, None)
+        return removed
+
+    def move_to(self, category_id: UUID, position: int, now: Optional[datetime] = None) -> list[UUID]:
+        """
+        Moves category to position among its siblings (drag and drop) and renumbers sort_order.
+        Moved category gets value between its new neighbours, when there is no free value
+        only following siblings colliding with it are shifted by one.
+        Returns ids of categories which sort_order has changed
+        """
+        category = self.tree[category_id]
+        siblings = self.siblings(category.parent_id)
+        siblings.remove(sibling_key(category))
+        position = max(0, min(position, len(siblings)))
+        before = siblings[position - 1][0] if position > 0 else None
+        after = siblings[position][0] if position < len(siblings) else None
+
+        if before is None:
+            value = after - 1 if after else 0
+        elif after is not None and after - before >= 2:
+            value = (before + after) // 2
+        else:
+            value = before + 1
+
+        # Following siblings are shifted until first one which is already greater
+        renumbered = [(category, value)]
+        current = value
+        for key in siblings.islice(position):
+            if key[0] > current:
+                break
+            current += 1
+            renumbered.append((self.tree[key[2]], current))
+
+        changed = []
+        for node, sort_order in renumbered:
+            if node is not category:
+                siblings.remove(sibling_key(node))
+            if node.sort_order != sort_order:
+                # Values are non-negative ints by construction, validate_assignment is not needed
+                node.__dict__['sort_order'] = sort_order
+                node.__dict__['updated_at'] = max(timestamp_for(node.created_at, now), node.created_at)
+                node.__pydantic_fields_set__.update(('sort_order', 'updated_at'))
+                changed.append(node.id)
+        for node, _ in renumbered:
+            siblings.add(sibling_key(node))
+        return changed
@@ -0,0 +1,342 @@
+import struct
+from datetime import datetime, timedelta, timezone
+from os import PathLike
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Union
+from uuid import UUID
+import numpy as np
+from ..models import Category
+from ..models.product.batch import gc_paused
+from ..models.product.trusted import construct_trusted
+from .intervals import TreeIntervals
+from .tree import CategoryTree
+
+
+# -------- File Layout --------
+# magic, format version, number of categories, then offset of every section.
+# Sections are 8 byte aligned, so they are mapped as NumPy arrays without copying
+MAGIC = b'WMST'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xQ')
+ALIGN = 8
+
+# Text fields of category, stored in one UTF-8 blob
+TEXT_FIELDS = ('sku', 'name', 'description', 'path')
+
+
+class Section(NamedTuple):
+    name: str
+    dtype: np.dtype
+    per_category: int  # items per category, 0 for blob
+
+
+# Categories are stored in pre-order: index of category is its interval enter number
+SECTIONS = (
+    Section('ids', np.dtype('S16'), 1),
+    Section('parents', np.dtype('<i4'), 1),  # index of parent, -1 for root
+    Section('lasts', np.dtype('<i4'), 1),  # last index of subtree (interval end)
+    Section('levels', np.dtype('<i8'), 1),  # -1 is None
+    Section('sort_orders', np.dtype('<i8'), 1),  # -1 is None
+    Section('flags', np.dtype('u1'), 1),
+    Section('created', np.dtype('<i8'), 1),  # micros since epoch
+    Section('updated', np.dtype('<i8'), 1),
+    Section('sorted_ids', np.dtype('S16'), 1),  # ids sorted, for binary search of index by id
+    Section('sorted_indexes', np.dtype('<i4'), 1),
+    Section('text_offsets', np.dtype('<i8'), len(TEXT_FIELDS)),  # + 1 closing offset
+    Section('texts', np.dtype('u1'), 0),
+)
+SECTION_TABLE = struct.Struct(f'<{len(SECTIONS)}Q')
+
+F_ACTIVE = 1 << 0
+F_DELETED = 1 << 1
+F_AWARE = 1 << 2  # timestamps are timezone aware (UTC micros)
+F_NO_DESCRIPTION = 1 << 3
+F_NO_PATH = 1 << 4
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+_CATEGORY_FIELDS = set(Category.model_fields)
+
+
+class SnapshotError(ValueError):
+    """File is not valid category tree snapshot"""
+
+
+def _aligned(size: int) -> int:
+    return -size % ALIGN
+
+
+# -------- Writing --------
+def write_snapshot(tree: CategoryTree, file: Union[str, PathLike, BinaryIO]) -> int:
+    """
+    Writes categories reachable from roots of tree as snapshot, returns number of categories.
+    file is path or binary file object
+    """
+    intervals = TreeIntervals(tree)
+    intervals.refresh()
+    order = intervals.order
+    size = len(order)
+    index = {category_id: number for number, category_id in enumerate(order)}
+
+    columns: dict[str, list] = {section.name: [] for section in SECTIONS if section.per_category}
+    texts: list[bytes] = []
+    offsets = [0]
+    for category_id in order:
+        category = tree[category_id]
+        flags = (F_ACTIVE if category.is_active else 0) | (F_DELETED if category.is_deleted else 0)
+        if category.description is None:
+            flags |= F_NO_DESCRIPTION
+        if category.path is None:
+            flags |= F_NO_PATH
+        if category.created_at.tzinfo is not None:
+            flags |= F_AWARE
+        epoch = EPOCH_UTC if flags & F_AWARE else EPOCH
+        columns['ids'].append(category_id.bytes)
+        parent_id = category.parent_id
+        columns['parents'].append(index.get(parent_id, -1) if parent_id is not None else -1)
+        columns['lasts'].append(intervals.interval(category_id)[1])
+        columns['levels'].append(-1 if category.level is None else category.level)
+        columns['sort_orders'].append(-1 if category.sort_order is None else category.sort_order)
+        columns['flags'].append(flags)
+        columns['created'].append((category.created_at - epoch) // MICROSECOND)
+        columns['updated'].append((category.updated_at - epoch) // MICROSECOND)
+        for name in TEXT_FIELDS:
+            raw = (getattr(category, name) or '').encode('utf-8')
+            texts.append(raw)
+            offsets.append(offsets[-1] + len(raw))
+
+    ids = np.array(columns['ids'], dtype='S16') if size else np.empty(0, 'S16')
+    sorted_indexes = np.argsort(ids, kind='stable').astype('<i4')
+    arrays = {name: np.array(values, dtype=section_dtype(name)) for name, values in columns.items()}
+    arrays['ids'] = ids
+    arrays['sorted_ids'] = ids[sorted_indexes]
+    arrays['sorted_indexes'] = sorted_indexes
+    arrays['text_offsets'] = np.array(offsets, dtype='<i8')
+    arrays['texts'] = np.frombuffer(b''.join(texts), dtype='u1')
+
+    chunks = []
+    table = []
+    position = HEADER.size + SECTION_TABLE.size
+    position += _aligned(position)
+    for section in SECTIONS:
+        raw = arrays[section.name].tobytes()
+        table.append(position)
+        chunks.append(raw + b'\0' * _aligned(len(raw)))
+        position += len(raw) + _aligned(len(raw))
+
+    head = HEADER.pack(MAGIC, VERSION, size) + SECTION_TABLE.pack(*table)
+    data = head + b'\0' * _aligned(len(head)) + b''.join(chunks)
+    if hasattr(file, 'write'):
+        file.write(data)  # type: ignore[union-attr]
+    else:
+        with open(file, 'wb') as output:  # type: ignore[arg-type]
+            output.write(data)
+    return size
+
+
+def section_dtype(name: str) -> np.dtype:
+    return next(section.dtype for section in SECTIONS if section.name == name)
+
+
+# -------- Reading --------
+class TreeSnapshot:
+    """
+    Read-only category tree over snapshot arrays.
+
+    Opened from file the arrays are memory mapped: nothing is parsed at startup and pages
+    are shared by all processes mapping same file. Category objects are built only
+    when they are touched, every access builds new one, so changing it does not change snapshot.
+    Index of category is its pre-order number, so descendant check is two integer comparisons
+    """
+
+    # Section arrays, one attribute per entry of SECTIONS
+    __slots__ = (
+        '_buffer',
+        'ids',
+        'parents',
+        'lasts',
+        'levels',
+        'sort_orders',
+        'flags',
+        'created',
+        'updated',
+        'sorted_ids',
+        'sorted_indexes',
+        'text_offsets',
+        'texts',
+    )
+
+    ids: np.ndarray
+    parents: np.ndarray
+    lasts: np.ndarray
+    levels: np.ndarray
+    sort_orders: np.ndarray
+    flags: np.ndarray
+    created: np.ndarray
+    updated: np.ndarray
+    sorted_ids: np.ndarray
+    sorted_indexes: np.ndarray
+    text_offsets: np.ndarray
+    texts: np.ndarray
+
+    def __init__(self, buffer: Union[bytes, np.ndarray]) -> None:
+        raw = np.frombuffer(buffer, dtype='u1') if isinstance(buffer, bytes) else buffer
+        if len(raw) < HEADER.size + SECTION_TABLE.size:
+            raise SnapshotError('Snapshot is too short')
+        magic, version, size = HEADER.unpack(raw[: HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise SnapshotError('Not a category tree snapshot')
+        if version != VERSION:
+            raise SnapshotError(f'Unsupported snapshot version {version}')
+        table = SECTION_TABLE.unpack(raw[HEADER.size : HEADER.size + SECTION_TABLE.size].tobytes())
+        ends = [*table[1:], len(raw)]
+        for section, start, end in zip(SECTIONS, table, ends):
+            if section.per_category:
+                count = size * section.per_category + (section.name == 'text_offsets')
+                end = start + count * section.dtype.itemsize
+            if end > len(raw):
+                raise SnapshotError(f'Section {section.name} is out of snapshot')
+            setattr(self, section.name, raw[start:end].view(section.dtype))
+        self._buffer = raw
+
+    @classmethod
+    def open(cls, path: Union[str, PathLike]) -> 'TreeSnapshot':
+        """Maps snapshot file read-only"""
+        return cls(np.memmap(path, dtype='u1', mode='r'))
+
+    # -------- Lookups --------
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def index_of(self, category_id: UUID) -> int:
+        """Pre-order index of category, -1 when it is not in snapshot"""
+        key = category_id.bytes
+        position = int(np.searchsorted(self.sorted_ids, key))
+        # Fixed width bytes drop trailing zero bytes, they are padded back
+        if position < len(self.sorted_ids) and self.sorted_ids[position].ljust(16, b'\0') == key:
+            return int(self.sorted_indexes[position])
+        return -1
+
+    def id_at(self, index: int) -> UUID:
+        return UUID(bytes=self.ids[index].ljust(16, b'\0'))
+
+    def parent_index(self, index: int) -> int:
+        return int(self.parents[index])
+
+    def children(self, index: int) -> Iterator[int]:
+        """Indexes of direct children: first is next index, every next one follows subtree of previous"""
+        last = self.lasts[index]
+        child = index + 1
+        while child <= last:
+            yield child
+            child = int(self.lasts[child]) + 1
+
+    def subtree(self, index: int) -> range:
+        """Indexes of category subtree, contiguous range"""
+        return range(index, int(self.lasts[index]) + 1)
+
+    def is_descendant(self, index: int, ancestor: int) -> bool:
+        return ancestor < index <= self.lasts[ancestor]
+
+    def text(self, index: int, name: str) -> str:
+        slot = index * len(TEXT_FIELDS) + TEXT_FIELDS.index(name)
+        start, end = self.text_offsets[slot : slot + 2]
+        return self.texts[start:end].tobytes().decode('utf-8')
+
+    def path(self, index: int) -> Optional[str]:
+        return None if self.flags[index] & F_NO_PATH else self.text(index, 'path')
+
+    def level(self, index: int) -> Optional[int]:
+        level = int(self.levels[index])
+        return None if level < 0 else level
+
+    # -------- Categories --------
+    def category(self, index: int) -> Category:
+        """Category at index, built on every access"""
+        slot = index * len(TEXT_FIELDS)
+        start, end = int(self.text_offsets[slot]), int(self.text_offsets[slot + len(TEXT_FIELDS)])
+        parent = int(self.parents[index])
+        return _category(
+            self.id_at(index),
+            self.id_at(parent) if parent >= 0 else None,
+            self.texts[start:end].tobytes(),
+            (self.text_offsets[slot : slot + len(TEXT_FIELDS) + 1] - start).tolist(),
+            int(self.flags[index]),
+            int(self.levels[index]),
+            int(self.sort_orders[index]),
+            int(self.created[index]),
+            int(self.updated[index]),
+        )
+
+    def get(self, category_id: UUID) -> Optional[Category]:
+        index = self.index_of(category_id)
+        return None if index < 0 else self.category(index)
+
+    def categories(self) -> list[Category]:
+        """
+        Materializes every category. Columns are converted to Python objects column-wise,
+        it is much cheaper than building categories one by one
+        """
+        blob = self.texts.tobytes()
+        offsets = self.text_offsets.tolist()
+        fields = len(TEXT_FIELDS)
+        ids = [UUID(bytes=raw.ljust(16, b'\0')) for raw in self.ids.tolist()]
+        columns = zip(
+            ids,
+            self.parents.tolist(),
+            self.flags.tolist(),
+            self.levels.tolist(),
+            self.sort_orders.tolist(),
+            self.created.tolist(),
+            self.updated.tolist(),
+        )
+        with gc_paused():
+            return [
+                _category(
+                    category_id,
+                    ids[parent] if parent >= 0 else None,
+                    blob,
+                    offsets[index * fields : (index + 1) * fields + 1],
+                    *values,
+                )
+                for index, (category_id, parent, *values) in enumerate(columns)
+            ]
+
+    def to_tree(self) -> CategoryTree:
+        """Materializes every category into CategoryTree"""
+        return CategoryTree.from_categories(self.categories())
+
+
+def _category(
+    category_id: UUID,
+    parent_id: Optional[UUID],
+    blob: bytes,
+    offsets: list[int],
+    flags: int,
+    level: int,
+    sort_order: int,
+    created: int,
+    updated: int,
+) -> Category:
+    """Category from decoded columns of one row, offsets bound its text fields in blob"""
+    sku, name, description, path = (
+        blob[offsets[field] : offsets[field + 1]].decode('utf-8') for field in range(len(TEXT_FIELDS))
+    )
+    epoch = EPOCH_UTC if flags & F_AWARE else EPOCH
+    values = {
+        'id': category_id,
+        'sku': sku,
+        'name': name,
+        'parent_id': parent_id,
+        'description': None if flags & F_NO_DESCRIPTION else description,
+        'created_at': epoch + created * MICROSECOND,
+        'updated_at': epoch + updated * MICROSECOND,
+        'is_active': bool(flags & F_ACTIVE),
+        'is_deleted': bool(flags & F_DELETED),
+        'level': None if level < 0 else level,
+        'path': None if flags & F_NO_PATH else path,
+        'sort_order': None if sort_order < 0 else sort_order,
+    }
+    # Values were validated before snapshot was written
+    return construct_trusted(Category, values, set(_CATEGORY_FIELDS))
@@ -0,0 +1,224 @@
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+from uuid import UUID
+from pydantic import TypeAdapter
+from ..models import Category
+from ..models.category.constants import PATH_URL
+from ..models.product.batch import gc_paused
+
+
+PATH_SEP = '/'
+
+# New paths of moved subtree are validated in one call instead of validate_assignment per node
+PATHS = TypeAdapter(list[PATH_URL])
+
+
+def timestamp_for(created_at: datetime, now: Optional[datetime] = None) -> datetime:
+    """
+    Returns now (current time when None) in the timezone of created_at so they can be compared.
+    Naive timestamps are local time as datetime.now() gives them
+    """
+    if now is None:
+        return datetime.now(created_at.tzinfo)
+    if created_at.tzinfo is None:
+        return now.astimezone().replace(tzinfo=None) if now.tzinfo is not None else now
+    return now.astimezone(created_at.tzinfo)
+
+
+class CategoryTree:
+    """
+    In-memory index of category hierarchy built from Category.parent_id.
+
+    Children of every category are kept in list keyed by parent id (None key holds roots),
+    so children lookup is O(1), ancestors are O(depth) and subtree is walked without scanning.
+    Categories which parent is not in tree are kept, but not reachable from roots.
+    version grows on every structure change, derived indexes use it to find out they are stale
+    """
+
+    __slots__ = ('categories', '_children', 'version')
+
+    def __init__(self) -> None:
+        self.categories: dict[UUID, Category] = {}
+        self._children: dict[Optional[UUID], list[UUID]] = {None: []}
+        self.version = 0
+
+    # -------- Building --------
+    @classmethod
+    def from_categories(cls, categories: Iterable[Category]) -> 'CategoryTree':
+        """Builds tree in one pass, order of categories does not matter, ValueError on parent_id cycle"""
+        tree = cls()
+        for category in categories:
+            tree.add(category)
+        return tree
+
+    def add(self, category: Category) -> None:
+        """Adds category as last child of its parent, ValueError when its parent_id closes cycle"""
+        if category.id in self.categories:
+            raise ValueError(f'Category {category.id} is already in tree')
+        if category.parent_id == category.id:
+            raise ValueError(f'parent_id of category {category.id} forms a cycle')
+        self.categories[category.id] = category
+        # Cycle can be closed only by category which already has children in tree
+        if self._children.get(category.id):
+            try:
+                for _ in self.ancestors(category.id):
+                    pass
+            except ValueError:
+                del self.categories[category.id]
+                raise
+        self._children.setdefault(category.parent_id, []).append(category.id)
+        self.version += 1
+
+    def remove(self, category_id: UUID) -> list[Category]:
+        """Removes category with its whole subtree, returns removed categories"""
+        category = self.categories[category_id]
+        removed = [self.categories[node] for node in self.subtree(category_id)]
+        self._children[category.parent_id].remove(category_id)
+        for node in removed:
+            del self.categories[node.id]
+            self._children.pop(node.id, None)
+        self.version += 1
+        return removed
+
+    # -------- Lookups --------
+    def __getitem__(self, category_id: UUID) -> Category:
+        return self.categories[category_id]
+
+    def __contains__(self, category_id: object) -> bool:
+        return category_id in self.categories
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def roots(self) -> list[UUID]:
+        """Ids of categories without parent"""
+        return self._children[None]
+
+    def children(self, category_id: UUID) -> list[UUID]:
+        """Ids of direct children, list is index itself and must not be changed"""
+        return self._children.get(category_id, [])
+
+    def parent(self, category_id: UUID) -> Optional[UUID]:
+        return self.categories[category_id].parent_id
+
+    def ancestors(self, category_id: UUID) -> Iterator[UUID]:
+        """Ids of ancestors from parent up to root, ValueError when parent_id values form cycle"""
+        seen = {category_id}
+        parent_id = self.categories[category_id].parent_id
+        while parent_id is not None and parent_id in self.categories:
+            if parent_id in seen:
+                raise ValueError(f'parent_id of category {parent_id} forms a cycle')
+            seen.add(parent_id)
+            yield parent_id
+            parent_id = self.categories[parent_id].parent_id
+
+    def depth(self, category_id: UUID) -> int:
+        """Number of ancestors, 0 for root"""
+        return sum(1 for _ in self.ancestors(category_id))
+
+    def subtree(self, category_id: Optional[UUID] = None) -> Iterator[UUID]:
+        """
+        Ids of category and all its descendants in pre-order (parent before children),
+        whole tree from roots when category_id is None
+        """
+        stack = [category_id] if category_id is not None else self._children[None][::-1]
+        while stack:
+            node = stack.pop()
+            yield node
+            children = self._children.get(node)
+            if children:
+                stack.extend(reversed(children))
+
+    def descendants(self, category_id: UUID) -> Iterator[UUID]:
+        """Ids of all descendants without category itself"""
+        nodes = self.subtree(category_id)
+        next(nodes)
+        return nodes
+
+    def is_leaf(self, category_id: UUID) -> bool:
+        return not self._children.get(category_id)
+
+    # -------- Hierarchy Fields --------
+    def path_of(self, category_id: UUID) -> str:
+        """Path of category from root skus, e.g. '/ROOT/CHILD'"""
+        skus = [self.categories[node].sku for node in self.ancestors(category_id)]
+        skus.reverse()
+        skus.append(self.categories[category_id].sku)
+        return PATH_SEP + PATH_SEP.join(skus)
+
+    def hierarchy_of(self, category_id: Optional[UUID]) -> tuple[int, str]:
+        """Level and path of category as parent, (-1, '') for parent of roots"""
+        if category_id is None:
+            return -1, ''
+        category = self.categories[category_id]
+        return category.level or 0, category.path or ''
+
+    # -------- Re-parenting --------
+    def move(self, category_id: UUID, parent_id: Optional[UUID], now: Optional[datetime] = None) -> list[UUID]:
+        """
+        Moves category under new parent (None makes it root).
+        Only moved subtree gets new parent_id, level, path and updated_at,
+        returns ids of updated categories
+        """
+        category = self.categories[category_id]
+        if parent_id is not None:
+            if parent_id not in self.categories:
+                raise KeyError(f'Parent category {parent_id} is not in tree')
+            if parent_id == category_id or category_id in self.ancestors(parent_id):
+                raise ValueError('Category cant be moved under itself or its descendant')
+        old_parent_id = category.parent_id
+        old_position = self._relink(category, parent_id)
+        try:
+            updated = self.refresh(category_id, now)
+        except BaseException:
+            # Tree is linked back as it was, at same place among siblings, whatever refresh raised
+            self._relink(category, old_parent_id, old_position)
+            raise
+        category.__pydantic_fields_set__.add('parent_id')
+        return updated
+
+    def _relink(self, category: Category, parent_id: Optional[UUID], position: Optional[int] = None) -> int:
+        """Moves category to children of parent at position (last when None), returns its previous position"""
+        siblings = self._children[category.parent_id]
+        previous = siblings.index(category.id)
+        del siblings[previous]
+        children = self._children.setdefault(parent_id, [])
+        children.insert(len(children) if position is None else position, category.id)
+        category.__dict__['parent_id'] = parent_id
+        self.version += 1
+        return previous
+
+    def refresh(self, category_id: Optional[UUID] = None, now: Optional[datetime] = None) -> list[UUID]:
+        """
+        Recomputes level and path of category subtree (whole tree when None) from its parent.
+        Values are validated for whole subtree first, nothing changes when validation fails
+        """
+        if category_id is None:
+            start = [(node, 0, '') for node in self._children[None]]
+        else:
+            level, path = self.hierarchy_of(self.categories[category_id].parent_id)
+            start = [(category_id, level + 1, path)]
+
+        updates: list[tuple[Category, int, str, datetime]] = []
+        stack = start[::-1]
+        with gc_paused():
+            while stack:
+                node, level, parent_path = stack.pop()
+                category = self.categories[node]
+                path = parent_path + PATH_SEP + category.sku
+                updates.append((category, level, path, timestamp_for(category.created_at, now)))
+                for child in reversed(self._children.get(node, ())):
+                    stack.append((child, level + 1, path))
+
+        PATHS.validate_python([path for _, _, path, _ in updates])
+        for category, _, _, stamp in updates:
+            if stamp < category.created_at:
+                raise ValueError(f'updated_at cant be earlier than creation_at of category {category.id}')
+        for category, level, path, stamp in updates:
+            # Values were validated above, they are set without re-running validate_assignment
+            values = category.__dict__
+            values['level'] = level
+            values['path'] = path
+            values['updated_at'] = stamp
+            category.__pydantic_fields_set__.update(('level', 'path', 'updated_at'))
+        return [category.id for category, _, _, _ in updates]
@@ -0,0 +1,143 @@
+from typing import Callable, Iterator, Optional
+from uuid import UUID
+from ..models import Category
+from .tree import CategoryTree
+
+
+class InheritedFlag:
+    """
+    Set of categories where flag holds effectively: on category itself or on any ancestor.
+    Flip of own flag walks only subtree which effective flag has changed,
+    descendants having flag on their own are not entered
+    """
+
+    __slots__ = ('tree', 'own', 'members')
+
+    def __init__(self, tree: CategoryTree, own: Callable[[Category], bool]) -> None:
+        self.tree = tree
+        self.own = own
+        self.members: set[UUID] = set()
+
+    def rebuild(self) -> None:
+        """Recomputes set over whole tree in one pre-order walk, O(n)"""
+        members: set[UUID] = set()
+        categories, own = self.tree.categories, self.own
+        for node in self.tree.subtree():
+            category = categories[node]
+            if own(category) or category.parent_id in members:
+                members.add(node)
+        self.members = members
+
+    def update(self, category_id: UUID) -> list[UUID]:
+        """Re-reads own flag of category, returns categories which effective flag has changed"""
+        category = self.tree[category_id]
+        flagged = self.own(category) or category.parent_id in self.members
+        if flagged == (category_id in self.members):
+            return []
+        changed = []
+        stack = [category_id]
+        categories, members, own = self.tree.categories, self.members, self.own
+        while stack:
+            node = stack.pop()
+            if flagged:
+                members.add(node)
+            else:
+                members.discard(node)
+            changed.append(node)
+            for child in self.tree.children(node):
+                if not own(categories[child]):
+                    stack.append(child)
+        return changed
+
+
+class VisibilityView:
+    """
+    Maintained views of category tree: effectively deleted, effectively inactive and visible categories.
+    Deleted or inactive category hides its whole subtree. Flag flips update views incrementally,
+    structure change of tree rebuilds them once, on next use
+    """
+
+    __slots__ = ('tree', 'deleted', 'inactive', '_visible', '_version')
+
+    def __init__(self, tree: CategoryTree) -> None:
+        self.tree = tree
+        self.deleted = InheritedFlag(tree, lambda category: category.is_deleted)
+        self.inactive = InheritedFlag(tree, lambda category: not category.is_active)
+        self._visible: set[UUID] = set()
+        self._version = -1
+
+    def _sync(self) -> None:
+        if self._version == self.tree.version:
+            return
+        self.deleted.rebuild()
+        self.inactive.rebuild()
+        hidden = self.deleted.members | self.inactive.members
+        self._visible = {node for node in self.tree.subtree() if node not in hidden}
+        self._version = self.tree.version
+
+    # -------- Views --------
+    @property
+    def visible(self) -> set[UUID]:
+        """Ids of visible categories, set is view itself and must not be changed"""
+        self._sync()
+        return self._visible
+
+    def is_visible(self, category_id: UUID) -> bool:
+        return category_id in self.visible
+
+    def is_deleted(self, category_id: UUID) -> bool:
+        """Category or one of its ancestors is deleted"""
+        self._sync()
+        return category_id in self.deleted.members
+
+    def visible_children(self, category_id: Optional[UUID]) -> list[UUID]:
+        visible = self.visible
+        children = self.tree.children(category_id) if category_id is not None else self.tree.roots()
+        return [child for child in children if child in visible]
+
+    def visible_subtree(self, category_id: Optional[UUID] = None) -> Iterator[UUID]:
+        """Visible categories in pre-order, hidden subtrees are skipped without walking them"""
+        visible = self.visible
+        start = [category_id] if category_id is not None else self.tree.roots()[::-1]
+        stack = [node for node in start if node in visible]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in reversed(self.tree.children(node)) if child in visible)
+
+    def __len__(self) -> int:
+        return len(self.visible)
+
+    # -------- Flag Changes --------
+    def update(self, category_id: UUID) -> list[UUID]:
+        """
+        Re-reads is_active and is_deleted of category after they were changed,
+        returns categories which visibility has changed. Views rebuilt here (after tree change)
+        already see new flags, so nothing is returned then
+        """
+        self._sync()
+        changed = set(self.deleted.update(category_id))
+        changed.update(self.inactive.update(category_id))
+        hidden_deleted, hidden_inactive, visible = self.deleted.members, self.inactive.members, self._visible
+        flipped = []
+        for node in changed:
+            shown = node not in hidden_deleted and node not in hidden_inactive
+            if shown != (node in visible):
+                if shown:
+                    visible.add(node)
+                else:
+                    visible.discard(node)
+                flipped.append(node)
+        return flipped
+
+    def set_active(self, category_id: UUID, is_active: bool) -> list[UUID]:
+        """Sets is_active of category and updates views"""
+        self._sync()
+        self.tree[category_id].is_active = is_active
+        return self.update(category_id)
+
+    def set_deleted(self, category_id: UUID, is_deleted: bool) -> list[UUID]:
+        """Sets is_deleted of category and updates views"""
+        self._sync()
+        self.tree[category_id].is_deleted = is_deleted
+        return self.update(category_id)
@@ -1,5 +1,14 @@
 # Product packages
-from .product import BaseProduct, Dimensions, StorageRequirements, HandlingAttributes, Classification, Traceability
+from .product import (
+    BaseProduct,
+    Dimensions,
+    StorageRequirements,
+    HandlingAttributes,
+    Classification,
+    Traceability,
+    BatchResult,
+    RowError,
+)
 from .product.enums import (
     ProductPhysicalState,
     ProductMovingType,
@@ -18,6 +27,15 @@ from .product.enums import (
 # Category packages
 from .category import Category
 
+# Diagnostics
+from .diagnostics import (
+    Diagnostic,
+    DiagnosticCode,
+    DiagnosticsCollector,
+    collect_diagnostics,
+    diagnostics_disabled,
+)
+
 __all__ = [
     'BaseProduct',
     'Dimensions',
@@ -25,6 +43,8 @@ __all__ = [
     'Classification',
     'HandlingAttributes',
     'StorageRequirements',
+    'BatchResult',
+    'RowError',
     'ProductPhysicalState',
     'ProductMovingType',
     'ProductRoleType',
@@ -39,4 +59,10 @@ __all__ = [
     'TemperatureRegime',
     # Category Packages
     'Category',
+    # Diagnostics
+    'Diagnostic',
+    'DiagnosticCode',
+    'DiagnosticsCollector',
+    'collect_diagnostics',
+    'diagnostics_disabled',
 ]
@@ -1,6 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import Optional, Annotated
-from warnings import warn
 from ...product.enums import (
     ProductStorageCondition,
     TemperatureRegime,
@@ -9,6 +8,8 @@ from ...product.enums import (
     UnitOfMeasure,
     ProductTrackingType,
 )
+from ...product.rules import tracking_type_unit_error
+from ...diagnostics import DiagnosticCode, recommend
 from ..constants import POSITIVE_INT
 
 
@@ -65,7 +66,11 @@ class CtgDefaults(BaseModel):
             self.default_storage_condition == ProductStorageCondition.ELECTRONICS
             and not self.default_temperature_regime
         ):
-            warn('Recommendation: For product type Electronics recommendts temperature_regime', UserWarning)
+            recommend(
+                DiagnosticCode.CTG_DEFAULTS_ELECTRONICS_TEMPERATURE,
+                'Recommendation: For product type Electronics recommendts temperature_regime',
+                'CtgDefaults',
+            )
         return self
 
     # ------- Storag Requirements Condition -------
@@ -86,32 +91,8 @@ class CtgDefaults(BaseModel):
     def validate_tracking_type_units(self) -> 'CtgDefaults':
         """Validating units of measure for Product Tracking type units"""
         if self.default_tracking_type is not None and self.default_unit_of_measure is not None:
-            # Weight Based
-            if self.default_tracking_type == ProductTrackingType.WEIGHT_BASED:
-                allowed = {
-                    UnitOfMeasure.KILOGRAM,
-                    UnitOfMeasure.GRAM,
-                    UnitOfMeasure.LITER,
-                    UnitOfMeasure.MILLILITER,
-                    UnitOfMeasure.CUBIC_METER,
-                }
-                if self.default_unit_of_measure not in allowed:
-                    raise ValueError(
-                        'Weight-based tracking requires unit_of_measure'
-                        f' in {allowed}, got {self.default_unit_of_measure}'
-                    )
-            # Piece
-            elif self.default_tracking_type == ProductTrackingType.PIECE:
-                allowed = {UnitOfMeasure.PIECE, UnitOfMeasure.BOX, UnitOfMeasure.PALLET, UnitOfMeasure.SET}
-                if self.default_unit_of_measure not in allowed:
-                    raise ValueError(
-                        f'Piece tracking requires unit_of_measure in {allowed}, got {self.default_unit_of_measure}'
-                    )
-            # Kit
-            elif self.default_tracking_type == ProductTrackingType.KIT:
-                allowed = {UnitOfMeasure.SET, UnitOfMeasure.PIECE}
-                if self.default_unit_of_measure not in allowed:
-                    raise ValueError(
-                        f'Kit tracking requires unit_of_measure in {allowed}, got {self.default_unit_of_measure}'
-                    )
+            # Same compiled rule table as BaseProduct uses
+            error = tracking_type_unit_error(self.default_tracking_type, self.default_unit_of_measure)
+            if error is not None:
+                raise ValueError(error)
         return self
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import Optional, Annotated
-from warnings import warn
+from ...diagnostics import DiagnosticCode, recommend
 from ..enums import CycleCountFrequency, OrderFrequency
 from ..constants import POSITIVE_F, POSITIVE_INT
 
@@ -82,7 +82,11 @@ class CtgPlanning(BaseModel):
         """If both reorder_point and safety_stock are provided, ensure reorder_point >= safety_stock."""
         if self.reorder_point is not None and self.safety_stock is not None:
             if self.reorder_point < self.safety_stock:
-                warn('reorder_point is less than safety_stock. This may lead to frequent stockouts.', UserWarning)
+                recommend(
+                    DiagnosticCode.CTG_PLANNING_REORDER_BELOW_SAFETY,
+                    'reorder_point is less than safety_stock. This may lead to frequent stockouts.',
+                    'CtgPlanning',
+                )
         return self
 
     @model_validator(mode='after')
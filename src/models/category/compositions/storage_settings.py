@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ConfigDict, Field, model_validator
-from warnings import warn
 from typing import Optional, Annotated
 from uuid import UUID
+from ...diagnostics import DiagnosticCode, recommend
 from ..enums import PutawayStrategy, ReplenishmentMethod
 
 
@@ -44,11 +44,17 @@ class CtgStorageSettings(BaseModel):
     def validate_zones_consistency(self) -> 'CtgStorageSettings':
         """Validating zones consistensy"""
         if self.default_picking_zone_id is not None and self.default_storage_zone_id is None:
-            warn('Picking zone is set but storage zone is not. This might cause issues during putaway.', UserWarning)
+            recommend(
+                DiagnosticCode.CTG_STORAGE_PICKING_WITHOUT_STORAGE,
+                'Picking zone is set but storage zone is not. This might cause issues during putaway.',
+                'CtgStorageSettings',
+            )
         if self.putaway_strategy and not self.default_storage_zone_id:
-            warn(
-                f'Putaway strategy "{self.putaway_strategy.value}" is set'
-                'but no storage zone defined. Storage zone is recommended.',
-                UserWarning,
+            # Stored as enum value (use_enum_values)
+            recommend(
+                DiagnosticCode.CTG_STORAGE_PUTAWAY_WITHOUT_STORAGE,
+                f'Putaway strategy "{PutawayStrategy(self.putaway_strategy).value}" is set'
+                ' but no storage zone defined. Storage zone is recommended.',
+                'CtgStorageSettings',
             )
         return self
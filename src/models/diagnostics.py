@@ -0,0 +1,101 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Iterator, NamedTuple, Optional, Union
+from warnings import warn
+
+
+# ---------- Diagnostic Codes ----------
+class DiagnosticCode(str, Enum):
+    """
+    This class identificates
+    Non-blocking recommendation rules of models
+    """
+
+    __slots__ = ()
+
+    HANDLING_ODOR_VENTILATION = 'handling_odor_ventilation'
+    STORAGE_ELECTRONICS_TEMPERATURE = 'storage_electronics_temperature'
+    CTG_DEFAULTS_ELECTRONICS_TEMPERATURE = 'ctg_defaults_electronics_temperature'
+    CTG_PLANNING_REORDER_BELOW_SAFETY = 'ctg_planning_reorder_below_safety'
+    CTG_STORAGE_PICKING_WITHOUT_STORAGE = 'ctg_storage_picking_without_storage'
+    CTG_STORAGE_PUTAWAY_WITHOUT_STORAGE = 'ctg_storage_putaway_without_storage'
+
+
+class Diagnostic(NamedTuple):
+    """One recommendation raised by model validator"""
+
+    code: DiagnosticCode
+    message: str
+    model: str
+
+
+# ---------- Collector ----------
+class DiagnosticsCollector:
+    """
+    Collects recommendations as coded records instead of warnings.
+    Counts per code are exact, records are kept up to max_records
+    so bulk imports dont grow memory without limit
+    """
+
+    __slots__ = ('counts', 'records', 'max_records')
+
+    def __init__(self, max_records: Optional[int] = 10_000) -> None:
+        self.counts: Counter[DiagnosticCode] = Counter()
+        self.records: list[Diagnostic] = []
+        self.max_records = max_records
+
+    def add(self, code: DiagnosticCode, message: str, model: str) -> None:
+        self.counts[code] += 1
+        if self.max_records is None or len(self.records) < self.max_records:
+            self.records.append(Diagnostic(code, message, model))
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+class _Disabled:
+    """Sink that drops every recommendation"""
+
+    __slots__ = ()
+
+    def add(self, code: DiagnosticCode, message: str, model: str) -> None:
+        pass
+
+
+_DISABLED = _Disabled()
+
+# Where recommendations go, None means warnings.warn (default)
+_sink: ContextVar[Optional[Union[DiagnosticsCollector, _Disabled]]] = ContextVar('diagnostics_sink', default=None)
+
+
+def recommend(code: DiagnosticCode, message: str, model: str) -> None:
+    """Reports recommendation to active collector, or as UserWarning when none is active"""
+    sink = _sink.get()
+    if sink is None:
+        warn(message, UserWarning)
+    else:
+        sink.add(code, message, model)
+
+
+@contextmanager
+def collect_diagnostics(max_records: Optional[int] = 10_000) -> Iterator[DiagnosticsCollector]:
+    """Inside block recommendations are collected into yielded collector"""
+    collector = DiagnosticsCollector(max_records)
+    token = _sink.set(collector)
+    try:
+        yield collector
+    finally:
+        _sink.reset(token)
+
+
+@contextmanager
+def diagnostics_disabled() -> Iterator[None]:
+    """Inside block recommendations are dropped, for hot paths"""
+    token = _sink.set(_DISABLED)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
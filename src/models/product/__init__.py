@@ -1,4 +1,14 @@
 from .product import BaseProduct
 from .compositions import Dimensions, HandlingAttributes, StorageRequirements, Classification, Traceability
+from .batch import BatchResult, RowError
 
-__all__ = ['BaseProduct', 'Dimensions', 'Traceability', 'Classification', 'HandlingAttributes', 'StorageRequirements']
+__all__ = [
+    'BaseProduct',
+    'Dimensions',
+    'Traceability',
+    'Classification',
+    'HandlingAttributes',
+    'StorageRequirements',
+    'BatchResult',
+    'RowError',
+]
@@ -30,5 +30,7 @@ class Dimensions(BaseModel):
         """If all three dimensions are not None, volume calculates auto"""
         if self.volume_m3 is None and self.width_cm and self.height_cm and self.depth_cm:
             # Volume in m^3: = (cm * cm * cm) / 1_000_000
-            self.volume_m3 = (self.width_cm * self.height_cm * self.depth_cm) / 1_000_000
+            # Written directly, assignment would re-run all validators of model again
+            self.__dict__['volume_m3'] = (self.width_cm * self.height_cm * self.depth_cm) / 1_000_000
+            self.__pydantic_fields_set__.add('volume_m3')
         return self
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import Annotated
-from warnings import warn
+from ...diagnostics import DiagnosticCode, recommend
 
 
 class HandlingAttributes(BaseModel):
@@ -40,5 +40,9 @@ class HandlingAttributes(BaseModel):
         """Recommendations for handling type products"""
         # For Odor sensitive products recommend ventilation
         if self.is_odor_sensitive and not self.requires_ventilation:
-            warn('Recomendation: For Odor sensitive products recommends ventailation True', UserWarning)
+            recommend(
+                DiagnosticCode.HANDLING_ODOR_VENTILATION,
+                'Recomendation: For Odor sensitive products recommends ventailation True',
+                'HandlingAttributes',
+            )
         return self
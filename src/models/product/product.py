@@ -1,7 +1,9 @@
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
 from datetime import datetime
 from uuid import UUID
-from typing import Optional, Annotated
+from typing import Any, Iterable, Mapping, Optional, Annotated
+from .batch import BatchResult, RowError, gc_paused, validate_batch
+from .trusted import construct_trusted
 from .compositions import Dimensions, HandlingAttributes, Traceability, StorageRequirements, Classification
 from .constants import (
     NAME_VALID,
@@ -12,6 +14,7 @@ from .constants import (
     LIGHT_MAX_KG,
     SMALL_PARTS_MAX_CM,
 )
+from .rules import physical_state_unit_error, tracking_type_unit_error, tracking_type_physical_state_error
 from .enums import (
     UnitOfMeasure,
     ProductPhysicalState,
@@ -24,6 +27,16 @@ from .enums import (
 )
 
 
+# Composition fields of BaseProduct and their models
+COMPOSITIONS: dict[str, type[BaseModel]] = {
+    'dimensions': Dimensions,
+    'handling': HandlingAttributes,
+    'traceability': Traceability,
+    'storage_requirements': StorageRequirements,
+    'classification': Classification,
+}
+
+
 # -------- Base Class Of Product --------
 class BaseProduct(BaseModel):
     """
@@ -59,26 +72,63 @@ class BaseProduct(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now, description='Creation timestamp')
     updated_at: datetime = Field(default_factory=datetime.now, description='Las update timestamp')
 
+    # ------ Batch API -------
+    @classmethod
+    def validate_many(cls, rows: Iterable[Mapping[str, Any]]) -> BatchResult:
+        """
+        Validates whole list of rows in one pass,
+        returns valid products and per-row error list.
+        Faster than loop of BaseProduct(**row) from about 20k rows, same below it
+        """
+        return validate_batch(cls, rows)
+
+    # ------ Trusted Rehydration -------
+    @classmethod
+    def from_trusted(cls, data: Mapping[str, Any], verify: bool = False) -> 'BaseProduct':
+        """
+        Rebuilds product and its compositions from already validated data
+        (model_dump output) without running validators.
+        With verify=True data is validated fully instead
+        """
+        if verify:
+            return cls.model_validate(data)
+
+        values = dict(data)
+        for name, composition in COMPOSITIONS.items():
+            value = values.get(name)
+            if type(value) is dict:
+                values[name] = construct_trusted(composition, value.copy())
+            elif value is None and name != 'traceability':
+                # Missing composition gets its defaults, same as in validated construction
+                values[name] = construct_trusted(composition, {})
+        return construct_trusted(cls, values, set(data))
+
+    @classmethod
+    def from_trusted_many(cls, rows: Iterable[Mapping[str, Any]], verify_every: int = 0) -> BatchResult:
+        """
+        Rehydrates many already validated records, see from_trusted.
+        With verify_every=N rows 0, N, 2N... of this call are validated fully,
+        so corrupted records are still caught by sampling.
+        Rows failing validation are collected per row and do not stop the batch
+        """
+        from_trusted = cls.from_trusted
+        valid: list[BaseProduct] = []
+        errors: list[RowError] = []
+        with gc_paused():
+            for index, row in enumerate(rows):
+                try:
+                    valid.append(from_trusted(row, bool(verify_every) and index % verify_every == 0))
+                except ValidationError as exc:
+                    errors.append(RowError(index, exc.errors()))
+        return BatchResult(valid, errors)
+
     # ----------------------- Cross Validators ---------------------
 
     # ------- Storag Requirements Condition -------
     @model_validator(mode='after')
     def validate_stgc_requirements(self) -> 'BaseProduct':
         """Validating Product Storage Condition types requirements"""
-        # Validating for Perishable and Traceability products requirements
-        if (
-            self.storage_requirements.storage_condition
-            in (ProductStorageCondition.PERISHABLE, ProductStorageCondition.MEDICINE)
-            and self.traceability.tracking_type != ProductTrackingType.EXPIRY_TRACKED
-        ):
-            raise ValueError('Perishable and Medicine products must have tracking_type = EXPIRY_TRACKED')
-
-        # Validation for Electronic product requirements
-        elif (
-            self.storage_requirements.storage_condition == ProductStorageCondition.ELECTRONICS
-            and not self.handling.is_static_sensitive
-        ):
-            raise ValueError('Electronis products must be static sensitive')
+        check_stgc_requirements(self)
         return self
 
     # ------- Time-Stamps ------
@@ -113,83 +163,26 @@ class BaseProduct(BaseModel):
     @model_validator(mode='after')
     def validate_physical_state_units(self) -> 'BaseProduct':
         """Validating unit of measure for Physical state of Product"""
-        # Liquid
-        if self.physical_state == ProductPhysicalState.LIQUID:
-            # Validating unit of measure
-            if self.unit_of_measure not in (UnitOfMeasure.LITER, UnitOfMeasure.MILLILITER):
-                raise ValueError(
-                    f'For liquid products, unit_of_measure must be LITER or MILLILITER, got {self.unit_of_measure}'
-                )
-            # Validating packaging type
-            if self.storage_requirements.packaging_type == PackagingType.BOX:
-                raise ValueError('Liquid products cannot be stored in boxes')
-
-        # Gas
-        elif self.physical_state == ProductPhysicalState.GAS:
-            # Validating unit of measure
-            if self.unit_of_measure not in (UnitOfMeasure.LITER, UnitOfMeasure.MILLILITER, UnitOfMeasure.CUBIC_METER):
-                raise ValueError(
-                    'For gas products, unit_of_measure must be LITER, MILLILITER,'
-                    f' or CUBIC_METER, got {self.unit_of_measure}'
-                )
-            # Validating packaging type
-            if self.storage_requirements.packaging_type not in (PackagingType.CYLINDER, PackagingType.DRUM, None):
-                raise ValueError('For gas products, packaging_type must be CYLINDER or DRUM')
-            # Validating ventilation requires
-            if not self.handling.requires_ventilation:
-                raise ValueError("Gas products must have requires_ventilation = True")
-
-        # Bulk
-        elif self.physical_state == ProductPhysicalState.BULK:
-            # Validating unit of measure
-            if self.unit_of_measure not in (UnitOfMeasure.KILOGRAM, UnitOfMeasure.GRAM, UnitOfMeasure.CUBIC_METER):
-                raise ValueError(
-                    'For bulk products, unit_of_measure must be weight'
-                    f'(KILOGRAM, GRAM) or volume (CUBIC_METER), got {self.unit_of_measure}'
-                )
-        # For Solid physical state we dont have limits in units
+        check_physical_state_units(self)
         return self
 
     # -------- Tracking Type -------
     @model_validator(mode='after')
     def validate_tracking_type_units(self) -> 'BaseProduct':
         """Validating units of measure for Product Tracking type units"""
-        # Weight Based
-        if self.traceability.tracking_type == ProductTrackingType.WEIGHT_BASED:
-            allowed = {
-                UnitOfMeasure.KILOGRAM,
-                UnitOfMeasure.GRAM,
-                UnitOfMeasure.LITER,
-                UnitOfMeasure.MILLILITER,
-                UnitOfMeasure.CUBIC_METER,
-            }
-            if self.unit_of_measure not in allowed:
-                raise ValueError(
-                    f'Weight-based tracking requires unit_of_measure in {allowed}, got {self.unit_of_measure}'
-                )
-        # Piece
-        elif self.traceability.tracking_type == ProductTrackingType.PIECE:
-            allowed = {UnitOfMeasure.PIECE, UnitOfMeasure.BOX, UnitOfMeasure.PALLET, UnitOfMeasure.SET}
-            if self.unit_of_measure not in allowed:
-                raise ValueError(f'Piece tracking requires unit_of_measure in {allowed}, got {self.unit_of_measure}')
-        # Kit
-        elif self.traceability.tracking_type == ProductTrackingType.KIT:
-            allowed = {UnitOfMeasure.SET, UnitOfMeasure.PIECE}
-            if self.unit_of_measure not in allowed:
-                raise ValueError(f'Kit tracking requires unit_of_measure in {allowed}, got {self.unit_of_measure}')
+        error = tracking_type_unit_error(self.traceability.tracking_type, self.unit_of_measure)
+        if error is not None:
+            raise ValueError(error)
         return self
 
     # -------- Tracking Type and Physical State Compability --------
     @model_validator(mode='after')
     def validate_tracking_type_physical_state_compatibility(self):
         """Validating Product physical state compability with tracking type"""
-        # Liquid, Bulk and Gas
-        if self.physical_state in (ProductPhysicalState.BULK, ProductPhysicalState.LIQUID, ProductPhysicalState.GAS):
-            if self.traceability.tracking_type in (ProductTrackingType.PIECE, ProductTrackingType.KIT):
-                raise ValueError(
-                    f'{self.physical_state.value.capitalize()} products cannot be tracked by '
-                    f'{self.traceability.tracking_type.value}'
-                )
+        # Liquid, Bulk and Gas cant be tracked by Piece or Kit
+        error = tracking_type_physical_state_error(self.physical_state, self.traceability.tracking_type)
+        if error is not None:
+            raise ValueError(error)
         return self
 
     # --------- Size Type --------
@@ -260,3 +253,47 @@ class BaseProduct(BaseModel):
             ):
                 raise ValueError(f'For SMALL_PARTS products, at least one dimension must be < {SMALL_PARTS_MAX_CM} cm')
         return self
+
+
+# -------- Storage Dependent Checks --------
+# Plain functions behind cross validators reading storage_requirements,
+# storage backfill re-runs them on already validated products
+def check_stgc_requirements(product: BaseProduct) -> None:
+    """Validating Product Storage Condition types requirements"""
+    # Validating for Perishable and Traceability products requirements
+    if (
+        product.storage_requirements.storage_condition
+        in (ProductStorageCondition.PERISHABLE, ProductStorageCondition.MEDICINE)
+        and product.traceability.tracking_type != ProductTrackingType.EXPIRY_TRACKED
+    ):
+        raise ValueError('Perishable and Medicine products must have tracking_type = EXPIRY_TRACKED')
+
+    # Validation for Electronic product requirements
+    elif (
+        product.storage_requirements.storage_condition == ProductStorageCondition.ELECTRONICS
+        and not product.handling.is_static_sensitive
+    ):
+        raise ValueError('Electronis products must be static sensitive')
+
+
+def check_physical_state_units(product: BaseProduct) -> None:
+    """Validating unit of measure for Physical state of Product"""
+    # Validating unit of measure from compiled rule table
+    error = physical_state_unit_error(product.physical_state, product.unit_of_measure)
+    if error is not None:
+        raise ValueError(error)
+
+    # Liquid
+    if product.physical_state == ProductPhysicalState.LIQUID:
+        # Validating packaging type
+        if product.storage_requirements.packaging_type == PackagingType.BOX:
+            raise ValueError('Liquid products cannot be stored in boxes')
+
+    # Gas
+    elif product.physical_state == ProductPhysicalState.GAS:
+        # Validating packaging type
+        if product.storage_requirements.packaging_type not in (PackagingType.CYLINDER, PackagingType.DRUM, None):
+            raise ValueError('For gas products, packaging_type must be CYLINDER or DRUM')
+        # Validating ventilation requires
+        if not product.handling.requires_ventilation:
+            raise ValueError("Gas products must have requires_ventilation = True")
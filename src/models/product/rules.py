@@ -0,0 +1,123 @@
+from itertools import product as cartesian
+from typing import NamedTuple, Optional
+from .enums import UnitOfMeasure, ProductPhysicalState, ProductTrackingType
+
+
+# -------- Rule Types --------
+class UnitRule(NamedTuple):
+    """Allowed units of measure and error message template ({allowed}, {got})"""
+
+    units: frozenset[UnitOfMeasure]
+    message: str
+
+
+ALL_UNITS = frozenset(UnitOfMeasure)
+
+
+# Tables are keyed by enum values, models give values (use_enum_values) and str enum members match them too
+
+# -------- Physical State -> Units --------
+# For Solid physical state we dont have limits in units
+PHYSICAL_STATE_UNITS: dict[str, UnitRule] = {
+    ProductPhysicalState.LIQUID.value: UnitRule(
+        frozenset({UnitOfMeasure.LITER, UnitOfMeasure.MILLILITER}),
+        'For liquid products, unit_of_measure must be LITER or MILLILITER, got {got}',
+    ),
+    ProductPhysicalState.GAS.value: UnitRule(
+        frozenset({UnitOfMeasure.LITER, UnitOfMeasure.MILLILITER, UnitOfMeasure.CUBIC_METER}),
+        'For gas products, unit_of_measure must be LITER, MILLILITER, or CUBIC_METER, got {got}',
+    ),
+    ProductPhysicalState.BULK.value: UnitRule(
+        frozenset({UnitOfMeasure.KILOGRAM, UnitOfMeasure.GRAM, UnitOfMeasure.CUBIC_METER}),
+        'For bulk products, unit_of_measure must be weight(KILOGRAM, GRAM) or volume (CUBIC_METER), got {got}',
+    ),
+}
+
+# -------- Tracking Type -> Units --------
+TRACKING_TYPE_UNITS: dict[str, UnitRule] = {
+    ProductTrackingType.WEIGHT_BASED.value: UnitRule(
+        frozenset(
+            {
+                UnitOfMeasure.KILOGRAM,
+                UnitOfMeasure.GRAM,
+                UnitOfMeasure.LITER,
+                UnitOfMeasure.MILLILITER,
+                UnitOfMeasure.CUBIC_METER,
+            }
+        ),
+        'Weight-based tracking requires unit_of_measure in {allowed}, got {got}',
+    ),
+    ProductTrackingType.PIECE.value: UnitRule(
+        frozenset({UnitOfMeasure.PIECE, UnitOfMeasure.BOX, UnitOfMeasure.PALLET, UnitOfMeasure.SET}),
+        'Piece tracking requires unit_of_measure in {allowed}, got {got}',
+    ),
+    ProductTrackingType.KIT.value: UnitRule(
+        frozenset({UnitOfMeasure.SET, UnitOfMeasure.PIECE}),
+        'Kit tracking requires unit_of_measure in {allowed}, got {got}',
+    ),
+}
+
+# -------- Physical State -> Forbidden Tracking Types --------
+# Liquid, Bulk and Gas cant be counted by pieces
+_UNCOUNTABLE = frozenset({ProductTrackingType.PIECE, ProductTrackingType.KIT})
+PHYSICAL_STATE_FORBIDDEN_TRACKING: dict[str, frozenset[ProductTrackingType]] = {
+    ProductPhysicalState.BULK.value: _UNCOUNTABLE,
+    ProductPhysicalState.LIQUID.value: _UNCOUNTABLE,
+    ProductPhysicalState.GAS.value: _UNCOUNTABLE,
+}
+
+
+# -------- Compiled Table --------
+def _compile_allowed_units() -> dict[tuple[Optional[str], Optional[str]], frozenset[UnitOfMeasure]]:
+    """Builds legal units for every (physical_state, tracking_type) pair, None means not known"""
+    table: dict[tuple[Optional[str], Optional[str]], frozenset[UnitOfMeasure]] = {}
+    states = (None, *(state.value for state in ProductPhysicalState))
+    trackings = (None, *(tracking.value for tracking in ProductTrackingType))
+    for state, tracking in cartesian(states, trackings):
+        if state is not None and tracking in PHYSICAL_STATE_FORBIDDEN_TRACKING.get(state, ()):
+            table[(state, tracking)] = frozenset()
+            continue
+        units = ALL_UNITS
+        if state in PHYSICAL_STATE_UNITS:
+            units = units & PHYSICAL_STATE_UNITS[state].units
+        if tracking in TRACKING_TYPE_UNITS:
+            units = units & TRACKING_TYPE_UNITS[tracking].units
+        table[(state, tracking)] = units
+    return table
+
+
+ALLOWED_UNITS = _compile_allowed_units()
+
+
+# -------- Lookups --------
+def allowed_units(
+    physical_state: Optional[str] = None, tracking_type: Optional[str] = None
+) -> frozenset[UnitOfMeasure]:
+    """Units of measure legal for physical state and tracking type (enum or its value)"""
+    return ALLOWED_UNITS[(physical_state, tracking_type)]
+
+
+def physical_state_unit_error(physical_state: str, unit: str) -> Optional[str]:
+    """Error message if unit is not allowed for physical state, else None"""
+    rule = PHYSICAL_STATE_UNITS.get(physical_state)
+    if rule is not None and unit not in rule.units:
+        return rule.message.format(allowed=set(rule.units), got=unit)
+    return None
+
+
+def tracking_type_unit_error(tracking_type: str, unit: str) -> Optional[str]:
+    """Error message if unit is not allowed for tracking type, else None"""
+    rule = TRACKING_TYPE_UNITS.get(tracking_type)
+    if rule is not None and unit not in rule.units:
+        return rule.message.format(allowed=set(rule.units), got=unit)
+    return None
+
+
+def tracking_type_physical_state_error(physical_state: str, tracking_type: str) -> Optional[str]:
+    """Error message if physical state cant be tracked by tracking type, else None"""
+    if tracking_type in PHYSICAL_STATE_FORBIDDEN_TRACKING.get(physical_state, ()):
+        return (
+            f'{ProductPhysicalState(physical_state).value.capitalize()} products cannot be tracked by '
+            f'{ProductTrackingType(tracking_type).value}'
+        )
+    return None
@@ -0,0 +1,40 @@
+from functools import lru_cache
+from typing import Any, Callable, Optional, Type, TypeVar
+from pydantic import BaseModel
+
+
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+# Pydantic models guard __setattr__, internal attributes are set as on plain object
+_setattr = object.__setattr__
+
+
+@lru_cache(maxsize=None)
+def _field_defaults(model: Type[BaseModel]) -> tuple[tuple[str, Any, Optional[Callable[..., Any]]], ...]:
+    """(name, default, default_factory) of fields that are not required, computed once per model"""
+    return tuple(
+        (name, field.default, field.default_factory)
+        for name, field in model.model_fields.items()
+        if not field.is_required()
+    )
+
+
+def construct_trusted(model: Type[ModelT], values: dict[str, Any], fields_set: Optional[set[str]] = None) -> ModelT:
+    """
+    Builds model instance from already validated values without validation.
+    Same result as model.model_construct(**values), but defaults are resolved
+    once per model, so it is cheap enough for rehydrating whole catalogs.
+    values dict is taken over by instance, it must not be reused by caller
+    """
+    if fields_set is None:
+        fields_set = set(values)
+    for name, default, factory in _field_defaults(model):
+        if name not in values:
+            values[name] = factory() if factory is not None else default  # type: ignore[call-arg]
+
+    instance = model.__new__(model)
+    _setattr(instance, '__dict__', values)
+    _setattr(instance, '__pydantic_fields_set__', fields_set)
+    _setattr(instance, '__pydantic_extra__', None)
+    _setattr(instance, '__pydantic_private__', None)
+    return instance
@@ -0,0 +1,16 @@
+# Connections
+from .pool import ConnectionPool
+# SQLite repositories
+from .sqlite import ProductRepository, CategoryRepository, UpsertResult
+# Asyncio repositories
+from .aio import AsyncProductRepository, AsyncCategoryRepository, products_under
+
+__all__ = [
+    'ConnectionPool',
+    'ProductRepository',
+    'CategoryRepository',
+    'UpsertResult',
+    'AsyncProductRepository',
+    'AsyncCategoryRepository',
+    'products_under',
+]
@@ -0,0 +1,205 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, TypeVar
+from uuid import UUID
+from pydantic import BaseModel
+from ..hierarchy import CategoryTree
+from ..models import BaseProduct, Category
+from .sqlite import CategoryRepository, ProductRepository, UpsertResult
+
+
+# Blocking calls running at once, same as default number of pool readers
+MAX_WORKERS = 4
+
+T = TypeVar('T')
+
+
+def _copy(value: T) -> T:
+    """Own copy of loaded model (or list of models) for every coalesced waiter, models are mutable"""
+    if isinstance(value, BaseModel):
+        return value.model_copy(deep=True)  # type: ignore[return-value]
+    if isinstance(value, list):
+        return [_copy(item) for item in value]  # type: ignore[return-value]
+    return value
+
+
+class _AsyncRepository:
+    """
+    Runs blocking repository calls in bounded executor. At most max_workers calls are submitted,
+    others wait in event loop (and can be cancelled there). Concurrent reads of same key share
+    one fetch, waiters after first one get copies of result. Reads started after write
+    never join fetches started before it. Reads dispatched here do not pause cyclic GC,
+    it is process-wide and overlapping reads would keep it off
+    """
+
+    __slots__ = ('repository', 'executor', '_own_executor', '_slots', '_inflight', 'fetches', 'coalesced')
+
+    def __init__(self, repository: Any, executor: Optional[Executor] = None, max_workers: int = MAX_WORKERS) -> None:
+        self.repository = repository
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers, thread_name_prefix='wms-repository')
+        self._slots = asyncio.Semaphore(max_workers)
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.fetches = 0
+        self.coalesced = 0
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    # -------- Coalescing --------
+    def _start(self, keys: Iterable[Hashable], function: Callable[..., Any], *args: Any) -> asyncio.Task:
+        """
+        Fetch as task of its own, so cancelled caller does not cancel it for others.
+        Keys stay in flight until task is done
+        """
+        task = asyncio.ensure_future(self._run(function, *args))
+        keys = list(keys)
+        for key in keys:
+            self._inflight[key] = task
+        self.fetches += 1
+
+        def done(_: asyncio.Task) -> None:
+            for key in keys:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+            # Error is raised to callers, it is marked retrieved for case all of them were cancelled
+            if not task.cancelled():
+                task.exception()
+
+        task.add_done_callback(done)
+        return task
+
+    async def _follow(self, future: asyncio.Future, key: Hashable) -> Any:
+        self.coalesced += 1
+        result = await asyncio.shield(future)
+        # Batch fetches of many keys result in dict by key
+        return _copy(result.get(key) if isinstance(result, dict) else result)
+
+    async def _coalesced(self, key: Hashable, function: Callable[..., T], *args: Any) -> T:
+        future = self._inflight.get(key)
+        if future is not None:
+            return await self._follow(future, key)
+        return await asyncio.shield(self._start((key,), function, *args))
+
+    async def _write(self, function: Callable[..., T], *args: Any) -> T:
+        # Reads started after write (while it waits or runs too) must not join fetches started before it
+        self._inflight.clear()
+        try:
+            return await self._run(function, *args)
+        finally:
+            self._inflight.clear()
+
+    # -------- Lifecycle --------
+    def close(self) -> None:
+        """Shuts down executor when it was created by repository, blocks until running calls finish"""
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+
+    async def aclose(self) -> None:
+        """close() for event loop, waiting for running calls happens in thread and does not block loop"""
+        if self._own_executor:
+            await asyncio.to_thread(self.close)
+
+    async def __aenter__(self: T) -> T:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+
+class AsyncProductRepository(_AsyncRepository):
+    """Asyncio counterpart of ProductRepository, lookups by sku are coalesced"""
+
+    __slots__ = ()
+
+    repository: ProductRepository
+
+    async def get_by_sku(self, sku: str) -> Optional[BaseProduct]:
+        return await self._coalesced(sku, self.repository.get, sku)
+
+    async def get_many(self, skus: Iterable[str]) -> list[BaseProduct]:
+        """
+        Products of skus which exist, in order of skus. Skus already being loaded are waited for,
+        remaining ones are fetched in one call and can be joined by concurrent lookups
+        """
+        skus = list(skus)
+        waiting: dict[str, asyncio.Future] = {}
+        missing: list[str] = []
+        for sku in dict.fromkeys(skus):
+            future = self._inflight.get(sku)
+            if future is None:
+                missing.append(sku)
+            else:
+                waiting[sku] = future
+        # Own fetch and followed ones are awaited together, so each of them is observed when other fails
+        awaitables: list[Awaitable[Any]] = []
+        if missing:
+            awaitables.append(asyncio.shield(self._start(missing, self._fetch_many, missing)))
+        awaitables.extend(self._follow(future, sku) for sku, future in waiting.items())
+        results = await asyncio.gather(*awaitables)
+        found: dict[str, Optional[BaseProduct]] = dict(results[0]) if missing else {}
+        found.update(zip(waiting, results[1:] if missing else results))
+        return [product for product in map(found.get, skus) if product is not None]
+
+    def _fetch_many(self, skus: list[str]) -> dict[str, BaseProduct]:
+        return {product.sku: product for product in self.repository.get_many(skus)}
+
+    async def by_category(self, category_id: UUID) -> list[BaseProduct]:
+        return await self._coalesced(('category', category_id), self.repository.by_category, category_id)
+
+    async def by_categories(self, category_ids: Iterable[UUID]) -> list[BaseProduct]:
+        category_ids = tuple(category_ids)
+        return await self._coalesced(('categories', category_ids), self.repository.by_categories, category_ids)
+
+    async def upsert_many(self, products: Iterable[BaseProduct]) -> int:
+        return await self._write(self.repository.upsert_many, list(products))
+
+    async def upsert(self, product: BaseProduct) -> None:
+        await self._write(self.repository.upsert, product)
+
+    async def delete(self, sku: str) -> bool:
+        return await self._write(self.repository.delete, sku)
+
+    async def count(self) -> int:
+        return await self._run(self.repository.count)
+
+
+class AsyncCategoryRepository(_AsyncRepository):
+    """Asyncio counterpart of CategoryRepository, lookups by id and subtree queries are coalesced"""
+
+    __slots__ = ()
+
+    repository: CategoryRepository
+
+    async def get(self, category_id: UUID) -> Optional[Category]:
+        return await self._coalesced(category_id, self.repository.get, category_id)
+
+    async def children(self, parent_id: Optional[UUID]) -> list[Category]:
+        return await self._coalesced(('children', parent_id), self.repository.children, parent_id)
+
+    async def subtree(self, category_id: UUID) -> list[Category]:
+        return await self._coalesced(('subtree', category_id), self.repository.subtree, category_id)
+
+    async def load_tree(self) -> CategoryTree:
+        return await self._run(self.repository.load_tree)
+
+    async def upsert_many(self, categories: Iterable[Category]) -> UpsertResult:
+        return await self._write(self.repository.upsert_many, list(categories))
+
+    async def upsert(self, category: Category) -> None:
+        await self._write(self.repository.upsert, category)
+
+    async def delete(self, category_id: UUID) -> bool:
+        return await self._write(self.repository.delete, category_id)
+
+    async def count(self) -> int:
+        return await self._run(self.repository.count)
+
+
+async def products_under(
+    categories: AsyncCategoryRepository, products: AsyncProductRepository, category_id: UUID
+) -> list[BaseProduct]:
+    """Products of category subtree, by sku"""
+    subtree = await categories.subtree(category_id)
+    return await products.by_categories(category.id for category in subtree)
@@ -0,0 +1,98 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import count
+from os import PathLike
+from queue import Empty, Queue
+from typing import Iterator, Union
+
+
+# Statements cached per connection, repositories use fixed SQL strings, so all of them stay prepared
+STATEMENT_CACHE = 256
+_memory_names = count()
+
+
+class ConnectionPool:
+    """
+    SQLite connections of one database: single writer guarded by lock
+    and small pool of reader connections. File databases run in WAL mode,
+    so readers are not blocked by writer. ':memory:' is shared in-memory database of pool,
+    shared cache locks whole tables (WAL is not available there), so its readers
+    take writer lock too and reads and writes run one at a time
+    """
+
+    __slots__ = ('database', 'uri', 'shared_cache', '_writer', '_write_lock', '_readers', '_all', '_closed')
+
+    def __init__(self, database: Union[str, PathLike] = ':memory:', readers: int = 4, timeout: float = 30.0) -> None:
+        self.database = str(database)
+        self.uri = False
+        self.shared_cache = self.database == ':memory:'
+        if self.shared_cache:
+            self.database = f'file:wms-memory-{next(_memory_names)}?mode=memory&cache=shared'
+            self.uri = True
+        self._all: list[sqlite3.Connection] = []
+        self._writer = self._connect(timeout)
+        if not self.shared_cache:
+            self._writer.execute('PRAGMA journal_mode=WAL')
+            self._writer.execute('PRAGMA synchronous=NORMAL')
+        # Reentrant, nested use of writer and shared cache reader by one thread does not deadlock
+        self._write_lock = threading.RLock()
+        self._readers: Queue[sqlite3.Connection] = Queue()
+        for _ in range(readers):
+            self._readers.put(self._connect(timeout))
+        self._closed = False
+
+    def _connect(self, timeout: float) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.database,
+            timeout=timeout,
+            uri=self.uri,
+            check_same_thread=False,
+            isolation_level=None,  # transactions are opened explicitly by writer
+            cached_statements=STATEMENT_CACHE,
+        )
+        connection.execute('PRAGMA foreign_keys=ON')
+        self._all.append(connection)
+        return connection
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Writer connection inside one transaction, rolled back on error"""
+        with self._write_lock:
+            connection = self._writer
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield connection
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+
+    @contextmanager
+    def reader(self, timeout: float = 30.0) -> Iterator[sqlite3.Connection]:
+        """Reader connection from pool, waits when all readers are busy"""
+        try:
+            connection = self._readers.get(timeout=timeout)
+        except Empty:
+            raise TimeoutError('No free reader connection in pool') from None
+        try:
+            if self.shared_cache:
+                with self._write_lock:
+                    yield connection
+            else:
+                yield connection
+        finally:
+            self._readers.put(connection)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for connection in self._all:
+            connection.close()
+
+    def __enter__(self) -> 'ConnectionPool':
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,417 @@
+import sqlite3
+from datetime import date, datetime
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional, Sequence
+from uuid import UUID
+from ..catalog.schema import DATE_FIELDS, DATETIME_FIELDS, ENUM_FIELDS, FLOAT_FIELDS, HANDLING_FLAGS, TEXT_FIELDS
+from ..hierarchy import CategoryTree
+from ..models import BaseProduct, Category, RowError
+from ..models.product.trusted import construct_trusted
+from .pool import ConnectionPool
+
+
+# Rows of bulk upsert per transaction and per executemany call
+BATCH_SIZE = 5_000
+
+
+class UpsertResult(NamedTuple):
+    """Number of written rows and rows rejected by table constraints with their position in input"""
+
+    written: int
+    errors: list[RowError]
+
+
+def column_name(field: str) -> str:
+    """SQL column of flat field name: 'dimensions.weight_kg' is dimensions__weight_kg"""
+    return field.replace('.', '__')
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _uuid(raw: Optional[bytes]) -> Optional[UUID]:
+    return UUID(bytes=raw) if raw is not None else None
+
+
+def _iso(value: Optional[Any]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+# -------- Product Table --------
+# Every composition field is own column, so any of them can be indexed
+HANDLING_FIELDS = tuple(f'handling.{flag}' for flag in HANDLING_FLAGS)
+PRODUCT_FIELDS = (
+    *TEXT_FIELDS,
+    'category_id',
+    *ENUM_FIELDS,
+    *FLOAT_FIELDS,
+    *DATE_FIELDS,
+    *HANDLING_FIELDS,
+    *DATETIME_FIELDS,
+)
+_PRODUCT_TYPES = {
+    **{field: 'TEXT' for field in (*TEXT_FIELDS, *ENUM_FIELDS, *DATE_FIELDS, *DATETIME_FIELDS)},
+    'category_id': 'BLOB',
+    **{field: 'REAL' for field in FLOAT_FIELDS},
+    **{field: 'INTEGER NOT NULL' for field in HANDLING_FIELDS},
+}
+PRODUCT_COLUMNS = tuple(column_name(field) for field in PRODUCT_FIELDS)
+PRODUCT_INDEXED = ('category_id', 'status', 'storage_requirements.storage_condition', 'classification.abc_category')
+
+PRODUCT_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS products (\n'
+    + ',\n'.join(
+        f'    {column} {_PRODUCT_TYPES[field]}' + (' PRIMARY KEY' if field == 'sku' else '')
+        for field, column in zip(PRODUCT_FIELDS, PRODUCT_COLUMNS)
+    )
+    + '\n) WITHOUT ROWID',
+    *(
+        f'CREATE INDEX IF NOT EXISTS products_{column_name(field)} ON products ({column_name(field)})'
+        for field in PRODUCT_INDEXED
+    ),
+]
+PRODUCT_SELECT = f'SELECT {", ".join(PRODUCT_COLUMNS)} FROM products'
+PRODUCT_UPSERT = (
+    f'INSERT INTO products ({", ".join(PRODUCT_COLUMNS)}) VALUES ({", ".join("?" * len(PRODUCT_COLUMNS))}) '
+    f'ON CONFLICT (sku) DO UPDATE SET '
+    + ', '.join(f'{column} = excluded.{column}' for column in PRODUCT_COLUMNS if column != 'sku')
+)
+
+
+def _product_writer(field: str) -> Callable[[Any], Any]:
+    """Converter of field value to SQLite value"""
+    if field == 'category_id':
+        return lambda value: value.bytes if value is not None else None
+    if field in DATE_FIELDS or field in DATETIME_FIELDS:
+        return _iso
+    if field in HANDLING_FIELDS:
+        return int
+    return lambda value: value
+
+
+def _product_reader(field: str) -> Callable[[Any], Any]:
+    """Converter of SQLite value (not NULL) back to field value"""
+    if field == 'category_id':
+        return _uuid
+    if field in DATE_FIELDS:
+        return date.fromisoformat
+    if field in DATETIME_FIELDS:
+        return datetime.fromisoformat
+    if field in HANDLING_FIELDS:
+        return bool
+    return lambda value: value
+
+
+# Nested attribute is read by flat name
+_product_columns = [(attrgetter(field), _product_writer(field)) for field in PRODUCT_FIELDS]
+# Composition (None for top level field), leaf name and reader of every column
+_product_readers = [
+    (*(field.split('.') if '.' in field else (None, field)), _product_reader(field)) for field in PRODUCT_FIELDS
+]
+_compositions = tuple(dict.fromkeys(composition for composition, _, _ in _product_readers if composition))
+
+
+def product_row(product: BaseProduct) -> tuple[Any, ...]:
+    """Product as values of products table columns"""
+    return tuple([write(get(product)) for get, write in _product_columns])
+
+
+def product_from_row(row: Sequence[Any]) -> BaseProduct:
+    """Rebuilds product from table row, rows were validated products when they were written"""
+    values: dict[str, Any] = {composition: {} for composition in _compositions}
+    for (composition, name, read), value in zip(_product_readers, row):
+        if value is not None:
+            value = read(value)
+        if composition is None:
+            values[name] = value
+        else:
+            values[composition][name] = value
+    return BaseProduct.from_trusted(values)
+
+
+# -------- Category Table --------
+CATEGORY_COLUMNS = tuple(Category.model_fields)
+CATEGORY_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS categories (
+    id BLOB PRIMARY KEY,
+    sku TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    parent_id BLOB,
+    description TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    is_active INTEGER NOT NULL,
+    is_deleted INTEGER NOT NULL,
+    level INTEGER,
+    path TEXT,
+    sort_order INTEGER
+)""",
+    'CREATE INDEX IF NOT EXISTS categories_parent_id ON categories (parent_id, sort_order)',
+    'CREATE INDEX IF NOT EXISTS categories_path ON categories (path)',
+]
+CATEGORY_SELECT = f'SELECT {", ".join(CATEGORY_COLUMNS)} FROM categories'
+CATEGORY_UPSERT = (
+    f'INSERT INTO categories ({", ".join(CATEGORY_COLUMNS)}) VALUES ({", ".join("?" * len(CATEGORY_COLUMNS))}) '
+    f'ON CONFLICT (id) DO UPDATE SET '
+    + ', '.join(f'{column} = excluded.{column}' for column in CATEGORY_COLUMNS if column != 'id')
+)
+# Descendants are followed by parent_id index, depth of each row orders result level by level.
+# Depth of tree cant exceed number of categories, so stored parent_id cycle stops there
+# and categories met again on cycle are given once, at their first depth
+CATEGORY_SUBTREE = (
+    'WITH RECURSIVE subtree (id, depth) AS ('
+    'SELECT id, 0 FROM categories WHERE id = ? '
+    'UNION ALL SELECT categories.id, subtree.depth + 1 '
+    'FROM categories JOIN subtree ON categories.parent_id = subtree.id '
+    'WHERE subtree.depth < (SELECT COUNT(*) FROM categories)'
+    f') SELECT {", ".join(f"categories.{column}" for column in CATEGORY_COLUMNS)} '
+    'FROM (SELECT id, MIN(depth) AS depth FROM subtree GROUP BY id) AS nodes '
+    'JOIN categories ON categories.id = nodes.id '
+    'ORDER BY nodes.depth, categories.sort_order, categories.sku'
+)
+_CATEGORY_FIELDS_SET = frozenset(CATEGORY_COLUMNS)
+
+
+def category_row(category: Category) -> tuple[Any, ...]:
+    """Category as values of categories table columns"""
+    parent_id = category.parent_id
+    return (
+        category.id.bytes,
+        category.sku,
+        category.name,
+        parent_id.bytes if parent_id is not None else None,
+        category.description,
+        category.created_at.isoformat(),
+        category.updated_at.isoformat(),
+        int(category.is_active),
+        int(category.is_deleted),
+        category.level,
+        category.path,
+        category.sort_order,
+    )
+
+
+def _row_id(row: Sequence[Any]) -> UUID:
+    return UUID(bytes=row[0])
+
+
+def category_from_row(row: Sequence[Any]) -> Category:
+    """Rebuilds category from table row without validation"""
+    values = dict(zip(CATEGORY_COLUMNS, row))
+    values['id'] = UUID(bytes=values['id'])
+    values['parent_id'] = _uuid(values['parent_id'])
+    values['created_at'] = datetime.fromisoformat(values['created_at'])
+    values['updated_at'] = datetime.fromisoformat(values['updated_at'])
+    values['is_active'] = bool(values['is_active'])
+    values['is_deleted'] = bool(values['is_deleted'])
+    return construct_trusted(Category, values, set(_CATEGORY_FIELDS_SET))
+
+
+def _write_checked(
+    connection: sqlite3.Connection, statement: str, batch: list[tuple[Any, ...]], offset: int, errors: list[RowError]
+) -> list[tuple[Any, ...]]:
+    """Writes batch inside open transaction, rows breaking constraints are added to errors. Returns written rows"""
+    connection.execute('SAVEPOINT batch')
+    try:
+        connection.executemany(statement, batch)
+    except sqlite3.IntegrityError:
+        connection.execute('ROLLBACK TO batch')
+    else:
+        return batch
+    finally:
+        connection.execute('RELEASE batch')
+
+    # Some row breaks constraint, rows are written one by one to find out which
+    written = []
+    for index, row in enumerate(batch, offset):
+        try:
+            connection.execute(statement, row)
+        except sqlite3.IntegrityError as exc:
+            errors.append(RowError(index, [{'type': 'integrity_error', 'loc': (), 'msg': str(exc), 'input': row}]))
+        else:
+            written.append(row)
+    return written
+
+
+# -------- Repositories --------
+class _Repository:
+    """
+    Common part of SQLite repositories: schema creation and batched writes.
+    Listeners are called with keys of written or deleted rows after every committed transaction
+    """
+
+    __slots__ = ('pool', 'listeners')
+
+    SCHEMA: list[str] = []
+
+    def __init__(self, pool: ConnectionPool) -> None:
+        self.pool = pool
+        self.listeners: list[Callable[[list[Any]], Any]] = []
+        with pool.writer() as connection:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+
+    def _notify(self, keys: list[Any]) -> None:
+        for listener in self.listeners:
+            listener(keys)
+
+    def _write_many(
+        self,
+        statement: str,
+        rows: Iterable[tuple[Any, ...]],
+        batch_size: int,
+        key: Callable[[tuple[Any, ...]], Any],
+        errors: Optional[list[RowError]] = None,
+    ) -> int:
+        """
+        executemany of prepared statement, one transaction per batch.
+        With errors list rows breaking table constraints are reported there
+        instead of rolling back whole batch
+        """
+        written = 0
+        offset = 0
+        for batch in _batches(rows, batch_size):
+            with self.pool.writer() as connection:
+                if errors is None:
+                    connection.executemany(statement, batch)
+                else:
+                    batch = _write_checked(connection, statement, batch, offset, errors)
+            offset += batch_size
+            written += len(batch)
+            if self.listeners and batch:
+                self._notify([key(row) for row in batch])
+        return written
+
+    def _fetch(self, query: str, parameters: Sequence[Any] = ()) -> list[tuple[Any, ...]]:
+        with self.pool.reader() as connection:
+            return connection.execute(query, parameters).fetchall()
+
+
+class ProductRepository(_Repository):
+    """
+    Products in SQLite, sku is primary key. Compositions are flattened to columns
+    (dimensions__weight_kg, handling__is_fragile...), so they can be filtered and indexed
+    """
+
+    __slots__ = ()
+
+    SCHEMA = PRODUCT_SCHEMA
+
+    def upsert_many(self, products: Iterable[BaseProduct], batch_size: int = BATCH_SIZE) -> int:
+        """Inserts or replaces products by sku in batched transactions, returns number of products"""
+        return self._write_many(PRODUCT_UPSERT, map(product_row, products), batch_size, itemgetter(0))
+
+    def upsert(self, product: BaseProduct) -> None:
+        self.upsert_many([product])
+
+    def get(self, sku: str) -> Optional[BaseProduct]:
+        rows = self._fetch(f'{PRODUCT_SELECT} WHERE sku = ?', (sku,))
+        return product_from_row(rows[0]) if rows else None
+
+    def get_many(self, skus: Iterable[str]) -> list[BaseProduct]:
+        """Products of skus which exist, in order of skus"""
+        skus = list(skus)
+        found: dict[str, BaseProduct] = {}
+        # SQLite limits number of bound parameters, skus are queried in chunks
+        for chunk in _batches(skus, 500):
+            query = f'{PRODUCT_SELECT} WHERE sku IN ({", ".join("?" * len(chunk))})'
+            for row in self._fetch(query, chunk):
+                product = product_from_row(row)
+                found[product.sku] = product
+        return [found[sku] for sku in skus if sku in found]
+
+    def by_category(self, category_id: UUID) -> list[BaseProduct]:
+        rows = self._fetch(f'{PRODUCT_SELECT} WHERE category_id = ? ORDER BY sku', (category_id.bytes,))
+        return [product_from_row(row) for row in rows]
+
+    def by_categories(self, category_ids: Iterable[UUID]) -> list[BaseProduct]:
+        """Products of any of categories (for example of CategoryRepository.subtree), by sku"""
+        rows: list[tuple[Any, ...]] = []
+        for chunk in _batches((category_id.bytes for category_id in category_ids), 500):
+            rows.extend(self._fetch(f'{PRODUCT_SELECT} WHERE category_id IN ({", ".join("?" * len(chunk))})', chunk))
+        rows.sort(key=itemgetter(0))
+        return [product_from_row(row) for row in rows]
+
+    def iter_all(self, batch_size: int = BATCH_SIZE) -> Iterator[BaseProduct]:
+        """
+        All products by sku, fetched in batches paged by sku. Reader connection is held
+        only while batch is fetched, so paused iteration does not block writers
+        """
+        rows = self._fetch(f'{PRODUCT_SELECT} ORDER BY sku LIMIT ?', (batch_size,))
+        while rows:
+            products = [product_from_row(row) for row in rows]
+            yield from products
+            if len(rows) < batch_size:
+                return
+            rows = self._fetch(f'{PRODUCT_SELECT} WHERE sku > ? ORDER BY sku LIMIT ?', (rows[-1][0], batch_size))
+
+    def delete(self, sku: str) -> bool:
+        with self.pool.writer() as connection:
+            deleted = connection.execute('DELETE FROM products WHERE sku = ?', (sku,)).rowcount > 0
+        if deleted:
+            self._notify([sku])
+        return deleted
+
+    def count(self) -> int:
+        return self._fetch('SELECT COUNT(*) FROM products')[0][0]
+
+
+class CategoryRepository(_Repository):
+    """Categories in SQLite, id is primary key and sku is unique"""
+
+    __slots__ = ()
+
+    SCHEMA = CATEGORY_SCHEMA
+
+    def upsert_many(self, categories: Iterable[Category], batch_size: int = BATCH_SIZE) -> UpsertResult:
+        """
+        Inserts or replaces categories by id in batched transactions.
+        Category taking sku of other stored category is not written and is reported as error
+        """
+        errors: list[RowError] = []
+        written = self._write_many(CATEGORY_UPSERT, map(category_row, categories), batch_size, _row_id, errors)
+        return UpsertResult(written, errors)
+
+    def upsert(self, category: Category) -> None:
+        errors = self.upsert_many([category]).errors
+        if errors:
+            raise ValueError(f'Category {category.sku} not written: {errors[0].errors[0]["msg"]}')
+
+    def get(self, category_id: UUID) -> Optional[Category]:
+        rows = self._fetch(f'{CATEGORY_SELECT} WHERE id = ?', (category_id.bytes,))
+        return category_from_row(rows[0]) if rows else None
+
+    def children(self, parent_id: Optional[UUID]) -> list[Category]:
+        """Direct children of parent (roots for None) by sort_order"""
+        if parent_id is None:
+            rows = self._fetch(f'{CATEGORY_SELECT} WHERE parent_id IS NULL ORDER BY sort_order, sku')
+        else:
+            rows = self._fetch(f'{CATEGORY_SELECT} WHERE parent_id = ? ORDER BY sort_order, sku', (parent_id.bytes,))
+        return [category_from_row(row) for row in rows]
+
+    def subtree(self, category_id: UUID) -> list[Category]:
+        """Category and all its descendants, level by level"""
+        rows = self._fetch(CATEGORY_SUBTREE, (category_id.bytes,))
+        return [category_from_row(row) for row in rows]
+
+    def all(self) -> list[Category]:
+        rows = self._fetch(CATEGORY_SELECT)
+        return [category_from_row(row) for row in rows]
+
+    def load_tree(self) -> CategoryTree:
+        """CategoryTree of all stored categories"""
+        return CategoryTree.from_categories(self.all())
+
+    def delete(self, category_id: UUID) -> bool:
+        with self.pool.writer() as connection:
+            deleted = connection.execute('DELETE FROM categories WHERE id = ?', (category_id.bytes,)).rowcount > 0
+        if deleted:
+            self._notify([category_id])
+        return deleted
+
+    def count(self) -> int:
+        return self._fetch('SELECT COUNT(*) FROM categories')[0][0]
@@ -0,0 +1,44 @@
+import uuid
+from src.models import BaseProduct, Category
+
+
+# Shared builders of minimal valid models for tests
+CATEGORY_ID = uuid.UUID('12345678-1234-5678-1234-567812345678')
+
+
+def product_data(sku='TEST001', category=CATEGORY_ID, **kwargs):
+    """Nested input of minimal valid product, category is Category, its id or None"""
+    data = {
+        'sku': sku,
+        'name': 'Test Product',
+        'category_id': category.id if isinstance(category, Category) else category,
+        'unit_of_measure': 'pc',
+        'physical_state': 'solid',
+        'role_type': 'finished good',
+        'status': 'active',
+        'traceability': {'tracking_type': 'piece'},
+    }
+    data.update(kwargs)
+    return data
+
+
+def product_row(sku='TEST001', **kwargs):
+    """Flat importer row (CSV / NDJSON columns) of minimal valid product"""
+    row = {}
+    for key, value in product_data(sku).items():
+        if isinstance(value, dict):
+            row.update({f'{key}.{field}': item for field, item in value.items()})
+        else:
+            row[key] = str(value) if isinstance(value, uuid.UUID) else value
+    row.update(kwargs)
+    return row
+
+
+def make_product(sku='TEST001', category=CATEGORY_ID, **kwargs):
+    return BaseProduct(**product_data(sku, category, **kwargs))
+
+
+def make_category(sku, parent=None, **kwargs):
+    data = {'sku': sku, 'name': sku.title(), 'description': None, 'parent_id': parent.id if parent else None}
+    data.update(kwargs)
+    return Category(**data)
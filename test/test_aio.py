@@ -0,0 +1,145 @@
+import asyncio
+import gc
+import uuid
+import warnings
+import pytest
+from src.models import Category
+from src.repository import (
+    AsyncCategoryRepository,
+    AsyncProductRepository,
+    CategoryRepository,
+    ConnectionPool,
+    ProductRepository,
+    products_under,
+    sqlite,
+)
+from .factories import make_product
+
+
+@pytest.fixture
+def pool():
+    with ConnectionPool(readers=2) as pool:
+        yield pool
+
+
+def test_concurrent_lookups_are_coalesced(pool):
+    async def main():
+        async with AsyncProductRepository(ProductRepository(pool), max_workers=2) as repository:
+            await repository.upsert_many(make_product(f'SKU{number:03}') for number in range(10))
+            found = await asyncio.gather(*(repository.get_by_sku('SKU001') for _ in range(20)))
+            assert repository.fetches == 1 and repository.coalesced == 19
+            # Every waiter gets own copy
+            assert all(product == found[0] for product in found)
+            assert len({id(product) for product in found}) == 20
+
+            many, single, missing = await asyncio.gather(
+                repository.get_many(['SKU003', 'SKU002', 'NOSKU', 'SKU003']),
+                repository.get_by_sku('SKU002'),
+                repository.get_by_sku('NOSKU'),
+            )
+            assert [product.sku for product in many] == ['SKU003', 'SKU002', 'SKU003']
+            assert single.sku == 'SKU002' and missing is None
+            assert repository.fetches == 2
+
+            # Fetch started after write sees written product
+            updated = make_product('SKU001')
+            updated.name = 'Renamed'
+            await repository.upsert(updated)
+            assert (await repository.get_by_sku('SKU001')).name == 'Renamed'
+            assert await repository.count() == 10
+
+            # Read started while write is pending does not join fetch started before it
+            fetches = repository.fetches
+            before, _, after = await asyncio.gather(
+                repository.get_by_sku('SKU005'), repository.upsert(updated), repository.get_by_sku('SKU005')
+            )
+            assert repository.fetches == fetches + 2 and before == after
+
+    asyncio.run(main())
+
+
+def test_async_subtree(pool):
+    async def main():
+        categories = AsyncCategoryRepository(CategoryRepository(pool))
+        products = AsyncProductRepository(ProductRepository(pool), executor=categories.executor)
+        root = Category(sku='ROOT', name='Root', description=None)
+        food = Category(sku='FOOD', name='Food', description=None, parent_id=root.id)
+        await categories.upsert_many([root, food])
+        await products.upsert_many([make_product('SKU002', food.id), make_product('SKU001', root.id)])
+
+        first, second = await asyncio.gather(categories.subtree(root.id), categories.subtree(root.id))
+        assert [category.sku for category in first] == ['ROOT', 'FOOD'] and first == second
+        assert categories.fetches == 1 and categories.coalesced == 1
+        assert [product.sku for product in await products_under(categories, products, root.id)] == ['SKU001', 'SKU002']
+        assert await products_under(categories, products, uuid.uuid4()) == []
+        assert (await categories.load_tree()).roots() == [root.id]
+        await categories.aclose()
+
+    asyncio.run(main())
+
+
+def test_overlapping_reads_keep_garbage_collector_enabled(pool, monkeypatch):
+    # Reads overlap on executor threads, none of them may pause process-wide collector
+    states = []
+
+    def recording(decode):
+        def wrapper(row):
+            states.append(gc.isenabled())
+            return decode(row)
+
+        return wrapper
+
+    monkeypatch.setattr(sqlite, 'product_from_row', recording(sqlite.product_from_row))
+    monkeypatch.setattr(sqlite, 'category_from_row', recording(sqlite.category_from_row))
+
+    async def main():
+        categories = AsyncCategoryRepository(CategoryRepository(pool), max_workers=4)
+        products = AsyncProductRepository(ProductRepository(pool), executor=categories.executor)
+        root = Category(sku='ROOT', name='Root', description=None)
+        await categories.upsert(root)
+        await products.upsert_many(make_product(f'SKU{number:03}', root.id) for number in range(20))
+        await asyncio.gather(
+            *(products_under(categories, products, root.id) for _ in range(5)),
+            *(products.get_many([f'SKU{number:03}', 'SKU000']) for number in range(10)),
+            products.by_category(root.id),
+            categories.load_tree(),
+        )
+        await categories.aclose()
+
+    asyncio.run(main())
+    assert states and all(states)
+    assert gc.isenabled()
+
+
+def test_failed_fetch_reaches_every_waiter(pool):
+    async def main():
+        repository = AsyncProductRepository(ProductRepository(pool))
+        results = await asyncio.gather(*(repository.by_categories([None]) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, AttributeError) for result in results)
+        assert repository.fetches == 1
+        await repository.aclose()
+
+    asyncio.run(main())
+
+
+class FailingManyRepository(ProductRepository):
+    def get_many(self, skus):
+        raise RuntimeError('batch fetch failed')
+
+
+def test_failed_get_many_awaits_followed_fetches(pool):
+    async def main():
+        async with AsyncProductRepository(FailingManyRepository(pool)) as repository:
+            await repository.upsert(make_product('SKU001'))
+            return await asyncio.gather(
+                repository.get_by_sku('SKU001'), repository.get_many(['SKU001', 'SKU002']), return_exceptions=True
+            )
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        single, many = asyncio.run(main())
+        assert single.sku == 'SKU001' and isinstance(many, RuntimeError)
+        # Traceback of error keeps frame of get_many alive
+        del many
+        gc.collect()
+    assert not [warning for warning in caught if 'never awaited' in str(warning.message)]
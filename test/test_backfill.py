@@ -0,0 +1,155 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from pydantic import ValidationError
+from src.hierarchy import CategoryTree, DefaultsResolver, backfill_rows, backfill_storage
+from src.models import BaseProduct, RowError
+from src.models.category.compositions import CtgDefaults
+from .factories import make_category, make_product
+
+
+@pytest.fixture
+def categories():
+    root = make_category('ROOT')
+    food = make_category('FOOD', root)
+    fish = make_category('FISH', food)
+    chem = make_category('CHEM', root)
+    return {category.sku: category for category in (root, food, fish, chem)}
+
+
+@pytest.fixture
+def resolver(categories):
+    tree = CategoryTree.from_categories(categories.values())
+    return DefaultsResolver(
+        tree,
+        {
+            categories['FOOD'].id: CtgDefaults(
+                default_storage_condition='perishable',
+                default_temperature_regime='frozen',
+                default_tracking_type='expiry_tracked',
+            ),
+            categories['CHEM'].id: CtgDefaults(default_storage_condition='hazardous', default_hazard_class='8'),
+        },
+    )
+
+
+def test_backfill_storage(resolver, categories):
+    today = date.today()
+    products = [
+        make_product(
+            'SKU001',
+            categories['FISH'],
+            traceability={
+                'tracking_type': 'expiry_tracked',
+                'production_date': today - timedelta(days=1),
+                'expiry_date': today + timedelta(days=30),
+            },
+        ),
+        make_product('SKU002', categories['FISH']),
+        make_product('SKU003', categories['CHEM']),
+        make_product('SKU004', categories['CHEM'], storage_requirements={'storage_condition': 'ventilated'}),
+        make_product('SKU005', categories['ROOT']),
+        make_product('SKU006', None),
+        make_product('SKU007', make_category('OTHER')),
+    ]
+    result = backfill_storage(products, resolver)
+
+    assert result.changed == [0, 2]
+    assert products[0].storage_requirements.storage_condition == 'perishable'
+    assert products[0].storage_requirements.temperature_regime == 'frozen'
+    assert products[2].storage_requirements.hazard_class == '8'
+    assert products[2].updated_at >= products[2].created_at
+    assert products[3].storage_requirements.storage_condition == 'ventilated'
+    assert products[4].storage_requirements.storage_condition is None
+    # Products do not share filled composition
+    assert products[0].storage_requirements is not products[1].storage_requirements
+
+    # Perishable defaults conflict with piece tracking, product stays unchanged
+    assert [conflict.position for conflict in result.conflicts] == [1]
+    assert 'EXPIRY_TRACKED' in result.conflicts[0].errors[0]['msg']
+    assert products[1].storage_requirements.storage_condition is None
+
+
+def test_invalid_defaults_are_conflicts_of_whole_group(resolver, categories):
+    resolver.set_defaults(categories['CHEM'].id, CtgDefaults(default_storage_condition='perishable'))
+    products = [make_product('SKU001', categories['CHEM']), make_product('SKU002', categories['CHEM'])]
+    result = backfill_storage(products, resolver)
+    assert result.changed == []
+    assert [conflict.position for conflict in result.conflicts] == [0, 1]
+    assert result.conflicts[0].errors[0]['type'] == 'value_error'
+
+
+def test_backfill_rows(resolver, categories):
+    today = date.today()
+    rows = [
+        {
+            'sku': 'SKU001',
+            'name': 'Fish',
+            'category_id': str(categories['FISH'].id),
+            'unit_of_measure': 'kg',
+            'physical_state': 'solid',
+            'role_type': 'finished good',
+            'status': 'active',
+            'traceability': {'production_date': today, 'expiry_date': today + timedelta(days=5)},
+        },
+        {'sku': 'SKU002', 'category_id': None, 'traceability': {}},
+    ]
+    filled = list(backfill_rows(rows, resolver))
+    assert filled[0]['traceability']['tracking_type'] == 'expiry_tracked'
+    assert filled[0]['storage_requirements'] == {'storage_condition': 'perishable', 'temperature_regime': 'frozen'}
+    assert 'tracking_type' not in rows[0]['traceability']
+    assert filled[1] == rows[1]
+    assert BaseProduct(**filled[0]).storage_requirements.temperature_regime == 'frozen'
+    assert uuid.UUID(filled[0]['category_id']) == categories['FISH'].id
+
+
+def test_backfill_rows_unvalidated_and_inconsistent_rows(resolver, categories):
+    resolver.set_defaults(categories['FISH'].id, CtgDefaults(default_tracking_type='piece'))
+    error = RowError(0, [{'type': 'json_invalid', 'loc': (), 'msg': 'bad', 'input': '{'}])
+    rows = [
+        {'sku': 'SKU001', 'category_id': 'not-a-uuid', 'traceability': {}},
+        {'sku': 'SKU002', 'category_id': categories['FISH'].id, 'traceability': {}},
+        {'sku': 'SKU003', 'category_id': categories['FOOD'].id, 'traceability': 'piece'},
+        error,
+    ]
+    filled = list(backfill_rows(rows, resolver))
+    assert filled[0] == rows[0] and filled[2:] == rows[2:]
+    with pytest.raises(ValidationError):
+        BaseProduct(**filled[0])
+    # FISH inherits perishable storage, piece tracking of its own breaks it
+    assert isinstance(filled[1], RowError) and filled[1].position == 1
+    assert filled[1].errors[0]['loc'] == ('category_id',)
+    assert 'inconsistent' in filled[1].errors[0]['msg']
+
+
+def test_packaging_conflict(resolver, categories):
+    resolver.set_defaults(categories['CHEM'].id, CtgDefaults(default_packaging_type='box'))
+    products = [
+        make_product(
+            'SKU001',
+            categories['CHEM'],
+            physical_state='liquid',
+            unit_of_measure='l',
+            traceability={'tracking_type': 'lot_tracked'},
+        ),
+        make_product('SKU002', categories['CHEM']),
+    ]
+    result = backfill_storage(products, resolver)
+    assert result.changed == [1]
+    assert [conflict.position for conflict in result.conflicts] == [0]
+    assert 'boxes' in result.conflicts[0].errors[0]['msg']
+
+
+def test_backfill_with_aware_timestamps(resolver, categories):
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    products = [
+        make_product(sku, categories['CHEM'], created_at=created, updated_at=created) for sku in ('SKU001', 'SKU002')
+    ]
+    assert backfill_storage(products[:1], resolver).changed == [0]
+    assert products[0].updated_at.tzinfo == timezone.utc and products[0].updated_at > created
+    # Product stays assignable, timestamps are comparable
+    products[0].name = 'Renamed'
+
+    # Naive now is local time, now before created_at is clamped to it
+    assert backfill_storage(products[1:], resolver, now=datetime(2023, 1, 1)).changed == [0]
+    assert products[1].updated_at == created
@@ -0,0 +1,38 @@
+import json
+from bench.runner import check_regressions, main, run_suite
+
+
+def test_suite_runs_every_case():
+    results = run_suite(scale=0.01, repeat=1, bulk=[20])
+    names = [result['name'] for result in results]
+    assert 'product.construct.dict' in names
+    assert 'category.construct.json' in names
+    assert 'product.assign.nested' in names
+    assert 'product.dump.json' in names
+    assert 'product.bulk_import.20' in names
+    assert 'product.bulk_loop.20' in names
+    assert all(result['best_us'] > 0 for result in results)
+
+
+def test_check_regressions():
+    results = [{'name': 'a', 'best_us': 10.0}, {'name': 'b', 'best_us': 10.0}]
+    regressions = check_regressions(results, {'a': 5.0, 'b': 50.0}, [{'name': 'b', 'best_us': 7.0}], tolerance=0.25)
+    assert regressions == [
+        {'name': 'a', 'best_us': 10.0, 'threshold_us': 5.0},
+        {'name': 'b', 'best_us': 10.0, 'baseline_us': 7.0},
+    ]
+
+
+def test_main_writes_report(tmp_path):
+    # Empty thresholds: single short run is not timed against limits, only report is checked
+    thresholds = tmp_path / 'thresholds.json'
+    thresholds.write_text('{}')
+    output = tmp_path / 'bench.json'
+    argv = ['--scale', '0.01', '--repeat', '1', '--bulk', '', '--only', 'category']
+    assert main([*argv, '--thresholds', str(thresholds), '--output', str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    assert set(report) == {'python', 'pydantic', 'results', 'regressions'}
+    assert report['regressions'] == []
+    assert 'category.construct.dict' in [result['name'] for result in report['results']]
+    assert all(result['name'].startswith('category') for result in report['results'])
@@ -0,0 +1,86 @@
+from src.catalog import BitmapIndex, ProductFrame
+from .factories import make_product
+
+
+def sample_products():
+    return [
+        make_product('SKU001', classification={'moving_type': 'fast moving'}),
+        make_product(
+            'SKU002',
+            storage_requirements={'storage_condition': 'hazardous', 'hazard_class': '3'},
+            classification={'moving_type': 'fast moving'},
+            handling={'is_stackable': False},
+        ),
+        make_product(
+            'SKU003',
+            storage_requirements={'storage_condition': 'hazardous', 'hazard_class': '3'},
+            classification={'moving_type': 'slow moving'},
+        ),
+        make_product(
+            'SKU004',
+            storage_requirements={'storage_condition': 'hazardous', 'hazard_class': '8'},
+            classification={'moving_type': 'fast moving'},
+            handling={'is_fragile': True, 'is_stackable': False},
+        ),
+    ]
+
+
+def skus(index, bitmap):
+    return [product.sku for product in index.select(bitmap)]
+
+
+def test_bitmap_query():
+    index = BitmapIndex.from_products(sample_products())
+    hazardous_fast = {
+        'storage_requirements.storage_condition': 'hazardous',
+        'storage_requirements.hazard_class': '3',
+        'classification.moving_type': 'fast moving',
+    }
+
+    assert len(index) == 4
+    assert skus(index, index.query(hazardous_fast)) == ['SKU002']
+    assert skus(index, index.query({'storage_requirements.hazard_class': ['3', '8']})) == ['SKU002', 'SKU003', 'SKU004']
+    assert skus(index, index.query({'storage_requirements.hazard_class': None})) == ['SKU001']
+    assert skus(index, index.query({'handling.is_fragile': True})) == ['SKU004']
+    assert index.count(index.query({'handling.is_stackable': False})) == 2
+    assert index.count(index.query({})) == 4
+
+
+def test_bitmap_matches_frame_masks():
+    products = sample_products()
+    frame = ProductFrame.from_products(products)
+    index = BitmapIndex(frame)
+
+    mask = frame.eq('classification.moving_type', 'fast moving') & ~frame.flag('is_fragile')
+    bitmap = index.eq('classification.moving_type', 'fast moving') & index.flag('is_fragile', False)
+    assert index.positions(bitmap).tolist() == mask.nonzero()[0].tolist()
+
+
+def test_bitmap_update_and_remove():
+    products = sample_products()
+    index = BitmapIndex.from_products(products)
+    fast = {'classification.moving_type': 'fast moving'}
+
+    products[2].classification.moving_type = 'fast moving'
+    products[0].handling.is_magnetic = True
+    index.update(products[2])
+    index.update(products[0])
+    assert skus(index, index.query(fast)) == ['SKU001', 'SKU002', 'SKU003', 'SKU004']
+    assert index.count(index.eq('classification.moving_type', 'slow moving')) == 0
+    assert skus(index, index.query({'handling.is_magnetic': True})) == ['SKU001']
+
+    assert index.remove('SKU002')
+    assert not index.remove('SKU002')
+    assert skus(index, index.query(fast)) == ['SKU001', 'SKU003', 'SKU004']
+    assert index.count(index.query({'handling.is_stackable': True})) == 2
+
+
+def test_bitmap_grows():
+    index = BitmapIndex()
+    products = [make_product(f'SKU{number:04d}') for number in range(2000)]
+    index.add_many(products)
+    index.add(make_product('SKU0005', classification={'moving_type': 'fast moving'}))
+
+    assert len(index) == 2000
+    assert skus(index, index.query({'classification.moving_type': 'fast moving'})) == ['SKU0005']
+    assert index.count(index.eq('status', 'active')) == 2000
@@ -0,0 +1,103 @@
+import pytest
+from src.catalog import CodecError, ProductCache
+from src.repository import ConnectionPool, ProductRepository
+from .factories import make_product
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_returns_copies():
+    cache = ProductCache()
+    product = make_product('SKU001', dimensions={'weight_kg': 2.5})
+    cache.put(product)
+    product.name = 'Changed after put'
+
+    cached = cache.get('SKU001')
+    assert cached.name == 'Test Product' and cached.dimensions.weight_kg == 2.5
+    cached.dimensions.weight_kg = 10
+    assert cache.get('SKU001').dimensions.weight_kg == 2.5
+    assert cache.get('SKU001') is not cache.get('SKU001')
+    assert cache.get('NOSKU') is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (4, 1, 1)
+
+
+def test_put_of_unencodable_product():
+    cache = ProductCache()
+    product = make_product('SKU001')
+    # Bypasses validation, name does not fit its length byte
+    product.__dict__['name'] = 'x' * 300
+    with pytest.raises(CodecError, match='does not fit'):
+        cache.put(product)
+    assert len(cache) == 0
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = ProductCache(max_entries=2)
+    cache.put_many([make_product('SKU001'), make_product('SKU002')])
+    cache.get('SKU001')
+    cache.put(make_product('SKU003'))
+    assert 'SKU001' in cache and 'SKU002' not in cache and 'SKU003' in cache
+    assert cache.stats().evictions == 1
+
+    size = cache.nbytes // 2
+    cache = ProductCache(max_entries=None, max_bytes=size * 3)
+    cache.put_many(make_product(f'SKU{number:03}') for number in range(5))
+    assert len(cache) == 3 and cache.nbytes <= size * 3
+    assert 'SKU000' not in cache and 'SKU004' in cache
+
+    with pytest.raises(ValueError):
+        ProductCache(max_entries=None)
+
+
+def test_ttl_expiration():
+    clock = Clock()
+    cache = ProductCache(ttl=10, clock=clock)
+    cache.put(make_product('SKU001'))
+    clock.now = 10
+    assert cache.get('SKU001') is not None
+    clock.now = 10.5
+    assert 'SKU001' not in cache
+    assert cache.get('SKU001') is None
+    assert cache.stats().expirations == 1 and len(cache) == 0
+
+
+def test_repository_writes_invalidate():
+    with ConnectionPool() as pool:
+        repository = ProductRepository(pool)
+        cache = ProductCache()
+        cache.attach(repository)
+        repository.upsert_many([make_product('SKU001'), make_product('SKU002')])
+
+        assert cache.get_or_load('SKU001', repository.get).name == 'Test Product'
+        assert [product.sku for product in cache.get_many(['SKU002', 'SKU001', 'NOSKU'], repository.get_many)] == [
+            'SKU002',
+            'SKU001',
+        ]
+        assert len(cache) == 2
+
+        repository.upsert(make_product('SKU001', name='Renamed'))
+        assert 'SKU001' not in cache
+        assert cache.get_or_load('SKU001', repository.get).name == 'Renamed'
+        repository.delete('SKU002')
+        assert 'SKU002' not in cache
+        assert cache.stats().invalidations == 2
+
+
+def test_load_racing_with_write_is_not_cached():
+    cache = ProductCache()
+
+    def load(sku):
+        product = make_product(sku)
+        # Write committed while product was being loaded
+        cache.invalidate(sku)
+        return product
+
+    assert cache.get_or_load('SKU001', load).sku == 'SKU001'
+    assert 'SKU001' not in cache
@@ -0,0 +1,107 @@
+import struct
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from src.catalog import CodecError, encode_stream, decode_stream, dumps, loads
+from src.catalog.codec import HEADER, LENGTH, PRODUCT_FIXED
+from src.models import Category
+from .factories import make_product
+
+
+def sample_products():
+    return [
+        make_product('SKU001', name='Тестовый товар'),
+        make_product(
+            'SKU002',
+            category_id=None,
+            description='Frozen fish',
+            unit_of_measure='kg',
+            traceability={
+                'tracking_type': 'expiry_tracked',
+                'production_date': date.today() - timedelta(days=3),
+                'expiry_date': date.today() + timedelta(days=30),
+            },
+            storage_requirements={'storage_condition': 'perishable', 'temperature_regime': 'frozen'},
+            dimensions={'weight_kg': 0.25, 'width_cm': 10, 'height_cm': 20, 'depth_cm': 30},
+            handling={'is_fragile': True, 'is_stackable': False},
+            classification={'size_type': 'light', 'moving_type': 'fast moving', 'abc_category': 'A'},
+        ),
+        make_product(
+            'SKU003',
+            created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            updated_at=datetime(2024, 1, 2, tzinfo=timezone.utc),
+        ),
+    ]
+
+
+def sample_categories():
+    root = Category(sku='ROOT', name='Root', description=None)
+    return [
+        root,
+        Category(sku='CHILD', name='Child', description='Child', parent_id=root.id, level=1, path='/ROOT/CHILD'),
+        Category(sku='GONE', name='Gone', description=None, is_active=False, is_deleted=True, sort_order=None),
+    ]
+
+
+@pytest.mark.parametrize('validate', [False, True])
+def test_products_round_trip(validate):
+    products = sample_products()
+    decoded = loads(dumps(products), validate=validate)
+    assert decoded == products
+    assert decoded[2].created_at.tzinfo is not None
+
+
+@pytest.mark.parametrize('validate', [False, True])
+def test_categories_round_trip(validate):
+    categories = sample_categories()
+    assert loads(dumps(categories), validate=validate) == categories
+
+
+def test_streaming_file(tmp_path):
+    path = tmp_path / 'products.wmsb'
+    products = [make_product(f'SKU{i:04d}') for i in range(100)]
+    with open(path, 'wb') as file:
+        assert encode_stream(iter(products), file) == 100
+    with open(path, 'rb') as file:
+        stream = decode_stream(file)
+        assert next(stream) == products[0]
+        assert list(stream) == products[1:]
+
+
+def test_binary_is_smaller_than_json():
+    products = sample_products()
+    json_size = sum(len(product.model_dump_json()) for product in products)
+    assert len(dumps(products)) * 3 < json_size
+
+
+def test_stream_errors():
+    assert dumps([]) == b''
+    assert loads(b'') == []
+    data = dumps(sample_products())
+    with pytest.raises(CodecError, match='Not a binary catalog stream'):
+        loads(b'XXXX' + data[4:])
+    with pytest.raises(CodecError, match='Unsupported binary catalog version'):
+        loads(data[:4] + b'\x09' + data[5:])
+    with pytest.raises(CodecError, match='Truncated record'):
+        loads(data[:-1])
+    with pytest.raises(CodecError, match='cant contain'):
+        dumps([*sample_products(), *sample_categories()])
+    # Enum code byte out of its code table
+    corrupted = bytearray(data)
+    corrupted[HEADER.size + LENGTH.size + 2] = 0xFF
+    with pytest.raises(CodecError, match='Unknown code 255'):
+        loads(bytes(corrupted))
+    # created_at micros far beyond datetime range, second record is reported by its offset
+    corrupted = bytearray(data)
+    second = HEADER.size + LENGTH.size + LENGTH.unpack_from(data, HEADER.size)[0]
+    created = second + LENGTH.size + PRODUCT_FIXED.size - 16
+    corrupted[created : created + 8] = struct.pack('<q', 2**62)
+    with pytest.raises(CodecError, match=f'Corrupted record at offset {second}: Timestamp .* out of range'):
+        loads(bytes(corrupted))
+    assert data[: HEADER.size - 1] == b'WMSB\x02'
+
+
+def test_large_category_integers():
+    category = Category(sku='DEEP', name='Deep', description=None, level=2**40, sort_order=2**33)
+    assert loads(dumps([category])) == [category]
+    with pytest.raises(CodecError, match='does not fit'):
+        dumps([Category(sku='HUGE', name='Huge', description=None, sort_order=2**64)])
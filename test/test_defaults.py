@@ -0,0 +1,102 @@
+import pytest
+from src.hierarchy import CategoryTree, DefaultsResolver
+from src.models.category.compositions import CtgDefaults
+from .factories import make_category
+
+
+@pytest.fixture
+def categories():
+    root = make_category('ROOT')
+    food = make_category('FOOD', root)
+    fish = make_category('FISH', food)
+    chem = make_category('CHEM', root)
+    acid = make_category('ACID', chem)
+    return {category.sku: category for category in (root, food, fish, chem, acid)}
+
+
+@pytest.fixture
+def resolver(categories):
+    tree = CategoryTree.from_categories(categories.values())
+    return DefaultsResolver(
+        tree,
+        {
+            categories['ROOT'].id: CtgDefaults(default_unit_of_measure='pc', default_shelf_life_days=365),
+            categories['FOOD'].id: CtgDefaults(default_storage_condition='perishable', default_shelf_life_days=30),
+            categories['CHEM'].id: CtgDefaults(default_storage_condition='hazardous', default_hazard_class='8'),
+        },
+    )
+
+
+def test_nearest_value_wins(resolver, categories):
+    fish = resolver.resolve(categories['FISH'].id)
+    assert fish.default_storage_condition == 'perishable'
+    assert fish.default_shelf_life_days == 30
+    assert fish.default_unit_of_measure == 'pc'
+    assert resolver.resolve(categories['ROOT'].id).default_storage_condition is None
+    assert resolver.resolve(None).default_unit_of_measure is None
+
+
+def test_memo_hit(resolver, categories):
+    resolver.resolve(categories['FISH'].id)
+    fish = resolver._memo[categories['FISH'].id]
+    assert categories['FOOD'].id in resolver._memo
+    resolver.resolve(categories['FISH'].id)
+    assert resolver._memo[categories['FISH'].id] is fish
+
+
+def test_invalidation_of_subtree(resolver, categories):
+    resolver.resolve(categories['FISH'].id)
+    resolver.resolve(categories['ACID'].id)
+    acid = resolver._memo[categories['ACID'].id]
+    resolver.set_defaults(categories['FOOD'].id, CtgDefaults(default_shelf_life_days=10))
+    assert resolver._memo[categories['ACID'].id] is acid
+    assert categories['FISH'].id not in resolver._memo
+    assert resolver.resolve(categories['FISH'].id).default_shelf_life_days == 10
+    assert resolver.resolve(categories['FISH'].id).default_storage_condition is None
+
+
+def test_storage_condition_and_hazard_class_inherited_together(resolver, categories):
+    assert resolver.resolve(categories['ACID'].id).default_hazard_class == '8'
+    resolver.set_defaults(categories['ACID'].id, CtgDefaults(default_storage_condition='ventilated'))
+    acid = resolver.resolve(categories['ACID'].id)
+    assert acid.default_storage_condition == 'ventilated'
+    assert acid.default_hazard_class is None
+
+
+def test_move_drops_memo(resolver, categories):
+    assert resolver.resolve(categories['FISH'].id).default_storage_condition == 'perishable'
+    resolver.tree.move(categories['FISH'].id, categories['CHEM'].id)
+    assert resolver.resolve(categories['FISH'].id).default_storage_condition == 'hazardous'
+
+
+def test_inconsistent_inherited_defaults(resolver, categories):
+    resolver.set_defaults(categories['FISH'].id, CtgDefaults(default_tracking_type='piece'))
+    with pytest.raises(ValueError, match='inconsistent'):
+        resolver.resolve(categories['FISH'].id)
+
+
+def test_resolved_defaults_are_copies(resolver, categories):
+    # ACID has no own defaults, so it shares merged defaults of CHEM in memo
+    acid = resolver.resolve(categories['ACID'].id)
+    acid.default_shelf_life_days = 1
+    resolver.resolve(None).default_shelf_life_days = 1
+    assert resolver.resolve(categories['ACID'].id).default_shelf_life_days == 365
+    assert resolver.resolve(categories['CHEM'].id).default_shelf_life_days == 365
+    assert resolver.resolve(None).default_shelf_life_days is None
+
+    own = CtgDefaults(default_shelf_life_days=7)
+    resolver.set_defaults(categories['CHEM'].id, own)
+    own.default_shelf_life_days = 1
+    assert resolver.resolve(categories['ACID'].id).default_shelf_life_days == 7
+
+
+def test_tracking_type_and_unit_inherited_together(resolver, categories):
+    # Weight based tracking of ACID does not take 'pc' unit of ROOT with it
+    resolver.set_defaults(categories['ACID'].id, CtgDefaults(default_tracking_type='weight_based'))
+    acid = resolver.resolve(categories['ACID'].id)
+    assert acid.default_tracking_type == 'weight_based'
+    assert acid.default_unit_of_measure is None
+    assert acid.default_shelf_life_days == 365
+    resolver.set_defaults(categories['CHEM'].id, CtgDefaults(default_unit_of_measure='kg'))
+    assert resolver.resolve(categories['CHEM'].id).default_tracking_type is None
+    assert resolver.resolve(categories['ACID'].id).default_unit_of_measure is None
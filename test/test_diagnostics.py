@@ -0,0 +1,57 @@
+import uuid
+import warnings
+import pytest
+from src.models import (
+    DiagnosticCode,
+    collect_diagnostics,
+    diagnostics_disabled,
+)
+from src.models.category.compositions import CtgDefaults, CtgStorageSettings
+from src.models.category.compositions.planning import CtgPlanning
+from .factories import make_product
+
+
+def odor_sensitive_product():
+    return make_product(handling={'is_odor_sensitive': True})
+
+
+def test_recommendations_warn_by_default():
+    with pytest.warns(UserWarning, match='For Odor sensitive products recommends ventailation'):
+        odor_sensitive_product()
+
+
+def test_collect_diagnostics_counts_per_rule():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        with collect_diagnostics(max_records=2) as collector:
+            for _ in range(3):
+                odor_sensitive_product()
+            CtgDefaults(default_storage_condition='electronics')
+            CtgPlanning(reorder_point=1, safety_stock=5)
+            CtgStorageSettings(default_picking_zone_id=uuid.uuid4(), putaway_strategy='fifo')
+
+    assert collector.counts == {
+        DiagnosticCode.HANDLING_ODOR_VENTILATION: 3,
+        DiagnosticCode.CTG_DEFAULTS_ELECTRONICS_TEMPERATURE: 1,
+        DiagnosticCode.CTG_PLANNING_REORDER_BELOW_SAFETY: 1,
+        DiagnosticCode.CTG_STORAGE_PICKING_WITHOUT_STORAGE: 1,
+        DiagnosticCode.CTG_STORAGE_PUTAWAY_WITHOUT_STORAGE: 1,
+    }
+    assert collector.total == 7
+    assert len(collector.records) == 2
+    assert collector.records[0].model == 'HandlingAttributes'
+
+
+def test_putaway_message_uses_enum_value():
+    with collect_diagnostics() as collector:
+        CtgStorageSettings(putaway_strategy='fefo')
+    assert collector.records[0].message.startswith('Putaway strategy "fefo" is set but')
+
+
+def test_diagnostics_disabled():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        with diagnostics_disabled():
+            assert odor_sensitive_product()
+    with pytest.warns(UserWarning):
+        odor_sensitive_product()
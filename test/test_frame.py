@@ -0,0 +1,84 @@
+import warnings
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+from src.catalog import ProductFrame
+from .factories import make_product
+
+
+def sample_products():
+    return [
+        make_product('SKU001', dimensions={'width_cm': 10, 'height_cm': 20, 'depth_cm': 30}),
+        make_product(
+            'SKU002',
+            category_id=None,
+            description='Frozen fish',
+            unit_of_measure='kg',
+            traceability={
+                'tracking_type': 'expiry_tracked',
+                'production_date': date.today() - timedelta(days=3),
+                'expiry_date': date.today() + timedelta(days=30),
+            },
+            storage_requirements={'storage_condition': 'perishable', 'temperature_regime': 'frozen'},
+            handling={'is_fragile': True, 'is_stackable': False},
+        ),
+        make_product(
+            'SKU003',
+            storage_requirements={'storage_condition': 'hazardous', 'hazard_class': '3'},
+            classification={'size_type': 'heavy', 'moving_type': 'slow moving'},
+            dimensions={'weight_kg': 120.5},
+            handling={'is_stackable': False, 'is_magnetic': True},
+        ),
+    ]
+
+
+def test_frame_round_trip():
+    products = sample_products()
+    frame = ProductFrame.from_products(products)
+
+    assert len(frame) == 3
+    assert frame.to_products() == products
+    assert frame.product(1) == products[1]
+    assert frame.to_products([2, 0]) == [products[2], products[0]]
+
+
+def test_frame_round_trip_of_aware_timestamps():
+    created = datetime(2024, 5, 1, 12, 30, tzinfo=timezone(timedelta(hours=3)))
+    products = [
+        make_product('SKU001', created_at=created, updated_at=created + timedelta(days=1)),
+        make_product('SKU002', created_at=datetime(2024, 5, 1, 12, 30), updated_at=datetime(2024, 5, 2)),
+    ]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        frame = ProductFrame.from_products(products)
+    assert frame.columns['created_at'][0] == np.datetime64('2024-05-01T09:30')
+    restored = frame.to_products()
+    assert restored == products
+    assert restored[0].created_at.tzinfo == timezone.utc and restored[0].updated_at.tzinfo == timezone.utc
+    assert restored[1].created_at.tzinfo is None
+
+
+def test_frame_column_types():
+    frame = ProductFrame.from_products(sample_products())
+
+    assert frame.columns['dimensions.weight_kg'].dtype == np.float64
+    assert np.isnan(frame.columns['dimensions.weight_kg'][0])
+    assert frame.columns['storage_requirements.storage_condition'].dtype == np.uint8
+    assert frame.columns['traceability.expiry_date'][1] == (date.today() + timedelta(days=30)).toordinal()
+    assert frame.columns['handling'].tolist() == [0b10, 0b1, 0b100000]
+
+
+def test_frame_filtering():
+    frame = ProductFrame.from_products(sample_products())
+
+    assert frame.eq('storage_requirements.storage_condition', 'perishable').tolist() == [False, True, False]
+    assert frame.eq('classification.size_type', None).tolist() == [True, True, False]
+    assert frame.isin('storage_requirements.hazard_class', ['3', '4']).tolist() == [False, False, True]
+    assert frame.flag('handling.is_stackable').tolist() == [True, False, False]
+    heavy = frame.where(frame.columns['dimensions.weight_kg'] > 50)
+    assert [product.sku for product in heavy.to_products()] == ['SKU003']
+
+
+def test_frame_is_compact():
+    products = [make_product(f'SKU{i:05d}') for i in range(1000)]
+    frame = ProductFrame.from_products(products)
+    assert frame.nbytes / len(frame) < 300
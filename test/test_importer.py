@@ -0,0 +1,114 @@
+import csv
+import json
+import uuid
+import pytest
+from src.catalog import import_products, import_categories, import_file, read_rows, unflatten
+from src.models import BaseProduct
+from .factories import product_row
+
+
+def write_csv(path, rows):
+    fields = sorted({key for row in rows for key in row})
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def test_unflatten_nested_compositions():
+    assert unflatten({'sku': 'A', 'dimensions.width_cm': 1, 'handling.is_fragile': True}) == {
+        'sku': 'A',
+        'dimensions': {'width_cm': 1},
+        'handling': {'is_fragile': True},
+    }
+
+
+def test_import_products_csv_in_chunks(tmp_path):
+    rows = [product_row(f'SKU{i:03d}', **{'dimensions.width_cm': 10, 'handling.is_fragile': ''}) for i in range(5)]
+    rows.append(product_row('bad sku'))
+    rows.append(product_row('SKU999', **{'handling.is_fragile': 'true', 'handling.is_stackable': 'false'}))
+    path = write_csv(tmp_path / 'products.csv', rows)
+
+    chunks = list(import_products(path, chunk_size=3))
+
+    assert [len(chunk.valid) for chunk in chunks] == [3, 2, 1]
+    assert all(isinstance(product, BaseProduct) for chunk in chunks for product in chunk.valid)
+    assert chunks[1].errors[0].position == 5
+    assert chunks[2].valid[0].handling.is_fragile is True
+    assert chunks[0].valid[0].dimensions.width_cm == 10.0
+    assert chunks[-1].stats.rows == 7 and chunks[-1].stats.errors == 1
+    assert chunks[-1].stats.rows_per_sec > 0
+
+
+def test_import_products_ndjson_with_broken_lines(tmp_path):
+    path = tmp_path / 'products.ndjson'
+    lines = [
+        json.dumps(product_row('SKU001')),
+        '{not json',
+        '',
+        json.dumps({**product_row('SKU003'), 'dimensions': {'weight_kg': 5}}),
+        '[1, 2]',
+    ]
+    path.write_text('\n'.join(lines), encoding='utf-8')
+
+    (chunk,) = import_products(path)
+
+    assert [product.sku for product in chunk.valid] == ['SKU001', 'SKU003']
+    assert chunk.valid[1].dimensions.weight_kg == 5
+    assert [error.position for error in chunk.errors] == [1, 3]
+    assert chunk.errors[0].errors[0]['type'] == 'json_invalid'
+
+
+def test_malformed_rows_are_errors(tmp_path):
+    csv_path = write_csv(tmp_path / 'products.csv', [product_row('SKU001'), product_row('SKU002')])
+    lines = csv_path.read_text(encoding='utf-8').splitlines()
+    lines[1] += ',extra'
+    csv_path.write_text('\n'.join(lines), encoding='utf-8')
+    ndjson_path = tmp_path / 'products.ndjson'
+    conflict = {**product_row('SKU002'), 'dimensions': None, 'dimensions.width_cm': 1}
+    ndjson_path.write_text('\n'.join(json.dumps(row) for row in (conflict, product_row('SKU003'))), encoding='utf-8')
+
+    (chunk,) = import_products(csv_path)
+    assert [product.sku for product in chunk.valid] == ['SKU002']
+    assert [(error.position, error.errors[0]['type']) for error in chunk.errors] == [(0, 'csv_extra_cells')]
+
+    (chunk,) = import_products(ndjson_path)
+    assert [product.sku for product in chunk.valid] == ['SKU003']
+    assert [(error.position, error.errors[0]['type']) for error in chunk.errors] == [(0, 'columns_conflict')]
+    with pytest.raises(ValueError, match='conflicts'):
+        unflatten({'dimensions.width_cm': 1, 'dimensions': None})
+
+
+def test_short_csv_row_uses_defaults(tmp_path):
+    row = product_row('SKU001')
+    path = tmp_path / 'products.csv'
+    header = ','.join([*row, 'description', 'handling.is_stackable'])
+    path.write_text(f'{header}\n' + ','.join(row.values()) + '\n', encoding='utf-8')
+
+    (read,) = read_rows(path, null_columns={'description'})
+    assert 'description' not in read and 'handling' not in read
+    (chunk,) = import_products(path)
+    assert chunk.errors == []
+    assert chunk.valid[0].handling.is_stackable is True and chunk.valid[0].description is None
+
+
+def test_import_categories_csv(tmp_path):
+    parent = uuid.uuid4()
+    path = write_csv(
+        tmp_path / 'categories.csv',
+        [
+            {'sku': 'ROOT', 'name': 'Root', 'description': ''},
+            {'sku': 'CHILD', 'name': 'Child', 'parent_id': str(parent), 'level': 1, 'description': 'child'},
+        ],
+    )
+    (chunk,) = import_categories(path)
+    assert [category.parent_id for category in chunk.valid] == [None, parent]
+    assert chunk.valid[1].level == 1
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError, match='Unsupported catalog file format'):
+        read_rows(tmp_path / 'products.xml')
+    with pytest.raises(ValueError, match='chunk_size must be at least 1'):
+        next(import_file(write_csv(tmp_path / 'p.csv', [product_row('SKU001')]), BaseProduct, chunk_size=0))
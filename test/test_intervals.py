@@ -0,0 +1,75 @@
+import uuid
+import pytest
+from src.hierarchy import CategoryTree, ProductRangeIndex, TreeIntervals
+from .factories import make_category, make_product
+
+
+@pytest.fixture
+def categories():
+    root = make_category('ROOT')
+    food = make_category('FOOD', root)
+    tech = make_category('TECH', root)
+    fish = make_category('FISH', food)
+    milk = make_category('MILK', food)
+    phones = make_category('PHONES', tech)
+    return {category.sku: category for category in (root, food, tech, fish, milk, phones)}
+
+
+@pytest.fixture
+def tree(categories):
+    return CategoryTree.from_categories(categories.values())
+
+
+def test_descendant_checks(tree, categories):
+    intervals = TreeIntervals(tree)
+    root, food, fish, phones = (categories[sku].id for sku in ('ROOT', 'FOOD', 'FISH', 'PHONES'))
+    assert intervals.is_descendant(fish, root)
+    assert intervals.is_descendant(fish, food)
+    assert not intervals.is_descendant(phones, food)
+    assert not intervals.is_descendant(food, food)
+    assert intervals.is_descendant(food, food, include_self=True)
+    assert not intervals.is_descendant(uuid.uuid4(), root)
+    assert intervals.interval(root) == (0, 5)
+    assert sorted(tree[node].sku for node in intervals.subtree(food)) == ['FISH', 'FOOD', 'MILK']
+
+
+def test_numbering_is_rebuilt_after_change(tree, categories):
+    intervals = TreeIntervals(tree)
+    fish, tech = categories['FISH'].id, categories['TECH'].id
+    assert not intervals.is_descendant(fish, tech)
+    tree.move(fish, tech)
+    assert intervals.is_descendant(fish, tech)
+    assert not intervals.is_descendant(fish, categories['FOOD'].id)
+
+
+def test_products_by_category_range(tree, categories):
+    products = [
+        make_product('SKU001', categories['FISH']),
+        make_product('SKU002', categories['PHONES']),
+        make_product('SKU003', categories['MILK']),
+        make_product('SKU004', categories['FOOD']),
+        make_product('SKU005', None),
+    ]
+    index = ProductRangeIndex(TreeIntervals(tree), products)
+    assert sorted(product.sku for product in index.products_under(categories['FOOD'].id)) == [
+        'SKU001',
+        'SKU003',
+        'SKU004',
+    ]
+    assert index.count(categories['ROOT'].id) == 4
+    assert index.count(categories['TECH'].id) == 1
+    assert index.count(uuid.uuid4()) == 0
+
+    tree.move(categories['MILK'].id, categories['TECH'].id)
+    assert sorted(product.sku for product in index.products_under(categories['TECH'].id)) == ['SKU002', 'SKU003']
+
+
+def test_category_keys(tree, categories):
+    intervals = TreeIntervals(tree)
+    products = [make_product('SKU001', categories['FISH']), make_product('SKU002', None)]
+    index = ProductRangeIndex(intervals, products)
+    assert index.category_keys().tolist() == [intervals.numbers[categories['FISH'].id], -1]
+    version = index.version
+    tree.move(categories['FISH'].id, categories['TECH'].id)
+    assert index.version != version
+    assert index.category_keys()[0] == intervals.enter(categories['FISH'].id)
@@ -0,0 +1,112 @@
+import uuid
+from src.hierarchy import CategoryTree, load_categories
+from src.models import Category
+
+
+def row(sku, parent=None, **kwargs):
+    data = {'id': uuid.uuid4(), 'sku': sku, 'name': sku.title(), 'description': None}
+    data['parent_id'] = parent['id'] if parent else None
+    data.update(kwargs)
+    return data
+
+
+def error_types(result):
+    return {error.position: error.errors[0]['type'] for error in result.errors}
+
+
+def test_valid_batch_gets_level_and_path():
+    root = row('ROOT')
+    food = row('FOOD', root)
+    fish = row('FISH', food)
+    # Children before parents
+    result = load_categories([fish, food, root])
+    assert result.errors == []
+    assert [category.sku for category in result.valid] == ['FISH', 'FOOD', 'ROOT']
+    assert result.valid[0].path == '/ROOT/FOOD/FISH'
+    assert result.valid[0].level == 2
+    assert result.valid[2].path == '/ROOT'
+
+
+def test_orphans_cycles_and_duplicates():
+    root = row('ROOT')
+    orphan = row('ORPHAN', parent_id=uuid.uuid4())
+    under_orphan = row('UNDERORPHAN', orphan)
+    first, second = row('CYCA'), row('CYCB')
+    first['parent_id'], second['parent_id'] = second['id'], first['id']
+    under_cycle = row('UNDERCYCLE', first)
+    duplicate = row('ROOT')
+    under_duplicate = row('UNDERDUP', duplicate)
+    self_parent = row('SELF')
+    self_parent['parent_id'] = self_parent['id']
+    invalid = row('bad sku')
+    under_invalid = row('UNDERBAD', invalid)
+    rows = [
+        root,
+        orphan,
+        under_orphan,
+        first,
+        second,
+        under_cycle,
+        duplicate,
+        under_duplicate,
+        self_parent,
+        invalid,
+        under_invalid,
+    ]
+    result = load_categories(rows)
+    assert [category.sku for category in result.valid] == ['ROOT']
+    assert error_types(result) == {
+        1: 'parent_missing',
+        2: 'parent_invalid',
+        3: 'parent_cycle',
+        4: 'parent_cycle',
+        5: 'parent_invalid',
+        6: 'duplicate_sku',
+        7: 'parent_invalid',
+        8: 'parent_cycle',
+        9: 'string_pattern_mismatch',
+        10: 'parent_invalid',
+    }
+    assert result.errors[0].errors[0]['loc'] == ('parent_id',)
+
+
+def test_non_mapping_rows_are_reported():
+    root = row('ROOT')
+    result = load_categories(['abc', None, [1, 2], root])
+    assert [category.sku for category in result.valid] == ['ROOT']
+    assert error_types(result) == {0: 'model_type', 1: 'model_type', 2: 'model_type'}
+
+
+def test_load_into_existing_tree():
+    root = Category(sku='ROOT', name='Root', description=None, path='/ROOT')
+    tree = CategoryTree.from_categories([root])
+    child = row('CHILD', parent_id=root.id)
+    result = load_categories([child, row('ROOT'), {**child, 'sku': 'OTHER'}], tree)
+    assert [category.path for category in result.valid] == ['/ROOT/CHILD']
+    assert result.valid[0].level == 1
+    assert error_types(result) == {1: 'duplicate_sku', 2: 'duplicate_id'}
+    assert result.valid[0].id in tree
+
+
+def test_long_paths_are_rejected():
+    parent = None
+    rows = []
+    for number in range(60):
+        parent = row(f'LEVEL{number:010}', parent)
+        rows.append(parent)
+    result = load_categories(rows)
+    assert len(result.valid) + len(result.errors) == 60
+    assert {error.errors[0]['type'] for error in result.errors} == {'string_too_long'}
+    assert all(len(category.path) <= 500 for category in result.valid)
+
+
+def test_deep_chain_is_linear():
+    parent = None
+    rows = []
+    for number in range(3000):
+        parent = row(f'C{number:05}', parent, path=None)
+        rows.append(parent)
+    rows[0]['parent_id'] = rows[-1]['id']
+    result = load_categories(rows)
+    assert result.valid == []
+    assert {error.errors[0]['type'] for error in result.errors} == {'parent_cycle'}
@@ -0,0 +1,34 @@
+import pytest
+from src.catalog import validate_parallel
+from .factories import product_data
+
+
+def sample_rows():
+    dimensions = {'width_cm': 10, 'height_cm': 10, 'depth_cm': 10}
+    rows = [product_data(f'SKU{i:04d}', dimensions=dict(dimensions)) for i in range(40)]
+    rows[7]['sku'] = 'bad sku'
+    rows[33]['role_type'] = 'returns'
+    return rows
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_validate_parallel_preserves_order(workers):
+    chunks = list(validate_parallel(sample_rows(), chunk_size=6, workers=workers))
+
+    assert [chunk.offset for chunk in chunks] == list(range(0, 40, 6))
+    indexes = [index for chunk in chunks for index in chunk.indexes]
+    assert indexes == [index for index in range(40) if index not in (7, 33)]
+    assert [error.position for chunk in chunks for error in chunk.errors] == [7, 33]
+
+    rows = [row for chunk in chunks for row in chunk.rows()]
+    assert [row['sku'] for row in rows] == [f'SKU{index:04d}' for index in indexes]
+    assert rows[0]['dimensions']['volume_m3'] == 0.001
+    assert rows[0]['traceability']['tracking_type'] == 'piece'
+
+
+def test_validate_parallel_arguments():
+    with pytest.raises(ValueError, match='chunk_size must be at least 1'):
+        next(validate_parallel(sample_rows(), chunk_size=0))
+    for workers in (0, -1):
+        with pytest.raises(ValueError, match='workers must be at least 1'):
+            next(validate_parallel(sample_rows(), workers=workers))
@@ -1,8 +1,10 @@
+import gc
 import pytest
 from datetime import date, timedelta
 import uuid
 from src.models import (
     BaseProduct,
+    Dimensions,
     Traceability,
     UnitOfMeasure,
     ProductPhysicalState,
@@ -17,6 +19,9 @@ from src.models import (
     TemperatureRegime,
     HazardClass,
 )
+from src.models.product.batch import gc_paused
+from src.models.product.rules import allowed_units, tracking_type_physical_state_error
+from src.models.category.compositions import CtgDefaults
 from src.models.product.constants import (
     HEAVY_MIN_KG,
     LIGHT_MAX_KG,
@@ -28,7 +33,8 @@ from src.models.product.constants import (
 # ----------------------------------------------------------------------
 # Helper function to create a minimal valid product
 # ----------------------------------------------------------------------
-def minimal_product(**kwargs):
+def minimal_data(**kwargs):
+    """Input of minimal valid product, also used as raw row of batch validation"""
     defaults = {
         'sku': 'TEST001',
         'name': 'Test Product',
@@ -40,7 +46,11 @@ def minimal_product(**kwargs):
         'traceability': Traceability(tracking_type=ProductTrackingType.PIECE),
     }
     defaults.update(kwargs)
-    return BaseProduct(**defaults)
+    return defaults
+
+
+def minimal_product(**kwargs):
+    return BaseProduct(**minimal_data(**kwargs))
 
 
 # ----------------------------------------------------------------------
@@ -599,3 +609,150 @@ def test_complex_product_creation():
     assert product.dimensions.volume_m3 == (150 * 200 * 300) / 1_000_000
     assert product.traceability.expiry_date == date.today() + timedelta(days=30)
     assert product.storage_requirements.temperature_regime == TemperatureRegime.CHILLED
+
+
+# ----------------------------------------------------------------------
+# 9. Batch validation
+# ----------------------------------------------------------------------
+def test_validate_many_collects_valid_and_errors():
+    rows = [
+        minimal_data(sku='SKU001'),
+        minimal_data(sku='bad sku'),
+        minimal_data(sku='SKU003', dimensions={'width_cm': 10, 'height_cm': 10, 'depth_cm': 10}),
+        minimal_data(sku='SKU004', role_type=ProductRoleType.RETURNS),
+    ]
+    result = BaseProduct.validate_many(rows)
+
+    assert [product.sku for product in result.valid] == ['SKU001', 'SKU003']
+    assert result.valid[1].dimensions.volume_m3 == 0.001
+    assert [error.position for error in result.errors] == [1, 3]
+    assert result.errors[0].errors[0]['loc'] == ('sku',)
+    assert 'Returned products must require quarantine' in result.errors[1].errors[0]['msg']
+
+
+def test_validate_many_matches_single_construction():
+    row = minimal_data(dimensions={'width_cm': 100, 'height_cm': 200, 'depth_cm': 50})
+    (batch_product,) = BaseProduct.validate_many([row]).valid
+    assert batch_product.model_dump(exclude={'created_at', 'updated_at'}) == BaseProduct(**row).model_dump(
+        exclude={'created_at', 'updated_at'}
+    )
+    assert 'volume_m3' in batch_product.dimensions.model_fields_set
+
+
+def test_gc_paused_keeps_collector_state():
+    assert gc.isenabled()
+    with gc_paused():
+        with gc_paused():
+            assert not gc.isenabled()
+        # Collector is resumed only when outermost pause exits
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+    gc.disable()
+    try:
+        with gc_paused():
+            pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+
+# ----------------------------------------------------------------------
+# 10. Compiled rule tables
+# ----------------------------------------------------------------------
+def test_allowed_units_for_state_and_tracking():
+    assert allowed_units(ProductPhysicalState.LIQUID, ProductTrackingType.WEIGHT_BASED) == {
+        UnitOfMeasure.LITER,
+        UnitOfMeasure.MILLILITER,
+    }
+    # Enum values are accepted same as enum members
+    assert allowed_units('bulk', 'weight_based') == {
+        UnitOfMeasure.KILOGRAM,
+        UnitOfMeasure.GRAM,
+        UnitOfMeasure.CUBIC_METER,
+    }
+    assert allowed_units(ProductPhysicalState.GAS, ProductTrackingType.PIECE) == frozenset()
+    assert allowed_units(tracking_type=ProductTrackingType.KIT) == {UnitOfMeasure.SET, UnitOfMeasure.PIECE}
+    assert allowed_units() == frozenset(UnitOfMeasure)
+
+
+def test_allowed_units_agree_with_model():
+    for state in ProductPhysicalState:
+        for tracking in (ProductTrackingType.PIECE, ProductTrackingType.KIT, ProductTrackingType.WEIGHT_BASED):
+            for unit in UnitOfMeasure:
+                row = minimal_data(
+                    unit_of_measure=unit,
+                    physical_state=state,
+                    traceability={'tracking_type': tracking},
+                    handling={'requires_ventilation': True},
+                )
+                result = BaseProduct.validate_many([row])
+                assert bool(result.valid) == (unit in allowed_units(state, tracking))
+
+
+def test_tracking_type_physical_state_rule():
+    # Unit rules of both sides already reject these pairs, so rule is checked directly
+    for state in (ProductPhysicalState.LIQUID, ProductPhysicalState.GAS, ProductPhysicalState.BULK):
+        for tracking in (ProductTrackingType.PIECE, ProductTrackingType.KIT):
+            assert tracking_type_physical_state_error(state.value, tracking.value) == (
+                f'{state.value.capitalize()} products cannot be tracked by {tracking.value}'
+            )
+    assert tracking_type_physical_state_error('solid', 'piece') is None
+
+
+def test_category_defaults_share_tracking_rules():
+    assert CtgDefaults(default_tracking_type=ProductTrackingType.KIT, default_unit_of_measure=UnitOfMeasure.SET)
+    with pytest.raises(ValueError, match='Kit tracking requires unit_of_measure in'):
+        CtgDefaults(default_tracking_type=ProductTrackingType.KIT, default_unit_of_measure=UnitOfMeasure.BOX)
+
+
+# ----------------------------------------------------------------------
+# 11. Trusted rehydration
+# ----------------------------------------------------------------------
+def test_from_trusted_rebuilds_compositions():
+    product = minimal_product(
+        dimensions={'width_cm': 100, 'height_cm': 200, 'depth_cm': 50},
+        storage_requirements={'storage_condition': ProductStorageCondition.HAZARDOUS, 'hazard_class': '3'},
+    )
+    data = product.model_dump()
+    trusted = BaseProduct.from_trusted(data)
+
+    assert trusted == product
+    assert isinstance(trusted.dimensions, Dimensions)
+    assert trusted.dimensions.volume_m3 == 1.0
+    assert trusted.storage_requirements.hazard_class == HazardClass.CLASS_3
+    assert trusted.model_dump() == data
+
+
+def test_from_trusted_fills_missing_compositions():
+    data = minimal_data()
+    data['traceability'] = {'tracking_type': 'piece'}
+    trusted = BaseProduct.from_trusted(data)
+    assert trusted.handling.is_stackable is True
+    assert trusted.classification.size_type is None
+    assert trusted.model_fields_set == set(data)
+
+
+def test_from_trusted_sampled_verification():
+    corrupted = minimal_product().model_dump()
+    corrupted['sku'] = 'bad sku'
+
+    # Without verification corrupted record is trusted as is
+    assert BaseProduct.from_trusted(corrupted).sku == 'bad sku'
+    with pytest.raises(ValueError, match='sku'):
+        BaseProduct.from_trusted(corrupted, verify=True)
+
+    # With verify_every=N rows 0, N, 2N... of each call are validated, failures are collected
+    rows = [minimal_product(sku=f'SKU00{i}').model_dump() for i in range(6)]
+    rows[1]['sku'] = rows[3]['sku'] = 'bad sku'
+    for _ in range(2):
+        result = BaseProduct.from_trusted_many(rows, verify_every=3)
+        assert [product.sku for product in result.valid] == ['SKU000', 'bad sku', 'SKU002', 'SKU004', 'SKU005']
+        assert [error.position for error in result.errors] == [3]
+        assert result.errors[0].errors[0]['loc'] == ('sku',)
+
+
+def test_from_trusted_many():
+    products = [minimal_product(sku=f'SKU00{i}') for i in range(3)]
+    result = BaseProduct.from_trusted_many(product.model_dump() for product in products)
+    assert result.valid == products and result.errors == []
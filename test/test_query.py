@@ -0,0 +1,74 @@
+import pytest
+from src.catalog import ProductCatalog
+from src.hierarchy import CategoryTree
+from .factories import make_category, make_product
+
+
+@pytest.fixture
+def categories():
+    root = make_category('ROOT')
+    food = make_category('FOOD', root)
+    fish = make_category('FISH', food)
+    tech = make_category('TECH', root)
+    return {category.sku: category for category in (root, food, fish, tech)}
+
+
+@pytest.fixture
+def catalog(categories):
+    hazardous = {'storage_condition': 'hazardous', 'hazard_class': '3'}
+    products = [
+        make_product('SKU001', categories['FISH'], dimensions={'weight_kg': 80}, storage_requirements=hazardous),
+        make_product('SKU002', categories['FISH'], dimensions={'weight_kg': 20}, storage_requirements=hazardous),
+        make_product('SKU003', categories['FOOD'], dimensions={'weight_kg': 60}, storage_requirements=hazardous),
+        make_product('SKU004', categories['TECH'], dimensions={'weight_kg': 70}),
+        make_product('SKU005', categories['TECH'], handling={'is_fragile': True, 'is_stackable': False}),
+    ]
+    return ProductCatalog(products, CategoryTree.from_categories(categories.values()))
+
+
+def skus(products):
+    return [product.sku for product in products]
+
+
+def test_query_conditions(catalog, categories):
+    assert skus(catalog.query(storage_condition='hazardous', weight_kg__gt=50)) == ['SKU001', 'SKU003']
+    assert skus(catalog.query(weight_kg__gte=60, weight_kg__lt=80)) == ['SKU003', 'SKU004']
+    assert skus(catalog.query(weight_kg=20)) == ['SKU002']
+    assert skus(catalog.query(category_under=categories['FOOD'].id, weight_kg__lte=60)) == ['SKU002', 'SKU003']
+    assert skus(catalog.query(category_under=categories['ROOT'].id, is_fragile=True)) == ['SKU005']
+    assert skus(catalog.query({'storage_requirements.hazard_class': None})) == ['SKU004', 'SKU005']
+    fish = categories['FISH'].id
+    in_fish = catalog.query(storage_condition__in=['perishable', 'hazardous'], category_under=fish)
+    assert skus(in_fish) == ['SKU001', 'SKU002']
+    assert catalog.count() == 5
+    assert catalog.count(storage_condition='hazardous', weight_kg__gt=50) == 2
+    assert catalog.count(weight_kg__gt=100) == 0
+
+
+def test_query_plan_orders_by_selectivity(catalog, categories):
+    plan = catalog.explain(storage_condition='hazardous', weight_kg__gt=75, category_under=categories['ROOT'].id)
+
+    assert [step.estimate for step in plan] == [1, 3, 5]
+    assert 'weight_kg' in plan[0].predicate
+    assert 'storage_condition' in plan[1].predicate
+
+
+def test_query_sees_updated_enums(catalog):
+    product = catalog.products[3]
+    product.classification.moving_type = 'fast moving'
+    catalog.update(product)
+
+    assert skus(catalog.query(moving_type='fast moving')) == ['SKU004']
+
+
+def test_query_errors(catalog):
+    with pytest.raises(ValueError, match='Unknown query field'):
+        catalog.count(colour='red')
+    with pytest.raises(ValueError, match='not supported'):
+        catalog.count(storage_condition__gt='hazardous')
+    with pytest.raises(ValueError, match="Unknown value 'boiling' of storage_requirements.storage_condition"):
+        catalog.count(storage_condition='boiling')
+    with pytest.raises(ValueError, match="Unknown value 'X' of"):
+        catalog.count(hazard_class__in=['3', 'X'])
+    with pytest.raises(ValueError, match='category tree'):
+        ProductCatalog(catalog.products).count(category_under=None)
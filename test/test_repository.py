@@ -0,0 +1,229 @@
+import gc
+import threading
+import uuid
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from src.repository import CategoryRepository, ConnectionPool, ProductRepository, sqlite
+from src.models import Category
+from .factories import make_product
+
+
+@pytest.fixture(params=['memory', 'file'])
+def pool(request, tmp_path):
+    database = ':memory:' if request.param == 'memory' else tmp_path / 'wms.db'
+    with ConnectionPool(database, readers=2) as pool:
+        yield pool
+
+
+def test_product_roundtrip(pool):
+    repository = ProductRepository(pool)
+    category_id = uuid.uuid4()
+    today = date.today()
+    products = [
+        make_product('SKU001', category_id, name='Тестовый товар'),
+        make_product(
+            'SKU002',
+            category_id,
+            description='Frozen fish',
+            unit_of_measure='kg',
+            physical_state='solid',
+            traceability={
+                'tracking_type': 'expiry_tracked',
+                'production_date': today - timedelta(days=2),
+                'expiry_date': today + timedelta(days=90),
+            },
+            storage_requirements={'storage_condition': 'perishable', 'temperature_regime': 'frozen'},
+            dimensions={'weight_kg': 1.5, 'width_cm': 10, 'height_cm': 20, 'depth_cm': 30},
+            handling={'is_fragile': True, 'is_stackable': False},
+            created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            updated_at=datetime(2024, 1, 2, tzinfo=timezone.utc),
+        ),
+        make_product('SKU003'),
+    ]
+    assert repository.upsert_many(products, batch_size=2) == 3
+    assert repository.count() == 3
+    for product in products:
+        assert repository.get(product.sku) == product
+    assert repository.get('MISSING') is None
+    assert [product.sku for product in repository.by_category(category_id)] == ['SKU001', 'SKU002']
+    assert [product.sku for product in repository.get_many(['SKU003', 'MISSING', 'SKU001'])] == ['SKU003', 'SKU001']
+    assert [product.sku for product in repository.iter_all(batch_size=2)] == ['SKU001', 'SKU002', 'SKU003']
+
+
+def test_product_upsert_replaces(pool):
+    repository = ProductRepository(pool)
+    repository.upsert(make_product('SKU001'))
+    repository.upsert(make_product('SKU001', name='Renamed', status='inactive'))
+    assert repository.count() == 1
+    assert repository.get('SKU001').name == 'Renamed'
+    assert repository.delete('SKU001') and not repository.delete('SKU001')
+
+
+def test_failed_batch_is_rolled_back(pool):
+    repository = ProductRepository(pool)
+
+    def rows():
+        yield make_product('SKU001')
+        raise RuntimeError('feed broken')
+
+    with pytest.raises(RuntimeError):
+        repository.upsert_many(rows(), batch_size=10)
+    assert repository.count() == 0
+
+
+def test_compositions_are_columns(pool):
+    repository = ProductRepository(pool)
+    repository.upsert(make_product('SKU001', handling={'is_fragile': True, 'is_stackable': False}))
+    with pool.reader() as connection:
+        rows = connection.execute('SELECT sku FROM products WHERE handling__is_fragile = 1').fetchall()
+    assert rows == [('SKU001',)]
+
+
+def test_category_repository(pool):
+    repository = CategoryRepository(pool)
+    root = Category(sku='ROOT', name='Root', description='Корень', path='/ROOT')
+    second = Category(sku='SECOND', name='Second', description=None, parent_id=root.id, sort_order=2, level=1)
+    first = Category(sku='FIRST', name='First', description=None, parent_id=root.id, sort_order=1, is_active=False)
+    assert repository.upsert_many([root, second, first]) == (3, [])
+    assert repository.get(root.id) == root
+    assert repository.get(uuid.uuid4()) is None
+    assert [category.sku for category in repository.children(root.id)] == ['FIRST', 'SECOND']
+    assert [category.sku for category in repository.children(None)] == ['ROOT']
+    tree = repository.load_tree()
+    assert len(tree) == 3 and tree[first.id] == first
+    assert repository.delete(first.id)
+    assert repository.count() == 2
+
+
+def test_concurrent_readers(pool):
+    repository = ProductRepository(pool)
+    repository.upsert_many(make_product(f'SKU{number:03}') for number in range(50))
+    results = []
+
+    def read():
+        results.append(repository.count())
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [50] * 8
+
+
+def test_reads_during_writes(pool):
+    repository = ProductRepository(pool)
+    repository.upsert_many(make_product(f'SKU{number:03}') for number in range(50))
+    errors = []
+    stop = threading.Event()
+
+    def write():
+        number = 50
+        while not stop.is_set():
+            repository.upsert_many(make_product(f'SKU{number + offset:03}') for offset in range(5))
+            number += 5
+
+    def read():
+        try:
+            for _ in range(100):
+                assert repository.get('SKU001') is not None
+                assert repository.count() >= 50
+        except Exception as error:
+            errors.append(error)
+
+    writer = threading.Thread(target=write)
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    writer.start()
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    stop.set()
+    writer.join()
+    assert errors == []
+
+
+def test_subtree_queries(pool):
+    categories = CategoryRepository(pool)
+    products = ProductRepository(pool)
+    root = Category(sku='ROOT', name='Root', description=None)
+    food = Category(sku='FOOD', name='Food', description=None, parent_id=root.id, sort_order=2)
+    fish = Category(sku='FISH', name='Fish', description=None, parent_id=food.id)
+    tech = Category(sku='TECH', name='Tech', description=None, parent_id=root.id, sort_order=1)
+    categories.upsert_many([root, food, fish, tech])
+    products.upsert_many(
+        [make_product('SKU003', fish.id), make_product('SKU001', food.id), make_product('SKU002', tech.id)]
+    )
+
+    assert [category.sku for category in categories.subtree(root.id)] == ['ROOT', 'TECH', 'FOOD', 'FISH']
+    assert [category.sku for category in categories.subtree(food.id)] == ['FOOD', 'FISH']
+    assert categories.subtree(uuid.uuid4()) == []
+    subtree = [category.id for category in categories.subtree(food.id)]
+    assert [product.sku for product in products.by_categories(subtree)] == ['SKU001', 'SKU003']
+
+
+def test_paused_iteration_does_not_block_writers(pool):
+    repository = ProductRepository(pool)
+    repository.upsert_many(make_product(f'SKU{number:03}') for number in range(5))
+    products = repository.iter_all(batch_size=2)
+    assert next(products).sku == 'SKU000'
+
+    writer = threading.Thread(target=repository.upsert, args=(make_product('SKU100'),))
+    writer.start()
+    writer.join(timeout=5)
+    assert not writer.is_alive()
+    assert [product.sku for product in products] == ['SKU001', 'SKU002', 'SKU003', 'SKU004', 'SKU100']
+
+
+def test_reads_keep_garbage_collector_enabled(pool, monkeypatch):
+    # Collector is process-wide, reads running in many threads must not pause it
+    states = []
+
+    def recording(decode):
+        def wrapper(row):
+            states.append(gc.isenabled())
+            return decode(row)
+
+        return wrapper
+
+    monkeypatch.setattr(sqlite, 'product_from_row', recording(sqlite.product_from_row))
+    monkeypatch.setattr(sqlite, 'category_from_row', recording(sqlite.category_from_row))
+    products = ProductRepository(pool)
+    categories = CategoryRepository(pool)
+    product = make_product('SKU000')
+    products.upsert_many([product, make_product('SKU001')])
+    categories.upsert(Category(sku='ROOT', name='Root', description=None))
+
+    products.get_many(['SKU000', 'SKU001'])
+    products.by_category(product.category_id)
+    list(products.iter_all(batch_size=1))
+    categories.all()
+    assert states and all(states)
+
+
+def test_subtree_of_stored_cycle(pool):
+    categories = CategoryRepository(pool)
+    first = Category(sku='FIRST', name='First', description=None)
+    second = Category(sku='SECOND', name='Second', description=None, parent_id=first.id)
+    categories.upsert_many([first, second])
+    with pool.writer() as connection:
+        connection.execute('UPDATE categories SET parent_id = ? WHERE id = ?', (second.id.bytes, first.id.bytes))
+    assert [category.sku for category in categories.subtree(first.id)] == ['FIRST', 'SECOND']
+
+
+def test_category_sku_conflict_is_row_error(pool):
+    repository = CategoryRepository(pool)
+    root = Category(sku='ROOT', name='Root', description=None)
+    repository.upsert(root)
+    taken = Category(sku='ROOT', name='Other root', description=None)
+    other = Category(sku='OTHER', name='Other', description=None)
+    third = Category(sku='THIRD', name='Third', description=None)
+
+    written, errors = repository.upsert_many([other, third, taken], batch_size=2)
+    assert written == 2 and [error.position for error in errors] == [2]
+    assert 'UNIQUE' in errors[0].errors[0]['msg']
+    written, errors = repository.upsert_many([other, taken, third])
+    assert written == 2 and [error.position for error in errors] == [1]
+    assert repository.count() == 3 and repository.get(taken.id) is None
+    with pytest.raises(ValueError, match='ROOT not written'):
+        repository.upsert(taken)
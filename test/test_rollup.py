@@ -0,0 +1,90 @@
+import random
+import pytest
+from src.hierarchy import CategoryTree, PlanningRollup, SubtreeAggregate
+from src.models.category.compositions.planning import CtgPlanning
+from .factories import make_category
+
+
+@pytest.fixture
+def categories():
+    root = make_category('ROOT')
+    food = make_category('FOOD', root)
+    fish = make_category('FISH', food)
+    milk = make_category('MILK', food)
+    tech = make_category('TECH', root)
+    return {category.sku: category for category in (root, food, fish, milk, tech)}
+
+
+@pytest.fixture
+def rollup(categories):
+    tree = CategoryTree.from_categories(categories.values())
+    return PlanningRollup(
+        tree,
+        planning={
+            categories['FISH'].id: CtgPlanning(
+                min_stock_level=10, max_stock_level=100, reorder_point=20, safety_stock=5
+            ),
+            categories['MILK'].id: CtgPlanning(
+                min_stock_level=30, max_stock_level=60, reorder_point=40, safety_stock=15
+            ),
+            categories['TECH'].id: CtgPlanning(reorder_point=7),
+        },
+        stock={categories['FISH'].id: 50, categories['MILK'].id: 10},
+    )
+
+
+def test_summary(rollup, categories):
+    food = rollup.summary(categories['FOOD'].id)
+    assert food.sums['min_stock_level'] == 40
+    assert food.sums['reorder_point'] == 60
+    assert food.sums['stock'] == 60
+    assert food.mins['reorder_point'] == 20
+    assert food.mins['stock'] == 10
+    assert food.needs_reorder and not food.below_safety and not food.over_max
+
+    root = rollup.summary(categories['ROOT'].id)
+    assert root.sums['reorder_point'] == 67
+    assert root.mins['reorder_point'] == 7
+    assert rollup.summary(categories['TECH'].id).mins['stock'] is None
+
+
+def test_leaf_changes_update_ancestors(rollup, categories):
+    rollup.add_stock(categories['MILK'].id, 90)
+    assert rollup.summary(categories['ROOT'].id).sums['stock'] == 150
+    assert rollup.summary(categories['FOOD'].id).mins['stock'] == 50
+    assert rollup.summary(categories['FOOD'].id).over_max is False
+
+    rollup.set_planning(categories['FISH'].id, None)
+    food = rollup.summary(categories['FOOD'].id)
+    assert food.sums['reorder_point'] == 40
+    assert food.mins['safety_stock'] == 15
+    assert rollup.summary(categories['ROOT'].id).mins['reorder_point'] == 7
+
+
+def test_move_rebuilds(rollup, categories):
+    rollup.tree.move(categories['FISH'].id, categories['TECH'].id)
+    assert rollup.summary(categories['TECH'].id).sums['stock'] == 50
+    assert rollup.summary(categories['FOOD'].id).sums['stock'] == 10
+    assert rollup.summary(categories['TECH'].id).mins['reorder_point'] == 7
+
+
+def test_aggregate_matches_full_recompute():
+    rng = random.Random(7)
+    categories = [make_category('ROOT')]
+    for number in range(200):
+        categories.append(make_category(f'C{number:04}', rng.choice(categories)))
+    tree = CategoryTree.from_categories(categories)
+    aggregate = SubtreeAggregate(tree)
+    values = {}
+    for _ in range(2000):
+        category_id = rng.choice(categories).id
+        value = rng.choice([None, rng.randint(0, 100)])
+        aggregate.set(category_id, value)
+        if value is None:
+            values.pop(category_id, None)
+        else:
+            values[category_id] = value
+    for category in categories:
+        subtree = list(tree.subtree(category.id))
+        assert aggregate.sum(category.id) == sum(values.get(node, 0) for node in subtree)
+        assert aggregate.min(category.id) == min((values[node] for node in subtree if node in values), default=None)
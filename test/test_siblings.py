@@ -0,0 +1,115 @@
+import random
+import uuid
+from datetime import datetime, timezone
+import pytest
+from src.hierarchy import CategoryTree, SiblingIndex
+from src.hierarchy.siblings import SortedKeys
+from .factories import make_category
+
+
+@pytest.fixture
+def root():
+    return make_category('ROOT')
+
+
+@pytest.fixture
+def index(root):
+    children = [make_category(f'C{number:03}', root, sort_order=number * 10) for number in range(10)]
+    # Built from unsorted children
+    return SiblingIndex(CategoryTree.from_categories([root, *reversed(children)]))
+
+
+def skus(index, ids):
+    return [index.tree[node].sku for node in ids]
+
+
+def test_paging_and_rank(index, root):
+    assert index.count(root.id) == 10
+    assert skus(index, index.page(root.id, 0, 3)) == ['C000', 'C001', 'C002']
+    assert skus(index, index.page(root.id, 8, 5)) == ['C008', 'C009']
+    assert index.tree[index.at(root.id, 4)].sku == 'C004'
+    assert index.rank(index.at(root.id, 7)) == 7
+    assert index.page(None) == [root.id]
+
+
+def test_add_and_remove(index, root):
+    child = make_category('NEW', root, sort_order=25)
+    assert index.add(child) == 3
+    assert index.rank(child.id) == 3
+    index.remove(index.at(root.id, 0))
+    assert index.rank(child.id) == 2
+    assert index.count(root.id) == 10
+
+
+def test_move_into_gap_touches_only_moved(index, root):
+    moved = index.at(root.id, 8)
+    assert index.move_to(moved, 2) == [moved]
+    assert index.tree[moved].sort_order == 15
+    assert index.rank(moved) == 2
+    assert skus(index, index.page(root.id, 0, 4)) == ['C000', 'C001', 'C008', 'C002']
+
+
+def test_move_without_gap_shifts_colliding_siblings(root):
+    children = [make_category(f'C{number:03}', root, sort_order=number) for number in range(6)]
+    index = SiblingIndex(CategoryTree.from_categories([root, *children]))
+    changed = index.move_to(children[5].id, 1)
+    assert skus(index, index.page(root.id)) == ['C000', 'C005', 'C001', 'C002', 'C003', 'C004']
+    assert [child.sort_order for child in children] == [0, 2, 3, 4, 5, 1]
+    assert set(changed) == {child.id for child in children[1:]}
+
+    # Move to front, first value is 0 so next sibling is shifted
+    changed = index.move_to(children[3].id, 0)
+    assert skus(index, index.page(root.id, 0, 3)) == ['C003', 'C000', 'C005']
+    assert children[3].sort_order == 0 and children[0].sort_order == 1
+    assert children[0].updated_at >= children[0].created_at
+
+
+def test_tree_change_outside_index(index, root):
+    other = make_category('OTHER')
+    index.add(other)
+    index.tree.move(index.at(root.id, 0), other.id)
+    assert index.count(root.id) == 9
+    assert skus(index, index.page(other.id)) == ['C000']
+
+
+def test_move_with_aware_timestamps():
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    root = make_category('ROOT', created_at=created, updated_at=created)
+    children = [
+        make_category(f'C{number:03}', root, sort_order=number, created_at=created, updated_at=created)
+        for number in range(3)
+    ]
+    index = SiblingIndex(CategoryTree.from_categories([root, *children]))
+    index.move_to(children[2].id, 0)
+    assert children[2].updated_at.tzinfo == timezone.utc and children[2].updated_at > created
+
+    # Naive now is local time, it is stored in timezone of created_at
+    index.move_to(children[0].id, 0, now=datetime(2025, 1, 1))
+    assert children[0].updated_at == datetime(2025, 1, 1).astimezone(timezone.utc)
+
+
+def test_sorted_keys_match_sorted_list():
+    # Enough keys for buckets to be split and joined
+    rng = random.Random(7)
+    keys = [(rng.randrange(1_000), f'K{number}', uuid.UUID(int=number)) for number in range(5_000)]
+    sorted_keys = SortedKeys(keys[:2_000])
+    expected = sorted(keys[:2_000])
+    for key in keys[2_000:]:
+        sorted_keys.add(key)
+        expected.append(key)
+    expected.sort()
+    for key in rng.sample(keys, 4_500):
+        sorted_keys.remove(key)
+        expected.remove(key)
+        if len(expected) % 500 == 0:
+            assert list(sorted_keys) == expected
+            assert [sorted_keys[position] for position in range(len(expected))] == expected
+    assert len(sorted_keys) == len(expected) == 500
+    for position in (0, 17, 499, -1):
+        assert sorted_keys[position] == expected[position]
+        assert sorted_keys.bisect_left(expected[position]) == position % 500
+    assert list(sorted_keys.islice(490, 600)) == expected[490:]
+    with pytest.raises(ValueError):
+        sorted_keys.remove((-1, '', uuid.UUID(int=0)))
+    with pytest.raises(IndexError):
+        sorted_keys[500]
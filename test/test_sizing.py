@@ -0,0 +1,132 @@
+import uuid
+import numpy as np
+from pydantic import ValidationError
+from src.catalog import (
+    ProductFrame,
+    compute_volume_m3,
+    verify_size_types,
+    suggest_size_types,
+    fill_frame_volumes,
+    verify_frame_size_types,
+    suggest_frame_size_types,
+)
+from src.catalog.schema import enum_codes
+from src.models import BaseProduct, ProductSizeType
+
+
+NAN = np.nan
+CODES = enum_codes(ProductSizeType).encode
+
+
+def arrays(*columns):
+    return [np.array(column, dtype=np.float64) for column in columns]
+
+
+def test_compute_volume_m3():
+    width, height, depth, volume = arrays([100, 100, NAN, 0], [200, 200, 10, 10], [50, 50, 10, 10], [NAN, 9, NAN, NAN])
+    result = compute_volume_m3(width, height, depth, volume)
+    assert result[:2].tolist() == [1.0, 9.0]
+    assert np.isnan(result[2:]).all()
+    assert compute_volume_m3(*arrays([10], [10], [10])).tolist() == [0.001]
+
+
+def test_verify_matches_model_validators():
+    cases = [
+        # size_type, weight, width, height, depth
+        (ProductSizeType.HEAVY, NAN, NAN, NAN, NAN),
+        (ProductSizeType.HEAVY, 10, NAN, NAN, NAN),
+        (ProductSizeType.HEAVY, 60, NAN, NAN, NAN),
+        (ProductSizeType.LIGHT, NAN, NAN, NAN, NAN),
+        (ProductSizeType.LIGHT, 11, NAN, NAN, NAN),
+        (ProductSizeType.LIGHT, 5, NAN, NAN, NAN),
+        (ProductSizeType.OVERSIZED, NAN, NAN, NAN, NAN),
+        (ProductSizeType.OVERSIZED, NAN, 150, NAN, NAN),
+        (ProductSizeType.OVERSIZED, NAN, 150, 250, NAN),
+        (ProductSizeType.SMALL_PARTS, NAN, NAN, NAN, NAN),
+        (ProductSizeType.SMALL_PARTS, NAN, 40, 0, NAN),
+        (ProductSizeType.SMALL_PARTS, NAN, 40, 20, NAN),
+        (ProductSizeType.STANDARD, 500, 500, NAN, NAN),
+        (None, NAN, NAN, NAN, NAN),
+    ]
+    sizes = np.array([CODES[case[0]] for case in cases], dtype=np.uint8)
+    weight, width, height, depth = arrays(*zip(*(case[1:] for case in cases)))
+    violations = verify_size_types(sizes, weight, width, height, depth)
+
+    assert np.flatnonzero(violations.heavy_missing_weight).tolist() == [0]
+    assert np.flatnonzero(violations.heavy_underweight).tolist() == [1]
+    assert np.flatnonzero(violations.light_missing_weight).tolist() == [3]
+    assert np.flatnonzero(violations.light_overweight).tolist() == [4]
+    assert np.flatnonzero(violations.oversized_missing_dims).tolist() == [6]
+    assert np.flatnonzero(violations.oversized_too_small).tolist() == [7]
+    assert np.flatnonzero(violations.small_parts_missing_dims).tolist() == [9]
+    assert np.flatnonzero(violations.small_parts_too_large).tolist() == [10]
+
+    # Same answer as BaseProduct validators for each case
+    for index, (size_type, *dims) in enumerate(cases):
+        dimensions = {
+            name: value
+            for name, value in zip(('weight_kg', 'width_cm', 'height_cm', 'depth_cm'), dims)
+            if not np.isnan(value)
+        }
+        try:
+            BaseProduct(
+                sku='SKU001',
+                name='Test Product',
+                category_id=uuid.uuid4(),
+                unit_of_measure='pc',
+                physical_state='solid',
+                role_type='finished good',
+                status='active',
+                traceability={'tracking_type': 'piece'},
+                handling={'is_stackable': False},
+                classification={'size_type': size_type},
+                dimensions=dimensions,
+            )
+            valid = True
+        except ValidationError:
+            valid = False
+        assert valid != violations.any[index], cases[index]
+
+
+def test_suggested_size_types_pass_verification():
+    rng = np.random.default_rng(7)
+    size = 2000
+    weight = np.where(rng.random(size) < 0.2, NAN, rng.uniform(0, 120, size))
+    dims = [np.where(rng.random(size) < 0.3, NAN, rng.uniform(0, 300, size)) for _ in range(3)]
+
+    suggested = suggest_size_types(weight, *dims)
+    assert not verify_size_types(suggested, weight, *dims).any.any()
+    assert set(np.unique(suggested)) <= {
+        0,
+        CODES[ProductSizeType.OVERSIZED],
+        CODES[ProductSizeType.HEAVY],
+        CODES[ProductSizeType.SMALL_PARTS],
+        CODES[ProductSizeType.LIGHT],
+        CODES[ProductSizeType.STANDARD],
+    }
+    assert suggest_size_types(*arrays([NAN], [NAN], [NAN], [NAN])).tolist() == [0]
+    assert suggest_size_types(*arrays([60], [10], [NAN], [NAN])).tolist() == [CODES[ProductSizeType.HEAVY]]
+
+
+def test_frame_helpers():
+    product = BaseProduct(
+        sku='SKU001',
+        name='Test Product',
+        category_id=None,
+        unit_of_measure='pc',
+        physical_state='solid',
+        role_type='finished good',
+        status='active',
+        traceability={'tracking_type': 'piece'},
+        classification={'size_type': 'light'},
+        dimensions={'weight_kg': 2, 'width_cm': 10, 'height_cm': 10},
+    )
+    frame = ProductFrame.from_products([product])
+    # Re-measured depth, volume is computed again for whole frame
+    frame.columns['dimensions.depth_cm'][:] = 10
+    fill_frame_volumes(frame)
+    assert frame.columns['dimensions.volume_m3'].tolist() == [0.001]
+
+    frame.columns['dimensions.weight_kg'][:] = 20
+    assert verify_frame_size_types(frame).light_overweight.tolist() == [True]
+    assert suggest_frame_size_types(frame).tolist() == [CODES[ProductSizeType.STANDARD]]
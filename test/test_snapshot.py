@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timezone
+from io import BytesIO
+import pytest
+from src.hierarchy import CategoryTree, SnapshotError, TreeSnapshot, write_snapshot
+from .factories import make_category
+
+
+@pytest.fixture
+def tree():
+    root = make_category('ROOT', description='Корень')
+    food = make_category('FOOD', root, sort_order=2, is_active=False)
+    fish = make_category('FISH', food, id=uuid.UUID('12345678-1234-5678-1234-567812345600'))
+    tech = make_category('TECH', root, sort_order=1, path=None, level=None)
+    tree = CategoryTree.from_categories([root, food, fish, tech])
+    tree.refresh(tree.roots()[0])
+    tech.path = None
+    return tree
+
+
+def test_roundtrip_from_file(tree, tmp_path):
+    path = tmp_path / 'tree.wmst'
+    assert write_snapshot(tree, path) == 4
+    snapshot = TreeSnapshot.open(path)
+    assert len(snapshot) == 4
+    for category in tree.categories.values():
+        assert snapshot.get(category.id) == category
+    assert snapshot.get(uuid.uuid4()) is None
+
+
+def test_structure_without_materializing(tree):
+    buffer = BytesIO()
+    write_snapshot(tree, buffer)
+    snapshot = TreeSnapshot(buffer.getvalue())
+    skus = {category.sku: category for category in tree.categories.values()}
+    root, food, fish = (snapshot.index_of(skus[sku].id) for sku in ('ROOT', 'FOOD', 'FISH'))
+    assert root == 0
+    assert snapshot.is_descendant(fish, root) and snapshot.is_descendant(fish, food)
+    assert not snapshot.is_descendant(food, fish)
+    assert snapshot.parent_index(fish) == food
+    assert sorted(snapshot.text(child, 'sku') for child in snapshot.children(root)) == ['FOOD', 'TECH']
+    assert list(snapshot.subtree(food)) == [food, fish]
+    assert snapshot.path(fish) == '/ROOT/FOOD/FISH'
+    assert snapshot.level(fish) == 2
+    # Every access builds new category, changing it does not change snapshot
+    category = snapshot.category(fish)
+    assert category == snapshot.get(skus['FISH'].id) and category is not snapshot.category(fish)
+    category.name = 'Changed'
+    assert snapshot.category(fish).name == 'Fish' and snapshot.categories()[fish].name == 'Fish'
+
+
+def test_timezone_aware_timestamps():
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    category = make_category('ROOT', created_at=created, updated_at=created)
+    buffer = BytesIO()
+    write_snapshot(CategoryTree.from_categories([category]), buffer)
+    assert TreeSnapshot(buffer.getvalue()).category(0).created_at == created
+
+
+def test_materialized_tree(tree):
+    buffer = BytesIO()
+    write_snapshot(tree, buffer)
+    restored = TreeSnapshot(buffer.getvalue()).to_tree()
+    assert set(restored.categories) == set(tree.categories)
+    assert len(restored.roots()) == 1
+
+
+def test_invalid_snapshot():
+    with pytest.raises(SnapshotError):
+        TreeSnapshot(b'WMSB' + b'\0' * 200)
+    with pytest.raises(SnapshotError):
+        TreeSnapshot(b'WMST')
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from pydantic import ValidationError
+from src.hierarchy import CategoryTree
+from .factories import make_category
+
+
+@pytest.fixture
+def categories():
+    root = make_category('ROOT')
+    food = make_category('FOOD', root)
+    tech = make_category('TECH', root)
+    fish = make_category('FISH', food)
+    milk = make_category('MILK', food)
+    phones = make_category('PHONES', tech)
+    return {category.sku: category for category in (root, food, tech, fish, milk, phones)}
+
+
+@pytest.fixture
+def tree(categories):
+    # Children before parents, building must not depend on order
+    return CategoryTree.from_categories(reversed(list(categories.values())))
+
+
+def skus(tree, ids):
+    return [tree[node].sku for node in ids]
+
+
+def test_children_and_roots(tree, categories):
+    assert skus(tree, tree.roots()) == ['ROOT']
+    assert sorted(skus(tree, tree.children(categories['FOOD'].id))) == ['FISH', 'MILK']
+    assert tree.children(categories['FISH'].id) == []
+    assert tree.is_leaf(categories['FISH'].id)
+    assert tree.parent(categories['FISH'].id) == categories['FOOD'].id
+    assert len(tree) == 6
+
+
+def test_ancestors_and_path(tree, categories):
+    phones = categories['PHONES'].id
+    assert skus(tree, tree.ancestors(phones)) == ['TECH', 'ROOT']
+    assert tree.depth(phones) == 2
+    assert tree.depth(categories['ROOT'].id) == 0
+    assert tree.path_of(phones) == '/ROOT/TECH/PHONES'
+
+
+def test_subtree(tree, categories):
+    food = categories['FOOD'].id
+    assert sorted(skus(tree, tree.subtree(food))) == ['FISH', 'FOOD', 'MILK']
+    assert sorted(skus(tree, tree.descendants(food))) == ['FISH', 'MILK']
+    nodes = skus(tree, tree.subtree())
+    assert nodes[0] == 'ROOT' and len(nodes) == 6
+    # Pre-order: parent comes before its children
+    assert nodes.index('FOOD') < nodes.index('FISH') and nodes.index('TECH') < nodes.index('PHONES')
+
+
+def test_add_and_remove(tree, categories):
+    with pytest.raises(ValueError):
+        tree.add(categories['FISH'])
+    removed = tree.remove(categories['FOOD'].id)
+    assert sorted(category.sku for category in removed) == ['FISH', 'FOOD', 'MILK']
+    assert categories['FISH'].id not in tree
+    assert skus(tree, tree.children(categories['ROOT'].id)) == ['TECH']
+
+
+def test_orphan_is_not_reachable(categories):
+    orphan = make_category('ORPHAN', categories['FISH'])
+    tree = CategoryTree.from_categories([categories['ROOT'], orphan])
+    assert list(tree.ancestors(orphan.id)) == []
+    assert orphan.id not in set(tree.subtree())
+
+
+def test_parent_cycle_is_rejected():
+    first = make_category('FIRST')
+    second = make_category('SECOND', first)
+    # Stored data may already contain cycle, model validation does not see whole tree
+    first.__dict__['parent_id'] = second.id
+    third = make_category('THIRD', second)
+    with pytest.raises(ValueError, match='forms a cycle'):
+        CategoryTree.from_categories([first, second, third])
+
+    tree = CategoryTree.from_categories([second, third])
+    with pytest.raises(ValueError, match='forms a cycle'):
+        tree.add(first)
+    assert first.id not in tree
+    assert list(tree.subtree()) == []
+    assert list(tree.descendants(second.id)) == [third.id]
+    assert [category.sku for category in tree.remove(second.id)] == ['SECOND', 'THIRD']
+
+    self_parent = make_category('SELF')
+    self_parent.__dict__['parent_id'] = self_parent.id
+    with pytest.raises(ValueError, match='forms a cycle'):
+        tree.add(self_parent)
+    assert self_parent.id not in tree
+
+
+def test_refresh_whole_tree(tree, categories):
+    tree.refresh()
+    assert categories['PHONES'].level == 2
+    assert categories['PHONES'].path == '/ROOT/TECH/PHONES'
+    assert categories['ROOT'].path == '/ROOT'
+
+
+def test_move_updates_only_subtree(tree, categories):
+    tree.refresh()
+    before = categories['PHONES'].updated_at
+    moved = tree.move(categories['FOOD'].id, categories['TECH'].id)
+    assert sorted(skus(tree, moved)) == ['FISH', 'FOOD', 'MILK']
+    assert categories['FOOD'].parent_id == categories['TECH'].id
+    assert categories['FISH'].level == 3
+    assert categories['FISH'].path == '/ROOT/TECH/FOOD/FISH'
+    assert categories['FISH'].updated_at >= categories['FISH'].created_at
+    assert categories['PHONES'].updated_at == before
+    assert sorted(skus(tree, tree.children(categories['TECH'].id))) == ['FOOD', 'PHONES']
+    assert skus(tree, tree.children(categories['ROOT'].id)) == ['TECH']
+
+    tree.move(categories['FOOD'].id, None)
+    assert categories['FOOD'].path == '/FOOD' and categories['MILK'].level == 1
+    assert sorted(skus(tree, tree.roots())) == ['FOOD', 'ROOT']
+
+
+def test_move_rejects_cycles_and_long_paths(tree, categories):
+    tree.refresh()
+    with pytest.raises(ValueError):
+        tree.move(categories['FOOD'].id, categories['FISH'].id)
+    with pytest.raises(ValueError):
+        tree.move(categories['FOOD'].id, categories['FOOD'].id)
+    with pytest.raises(KeyError):
+        tree.move(categories['FOOD'].id, make_category('OTHER').id)
+
+    categories['TECH'].path = '/' + 'X' * 495
+    with pytest.raises(ValidationError):
+        tree.refresh(categories['PHONES'].id)
+    assert categories['PHONES'].path == '/ROOT/TECH/PHONES'
+
+
+def test_failed_move_keeps_tree(tree, categories):
+    tree.refresh()
+    categories['TECH'].path = '/' + 'X' * 495
+    siblings = list(tree.children(categories['FOOD'].id))
+    with pytest.raises(ValidationError):
+        tree.move(categories['FISH'].id, categories['TECH'].id)
+    assert categories['FISH'].parent_id == categories['FOOD'].id
+    # Sibling order is kept, whichever child failed to move
+    with pytest.raises(ValidationError):
+        tree.move(siblings[0], categories['TECH'].id)
+    assert tree.children(categories['FOOD'].id) == siblings
+    assert categories['FISH'].id not in tree.children(categories['TECH'].id)
+
+
+def test_move_with_aware_timestamps():
+    created = datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=3)))
+    stamps = {'created_at': created, 'updated_at': created}
+    root = make_category('ROOT', **stamps)
+    food = make_category('FOOD', root, **stamps)
+    fish = make_category('FISH', food, **stamps)
+    tech = make_category('TECH', root, **stamps)
+    tree = CategoryTree.from_categories([root, food, fish, tech])
+    tree.refresh()
+    tree.move(food.id, tech.id)
+    assert fish.path == '/ROOT/TECH/FOOD/FISH'
+    assert fish.updated_at.tzinfo == created.tzinfo and fish.updated_at > created
+
+    # Naive now is local time, it is stored in timezone of created_at
+    tree.move(food.id, root.id, now=datetime(2025, 1, 1))
+    assert food.updated_at == datetime(2025, 1, 1).astimezone(created.tzinfo)
+
+    # Rollback does not depend on error type raised by refresh
+    with pytest.raises(AttributeError):
+        tree.move(food.id, tech.id, now='2025-01-01')
+    assert food.parent_id == root.id and food.id in tree.children(root.id)
+    assert food.id not in tree.children(tech.id)
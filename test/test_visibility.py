@@ -0,0 +1,74 @@
+import random
+import pytest
+from src.hierarchy import CategoryTree, VisibilityView
+from .factories import make_category
+
+
+@pytest.fixture
+def categories():
+    root = make_category('ROOT')
+    food = make_category('FOOD', root)
+    fish = make_category('FISH', food)
+    milk = make_category('MILK', food, is_active=False)
+    tech = make_category('TECH', root, is_deleted=True)
+    phones = make_category('PHONES', tech)
+    return {category.sku: category for category in (root, food, fish, milk, tech, phones)}
+
+
+@pytest.fixture
+def view(categories):
+    return VisibilityView(CategoryTree.from_categories(categories.values()))
+
+
+def skus(view, ids):
+    return sorted(view.tree[node].sku for node in ids)
+
+
+def test_inherited_visibility(view, categories):
+    assert skus(view, view.visible) == ['FISH', 'FOOD', 'ROOT']
+    assert view.is_deleted(categories['PHONES'].id)
+    assert not view.is_visible(categories['PHONES'].id)
+    assert skus(view, view.visible_children(categories['FOOD'].id)) == ['FISH']
+    assert skus(view, view.visible_subtree()) == ['FISH', 'FOOD', 'ROOT']
+    assert len(view) == 3
+
+
+def test_flag_flips(view, categories):
+    assert skus(view, view.set_deleted(categories['FOOD'].id, True)) == ['FISH', 'FOOD']
+    assert skus(view, view.visible) == ['ROOT']
+    # Milk stays hidden, it is inactive itself
+    assert skus(view, view.set_deleted(categories['FOOD'].id, False)) == ['FISH', 'FOOD']
+    assert skus(view, view.set_active(categories['MILK'].id, True)) == ['MILK']
+    assert skus(view, view.set_deleted(categories['TECH'].id, False)) == ['PHONES', 'TECH']
+    assert skus(view, view.set_active(categories['ROOT'].id, False)) == [
+        'FISH',
+        'FOOD',
+        'MILK',
+        'PHONES',
+        'ROOT',
+        'TECH',
+    ]
+    assert view.set_active(categories['FISH'].id, False) == []
+
+
+def test_matches_full_recompute():
+    rng = random.Random(3)
+    categories = [make_category('ROOT')]
+    for number in range(150):
+        categories.append(make_category(f'C{number:04}', rng.choice(categories)))
+    view = VisibilityView(CategoryTree.from_categories(categories))
+    for _ in range(500):
+        category = rng.choice(categories)
+        if rng.random() < 0.5:
+            view.set_active(category.id, not category.is_active)
+        else:
+            view.set_deleted(category.id, not category.is_deleted)
+    tree = view.tree
+    expected = {
+        category.id
+        for category in categories
+        if all(
+            tree[node].is_active and not tree[node].is_deleted for node in (category.id, *tree.ancestors(category.id))
+        )
+    }
+    assert view.visible == expected